@@ -1,8 +1,9 @@
 import streamlit as st
 from datetime import datetime
 import pandas as pd
-import numpy as np
-import time
+from utils.acquisition import PRESSES, get_fleet, get_sampler, select_press, wait_for_press
+from utils.cards import Card, card_grid, stat_rows, stat_tiles
+from utils.perf import count, laps, timed
 
 # Page configuration
 st.set_page_config(
@@ -90,6 +91,16 @@ st.markdown("""
         background: linear-gradient(145deg, #f5f3ff 0%, #ede9fe 100%);
     }
     
+    /* Card Grid: one block per section */
+    .card-grid {
+        display: grid;
+        gap: 1rem;
+    }
+    
+    .card-grid .metric-card {
+        margin: 0;
+    }
+    
     /* Metric Text Styling */
     .metric-label {
         font-size: 0.85rem;
@@ -174,6 +185,42 @@ st.markdown("""
         box-shadow: 0 0 8px #ef4444;
     }
     
+    /* Stat Tiles and Rows */
+    .stat-tile {
+        background: #1e293b;
+        padding: 0.75rem;
+        margin: 0.5rem 0;
+        border-radius: 8px;
+        border-left: 4px solid #3b82f6;
+    }
+    
+    .stat-tile-label {
+        color: #cbd5e1;
+        font-size: 0.9rem;
+    }
+    
+    .stat-tile-value {
+        color: #60a5fa;
+        font-size: 1.2rem;
+        font-weight: bold;
+    }
+    
+    .stat-row {
+        display: flex;
+        justify-content: space-between;
+        padding: 0.5rem 0;
+        border-bottom: 1px solid #475569;
+    }
+    
+    .stat-row-label {
+        color: #cbd5e1;
+    }
+    
+    .stat-row-value {
+        font-weight: 600;
+        color: #60a5fa;
+    }
+    
     /* Sidebar Styling */
     .sidebar .sidebar-content {
         background-color: #1e293b;
@@ -259,6 +306,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Timer options for refreshing the live sections
+REFRESH_INTERVALS = {"0.5s": 0.5, "1s": 1, "2s": 2, "5s": 5}
+
 # Initialize session state
 if 'current_data' not in st.session_state:
     st.session_state.current_data = {}
@@ -267,58 +317,16 @@ if 'auto_refresh' not in st.session_state:
 if 'emergency_stop' not in st.session_state:
     st.session_state.emergency_stop = False
 
-# Function to generate current extrusion data
-def generate_current_data():
-    """Generate current extrusion data matching your control panel"""
-    np.random.seed(int(time.time()) % 1000)
-    
-    data = {
-        'timestamp': datetime.now(),
-        
-        # Core positions
-        'main_ram_position': 298.8 + np.random.randn() * 0.5,
-        'container_position': 450.0 + np.random.randn() * 0.5,
-        
-        # Pressure system
-        'sys_pressure': 3.0 + np.random.randn() * 0.1,
-        'aux_pressure': 2.4 + np.random.randn() * 0.1,
-        'pilot_pressure': 48.7 + np.random.randn() * 0.5,
-        'ram_pressure': 48.7 + np.random.randn() * 0.5,
-        'ram_press': 0.0 + np.random.randn() * 0.1,
-        'lock_pressure': 2.3 + np.random.randn() * 0.1,
-        'low_pressure': 2.7 + np.random.randn() * 0.1,
-        'billet_pressure': 224.5 + np.random.randn() * 2,
-        
-        # Temperature system
-        'oil_temp': 29.1 + np.random.randn() * 0.3,
-        'front_temp': 412.8 + np.random.randn() * 2,
-        'back_temp': 405.5 + np.random.randn() * 2,
-        'profile_temp': 0.0,
-        
-        # Speed system
-        'ram_speed': 0.0 + np.random.randn() * 0.1,
-        'container_speed': 0.0 + np.random.randn() * 0.1,
-        'extrusion_time': 0.0,
-        
-        # Residue & counters
-        'container_residue': max(1100, 1149.2 - np.random.rand() * 0.5),
-        'billet_residue': 0.0,
-        'die_counter': 0,
-        'total_count': 45,
-        
-        # Status flags
-        'ram_status': 'STOP',
-        'mode': 'MANUAL',
-        'puller_status': 'ON',
-        'phase': 'PLUX',
-        'data_status': 'ACTIVE',
-        'ram_stop': 30,
-        'manual_mode': 30
-    }
-    return data
-
-# Update current data
-st.session_state.current_data = generate_current_data()
+# Rerun sections are timed into the process-wide registry (System Settings > Performance)
+count('app.reruns')
+page_laps = laps('app')
+
+# Every section below shows the selected press
+press = select_press()
+
+# Update current data; a press that has not reported yet gets a notice instead
+wait_for_press(press)
+st.session_state.current_data = get_sampler(press).latest()
 
 # ==================== SIDEBAR ====================
 with st.sidebar:
@@ -337,28 +345,11 @@ with st.sidebar:
     # System Status
     st.markdown("### 📊 System Status")
     
-    col1, col2 = st.columns(2)
-    with col1:
-        ram_status = st.session_state.current_data['ram_status']
-        dot_color = "status-good" if ram_status == 'STOP' else "status-alert"
-        st.markdown(f"""
-        <div class='metric-card status'>
-            <div class='metric-label'>RAM Status</div>
-            <div class='metric-value'>
-                <span class='status-dot {dot_color}'></span>
-                {ram_status}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        mode = st.session_state.current_data['mode']
-        st.markdown(f"""
-        <div class='metric-card status'>
-            <div class='metric-label'>Operation Mode</div>
-            <div class='metric-value'>{mode}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    ram_status = st.session_state.current_data['ram_status']
+    st.markdown(card_grid([
+        Card("RAM Status", ram_status, status='good' if ram_status == 'STOP' else 'alert'),
+        Card("Operation Mode", st.session_state.current_data['mode']),
+    ], columns=2), unsafe_allow_html=True)
     
     # Quick Stats
     st.markdown("---")
@@ -372,20 +363,15 @@ with st.sidebar:
         ("RAM Stop", st.session_state.current_data['ram_stop']),
         ("Manual Reset", st.session_state.current_data['manual_mode'])
     ]
-    
-    for label, value in stats:
-        st.markdown(f"""
-        <div style='display: flex; justify-content: space-between; padding: 0.5rem 0; border-bottom: 1px solid #475569;'>
-            <span style='color: #cbd5e1;'>{label}:</span>
-            <span style='font-weight: 600; color: #60a5fa;'>{value}</span>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(stat_rows(stats), unsafe_allow_html=True)
     
     # Controls
     st.markdown("---")
     st.markdown("### ⚙️ Controls")
     
-    st.session_state.auto_refresh = st.checkbox("🔄 Auto-refresh (5s)", value=False)
+    st.session_state.auto_refresh = st.checkbox("🔄 Auto-refresh", value=False)
+    st.select_slider("Refresh Interval", options=list(REFRESH_INTERVALS), value="1s",
+                     key="refresh_interval", disabled=not st.session_state.auto_refresh)
     
     if st.button("📊 Export Data", use_container_width=True):
         st.success("Data export initiated")
@@ -404,6 +390,8 @@ with st.sidebar:
     st.markdown("---")
     st.markdown(f"**Last Update:** {datetime.now().strftime('%H:%M:%S')}")
 
+page_laps.lap('sidebar')
+
 # ==================== MAIN CONTENT ====================
 # Logo and Title Section - CENTERED
 st.markdown("<div class='logo-container'>", unsafe_allow_html=True)
@@ -431,400 +419,176 @@ if st.session_state.emergency_stop:
 # Process Information
 st.markdown("<div class='section-header'>Process Information</div>", unsafe_allow_html=True)
 
-info_col1, info_col2, info_col3 = st.columns(3)
-with info_col1:
-    st.markdown("""
-    <div class='metric-card status'>
-        <div class='metric-label'>Current Process</div>
-        <div class='metric-value'>Roll Production #1</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with info_col2:
-    current_time = datetime.now().strftime('%m/%Y %H:%M:%S')
-    st.markdown(f"""
-    <div class='metric-card status'>
-        <div class='metric-label'>Date/Time</div>
-        <div class='metric-value'>{current_time}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with info_col3:
-    st.markdown("""
-    <div class='metric-card status'>
-        <div class='metric-label'>Operator & Shift</div>
-        <div class='metric-value'>System Auto | Day</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# ==================== PRESSURE SYSTEM ====================
-st.markdown("<div class='section-header'>Pressure System</div>", unsafe_allow_html=True)
-
-# Row 1
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>RAM Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['ram_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-        <div class='metric-change change-positive'>▲ {np.random.randn()*0.5:.1f}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col2:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>Billet Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['billet_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-        <div class='metric-change change-positive'>▲ {np.random.randn()*2:.1f}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col3:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>System Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['sys_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-        <div class='metric-change change-neutral'>→ {np.random.randn()*0.1:.1f}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col4:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>Pilot Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['pilot_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-        <div class='metric-change change-negative'>▼ {np.random.randn()*0.3:.1f}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# Row 2 - Additional Pressures
-st.markdown("<div class='section-subheader'>Secondary Pressures</div>", unsafe_allow_html=True)
-
-col5, col6, col7, col8 = st.columns(4)
-with col5:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>AUX Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['aux_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col6:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>Lock Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['lock_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col7:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>Low Pressure</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['low_pressure']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col8:
-    st.markdown(f"""
-    <div class='metric-card pressure'>
-        <div class='metric-label'>RAM Press</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['ram_press']:.1f}
-            <span class='metric-unit'>bar</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# ==================== TEMPERATURE SYSTEM ====================
-st.markdown("<div class='section-header'>Temperature System</div>", unsafe_allow_html=True)
-
-temp_col1, temp_col2, temp_col3, temp_col4 = st.columns(4)
-
-with temp_col1:
-    temp = st.session_state.current_data['front_temp']
-    status = "status-alert" if temp > 420 else "status-good" if temp < 415 else "status-warning"
-    st.markdown(f"""
-    <div class='metric-card temperature'>
-        <div class='metric-label'>Front Temperature</div>
-        <div class='metric-value'>
-            <span class='status-dot {status}'></span>
-            {temp:.1f}
-            <span class='metric-unit'>°C</span>
-        </div>
-        <div class='metric-change {'change-negative' if temp > 420 else 'change-positive'}'>
-            {np.random.randn()*2:.1f}°C
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with temp_col2:
-    temp = st.session_state.current_data['back_temp']
-    status = "status-alert" if temp > 415 else "status-good"
-    st.markdown(f"""
-    <div class='metric-card temperature'>
-        <div class='metric-label'>Back Temperature</div>
-        <div class='metric-value'>
-            <span class='status-dot {status}'></span>
-            {temp:.1f}
-            <span class='metric-unit'>°C</span>
-        </div>
-        <div class='metric-change change-positive'>▲ {np.random.randn()*1.5:.1f}°C</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with temp_col3:
-    temp = st.session_state.current_data['oil_temp']
-    status = "status-alert" if temp > 35 else "status-good" if temp > 25 else "status-warning"
-    st.markdown(f"""
-    <div class='metric-card temperature'>
-        <div class='metric-label'>Oil Temperature</div>
-        <div class='metric-value'>
-            <span class='status-dot {status}'></span>
-            {temp:.1f}
-            <span class='metric-unit'>°C</span>
-        </div>
-        <div class='metric-change change-neutral'>→ {np.random.randn()*0.3:.1f}°C</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with temp_col4:
-    temp = st.session_state.current_data['profile_temp']
-    st.markdown(f"""
-    <div class='metric-card temperature'>
-        <div class='metric-label'>Profile Temperature</div>
-        <div class='metric-value'>
-            {temp:.1f}
-            <span class='metric-unit'>°C</span>
-        </div>
-        <div class='metric-change change-neutral'>0.0°C</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# ==================== POSITION & SPEED ====================
-st.markdown("<div class='section-header'>Position & Speed Monitoring</div>", unsafe_allow_html=True)
-
-pos_col1, pos_col2, pos_col3, pos_col4 = st.columns(4)
-
-with pos_col1:
-    st.markdown(f"""
-    <div class='metric-card position'>
-        <div class='metric-label'>RAM Position</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['main_ram_position']:.1f}
-            <span class='metric-unit'>mm</span>
-        </div>
-        <div class='metric-change change-neutral'>→ {np.random.randn()*0.2:.1f} mm</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with pos_col2:
-    st.markdown(f"""
-    <div class='metric-card position'>
-        <div class='metric-label'>Container Position</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['container_position']:.1f}
-            <span class='metric-unit'>mm</span>
-        </div>
-        <div class='metric-change change-neutral'>→ {np.random.randn()*0.2:.1f} mm</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with pos_col3:
-    st.markdown(f"""
-    <div class='metric-card position'>
-        <div class='metric-label'>RAM Speed</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['ram_speed']:.1f}
-            <span class='metric-unit'>mm/s</span>
-        </div>
-        <div class='metric-change change-neutral'>→ {np.random.randn()*0.1:.1f} mm/s</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with pos_col4:
-    st.markdown(f"""
-    <div class='metric-card position'>
-        <div class='metric-label'>Container Residue</div>
-        <div class='metric-value'>
-            {st.session_state.current_data['container_residue']:.1f}
-            <span class='metric-unit'>mm</span>
-        </div>
-        <div class='metric-change change-negative'>▼ {np.random.rand()*0.5:.1f} mm</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# ==================== DETAILED PARAMETERS ====================
-st.markdown("<div class='section-header'>Detailed Parameters</div>", unsafe_allow_html=True)
-
-tab1, tab2, tab3 = st.tabs(["📊 Counters & Status", "⚙️ All Parameters", "📈 Quick View"])
-
-with tab1:
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### Counters")
-        counters_data = {
-            "DIE Counter": f"{st.session_state.current_data['die_counter']} Pcs",
-            "Total Count": f"{st.session_state.current_data['total_count']} CLEAR",
-            "RAM Stop": st.session_state.current_data['ram_stop'],
-            "Manual": st.session_state.current_data['manual_mode'],
-            "Extrusion Time": f"{st.session_state.current_data['extrusion_time']:.1f} sec",
-            "Billet Residue": f"{st.session_state.current_data['billet_residue']:.1f} mm"
-        }
-        
-        for label, value in counters_data.items():
-            st.markdown(f"""
-            <div style='background: #1e293b; padding: 0.75rem; margin: 0.5rem 0; border-radius: 8px; border-left: 4px solid #3b82f6;'>
-                <div style='color: #cbd5e1; font-size: 0.9rem;'>{label}</div>
-                <div style='color: #60a5fa; font-size: 1.2rem; font-weight: bold;'>{value}</div>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("### System Status")
-        status_data = {
-            "RAM Status": st.session_state.current_data['ram_status'],
-            "Operation Mode": st.session_state.current_data['mode'],
-            "Puller Status": st.session_state.current_data['puller_status'],
-            "Phase": st.session_state.current_data['phase'],
-            "Data Status": st.session_state.current_data['data_status'],
-            "Container Speed": f"{st.session_state.current_data['container_speed']:.1f} mm/s"
-        }
-        
-        for label, value in status_data.items():
-            st.markdown(f"""
-            <div style='background: #1e293b; padding: 0.75rem; margin: 0.5rem 0; border-radius: 8px; border-left: 4px solid #10b981;'>
-                <div style='color: #cbd5e1; font-size: 0.9rem;'>{label}</div>
-                <div style='color: #60a5fa; font-size: 1.2rem; font-weight: bold;'>{value}</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-with tab2:
-    # Create a DataFrame for all parameters
-    all_params = {
-        "Parameter": [
-            "Main RAM Position", "Container Position", 
-            "SYS Pressure", "AUX Pressure", "Pilot Pressure", "RAM Pressure",
-            "RAM Press", "Lock Pressure", "Low Pressure", "Billet Pressure",
-            "Oil Temperature", "Front Temperature", "Back Temperature", "Profile Temperature",
-            "RAM Speed", "Container Speed", "Container Residue", "Billet Residue",
-            "Extrusion Time", "DIE Counter", "Total Count"
-        ],
-        "Value": [
-            f"{st.session_state.current_data['main_ram_position']:.1f} mm",
-            f"{st.session_state.current_data['container_position']:.1f} mm",
-            f"{st.session_state.current_data['sys_pressure']:.1f} bar",
-            f"{st.session_state.current_data['aux_pressure']:.1f} bar",
-            f"{st.session_state.current_data['pilot_pressure']:.1f} bar",
-            f"{st.session_state.current_data['ram_pressure']:.1f} bar",
-            f"{st.session_state.current_data['ram_press']:.1f} bar",
-            f"{st.session_state.current_data['lock_pressure']:.1f} bar",
-            f"{st.session_state.current_data['low_pressure']:.1f} bar",
-            f"{st.session_state.current_data['billet_pressure']:.1f} bar",
-            f"{st.session_state.current_data['oil_temp']:.1f}°C",
-            f"{st.session_state.current_data['front_temp']:.1f}°C",
-            f"{st.session_state.current_data['back_temp']:.1f}°C",
-            f"{st.session_state.current_data['profile_temp']:.1f}°C",
-            f"{st.session_state.current_data['ram_speed']:.1f} mm/s",
-            f"{st.session_state.current_data['container_speed']:.1f} mm/s",
-            f"{st.session_state.current_data['container_residue']:.1f} mm",
-            f"{st.session_state.current_data['billet_residue']:.1f} mm",
-            f"{st.session_state.current_data['extrusion_time']:.1f} sec",
-            f"{st.session_state.current_data['die_counter']} Pcs",
-            f"{st.session_state.current_data['total_count']} CLEAR"
-        ]
-    }
-    
-    df = pd.DataFrame(all_params)
-    st.dataframe(df, use_container_width=True, height=400)
-
-with tab3:
-    # Quick view of key parameters
-    st.markdown("### 🎯 Key Parameters Summary")
-    
-    key_params = [
-        ("RAM Pressure", f"{st.session_state.current_data['ram_pressure']:.1f} bar", "pressure"),
-        ("Front Temp", f"{st.session_state.current_data['front_temp']:.1f}°C", "temperature"),
-        ("RAM Position", f"{st.session_state.current_data['main_ram_position']:.1f} mm", "position"),
-        ("Billet Pressure", f"{st.session_state.current_data['billet_pressure']:.1f} bar", "pressure"),
-        ("Container Residue", f"{st.session_state.current_data['container_residue']:.1f} mm", "position"),
-        ("Oil Temp", f"{st.session_state.current_data['oil_temp']:.1f}°C", "temperature")
-    ]
-    
-    cols = st.columns(3)
-    for idx, (label, value, card_type) in enumerate(key_params):
-        with cols[idx % 3]:
-            st.markdown(f"""
-            <div class='metric-card {card_type}'>
-                <div class='metric-label'>{label}</div>
-                <div class='metric-value'>{value.split()[0]}</div>
-                <div style='color: #64748b;'>{' '.join(value.split()[1:])}</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-# ==================== ALERTS & WARNINGS ====================
-st.markdown("<div class='section-header'>Alerts & Warnings</div>", unsafe_allow_html=True)
-
-# Check for alerts
-alerts = []
-
-if st.session_state.current_data['front_temp'] > 420:
-    alerts.append(("High Front Temperature", f"{st.session_state.current_data['front_temp']:.1f}°C exceeds 420°C limit", "danger"))
-elif st.session_state.current_data['front_temp'] > 415:
-    alerts.append(("Warning: Front Temperature", f"{st.session_state.current_data['front_temp']:.1f}°C approaching limit", "warning"))
-
-if st.session_state.current_data['ram_pressure'] > 50:
-    alerts.append(("High RAM Pressure", f"{st.session_state.current_data['ram_pressure']:.1f} bar exceeds 50 bar limit", "danger"))
-
-if st.session_state.current_data['container_residue'] < 1100:
-    alerts.append(("Low Container Residue", f"{st.session_state.current_data['container_residue']:.1f} mm is below 1100mm", "warning"))
-
-if st.session_state.current_data['oil_temp'] > 35:
-    alerts.append(("High Oil Temperature", f"{st.session_state.current_data['oil_temp']:.1f}°C exceeds 35°C limit", "danger"))
-
-if alerts:
-    for title, message, alert_type in alerts:
-        if alert_type == "danger":
-            st.markdown(f"""
-            <div class='alert-box alert-danger'>
-                <strong>⚠️ {title}:</strong> {message}
-            </div>
-            """, unsafe_allow_html=True)
+st.markdown(card_grid([
+    Card("Current Process", f"Roll Production #{PRESSES.index(press) + 1}"),
+    Card("Date/Time", datetime.now().strftime('%m/%Y %H:%M:%S')),
+    Card("Operator & Shift", "System Auto | Day"),
+], columns=3), unsafe_allow_html=True)
+page_laps.lap('process_info')
+
+# ==================== LIVE SECTIONS ====================
+# (label, field, unit) of the All Parameters table
+ALL_PARAMETERS = [
+    ("Main RAM Position", 'main_ram_position', "mm"), ("Container Position", 'container_position', "mm"),
+    ("SYS Pressure", 'sys_pressure', "bar"), ("AUX Pressure", 'aux_pressure', "bar"),
+    ("Pilot Pressure", 'pilot_pressure', "bar"), ("RAM Pressure", 'ram_pressure', "bar"),
+    ("RAM Press", 'ram_press', "bar"), ("Lock Pressure", 'lock_pressure', "bar"),
+    ("Low Pressure", 'low_pressure', "bar"), ("Billet Pressure", 'billet_pressure', "bar"),
+    ("Oil Temperature", 'oil_temp', "°C"), ("Front Temperature", 'front_temp', "°C"),
+    ("Back Temperature", 'back_temp', "°C"), ("Profile Temperature", 'profile_temp', "°C"),
+    ("RAM Speed", 'ram_speed', "mm/s"), ("Container Speed", 'container_speed', "mm/s"),
+    ("Container Residue", 'container_residue', "mm"), ("Billet Residue", 'billet_residue', "mm"),
+    ("Extrusion Time", 'extrusion_time', "sec"), ("DIE Counter", 'die_counter', "Pcs"),
+    ("Total Count", 'total_count', "CLEAR"),
+]
+
+def recent_changes(sampler):
+    """Change of every live signal since the previous sample"""
+    recent = sampler.window(2)
+    if len(recent['timestamp']) < 2:
+        return {}
+    return {name: float(values[-1] - values[-2]) for name, values in recent.items() if name != 'timestamp'}
+
+def section(markup):
+    st.markdown(markup, unsafe_allow_html=True)
+
+def overview_cards(overview, selected):
+    """One card per press: mean RAM pressure and its alert state"""
+    cards = []
+    for name, row in overview.iterrows():
+        label = f"{name} RAM Pressure" + (" (viewing)" if name == selected else "")
+        if pd.isna(row.ram_pressure_mean):
+            # The press has not reported yet
+            cards.append(Card(label, "Waiting for data", "", "pressure", None))
         else:
-            st.markdown(f"""
-            <div class='alert-box alert-warning'>
-                <strong>⚠️ {title}:</strong> {message}
-            </div>
-            """, unsafe_allow_html=True)
-else:
-    st.markdown("""
-    <div class='alert-box alert-success'>
-        <strong>✅ All systems normal:</strong> No active alerts or warnings
-    </div>
-    """, unsafe_allow_html=True)
+            cards.append(Card(label, row.ram_pressure_mean, "bar", "pressure",
+                              "alert" if row.danger else "warning" if row.alerts else "good"))
+    return card_grid(cards, columns=min(len(overview), 4))
+
+@timed('app.live_sections')
+def render_live_sections():
+    """Render the sections that follow the live data, one HTML block per section"""
+    fleet = get_fleet()
+    sampler = fleet.sampler(st.session_state.press)
+    data = st.session_state.current_data = sampler.latest()
+    change = recent_changes(sampler)
+
+    # ==================== PLANT OVERVIEW ====================
+    if len(fleet.presses) > 1:
+        section("<div class='section-header'>Plant Overview</div>")
+        section(overview_cards(fleet.overview(), st.session_state.press))
+
+    # ==================== PRESSURE SYSTEM ====================
+    section("<div class='section-header'>Pressure System</div>")
+    section(card_grid([
+        Card("RAM Pressure", data['ram_pressure'], "bar", "pressure", change=change.get('ram_pressure')),
+        Card("Billet Pressure", data['billet_pressure'], "bar", "pressure", change=change.get('billet_pressure')),
+        Card("System Pressure", data['sys_pressure'], "bar", "pressure", change=change.get('sys_pressure')),
+        Card("Pilot Pressure", data['pilot_pressure'], "bar", "pressure", change=change.get('pilot_pressure')),
+    ]))
+    section("<div class='section-subheader'>Secondary Pressures</div>")
+    section(card_grid([
+        Card("AUX Pressure", data['aux_pressure'], "bar", "pressure"),
+        Card("Lock Pressure", data['lock_pressure'], "bar", "pressure"),
+        Card("Low Pressure", data['low_pressure'], "bar", "pressure"),
+        Card("RAM Press", data['ram_press'], "bar", "pressure"),
+    ]))
+
+    # ==================== TEMPERATURE SYSTEM ====================
+    # Card dots follow the press's alert state, so they match the saved limits
+    statuses = sampler.alerts.statuses()
+    section("<div class='section-header'>Temperature System</div>")
+    section(card_grid([
+        Card("Front Temperature", data['front_temp'], "°C", "temperature",
+             statuses.get('front_temp', 'good'), change.get('front_temp')),
+        Card("Back Temperature", data['back_temp'], "°C", "temperature",
+             statuses.get('back_temp', 'good'), change.get('back_temp')),
+        Card("Oil Temperature", data['oil_temp'], "°C", "temperature",
+             statuses.get('oil_temp', 'good'), change.get('oil_temp')),
+        Card("Profile Temperature", data['profile_temp'], "°C", "temperature"),
+    ]))
+
+    # ==================== POSITION & SPEED ====================
+    section("<div class='section-header'>Position & Speed Monitoring</div>")
+    section(card_grid([
+        Card("RAM Position", data['main_ram_position'], "mm", "position"),
+        Card("Container Position", data['container_position'], "mm", "position", change=change.get('container_position')),
+        Card("RAM Speed", data['ram_speed'], "mm/s", "position", change=change.get('ram_speed')),
+        Card("Container Residue", data['container_residue'], "mm", "position"),
+    ]))
+
+    # ==================== DETAILED PARAMETERS ====================
+    section("<div class='section-header'>Detailed Parameters</div>")
+
+    tab1, tab2, tab3 = st.tabs(["📊 Counters & Status", "⚙️ All Parameters", "📈 Quick View"])
+
+    with tab1:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### Counters")
+            section(stat_tiles([
+                ("DIE Counter", f"{data['die_counter']} Pcs"),
+                ("Total Count", f"{data['total_count']} CLEAR"),
+                ("RAM Stop", data['ram_stop']),
+                ("Manual", data['manual_mode']),
+                ("Extrusion Time", f"{data['extrusion_time']:.1f} sec"),
+                ("Billet Residue", f"{data['billet_residue']:.1f} mm"),
+            ]))
+
+        with col2:
+            st.markdown("### System Status")
+            section(stat_tiles([
+                ("RAM Status", data['ram_status']),
+                ("Operation Mode", data['mode']),
+                ("Puller Status", data['puller_status']),
+                ("Phase", data['phase']),
+                ("Data Status", data['data_status']),
+                ("Container Speed", f"{data['container_speed']:.1f} mm/s"),
+            ], accent='#10b981'))
+
+    with tab2:
+        values = [
+            f"{data[field]:.1f}{unit}" if unit == "°C" else
+            f"{data[field]} {unit}" if isinstance(data[field], int) else f"{data[field]:.1f} {unit}"
+            for _, field, unit in ALL_PARAMETERS
+        ]
+        df = pd.DataFrame({"Parameter": [label for label, _, _ in ALL_PARAMETERS], "Value": values})
+        st.dataframe(df, use_container_width=True, height=400)
+
+    with tab3:
+        st.markdown("### 🎯 Key Parameters Summary")
+        section(card_grid([
+            Card("RAM Pressure", data['ram_pressure'], "bar", "pressure"),
+            Card("Front Temp", data['front_temp'], "°C", "temperature"),
+            Card("RAM Position", data['main_ram_position'], "mm", "position"),
+            Card("Billet Pressure", data['billet_pressure'], "bar", "pressure"),
+            Card("Container Residue", data['container_residue'], "mm", "position"),
+            Card("Oil Temp", data['oil_temp'], "°C", "temperature"),
+        ], columns=3))
+
+    # ==================== ALERTS & WARNINGS ====================
+    section("<div class='section-header'>Alerts & Warnings</div>")
+
+    # Alert state comes from the shared rule engine
+    alerts = sampler.alerts.active()
+    if alerts:
+        section(''.join(
+            f"<div class='alert-box alert-{'danger' if alert_type == 'danger' else 'warning'}'>"
+            f"<strong>⚠️ {title}:</strong> {message}</div>"
+            for title, message, alert_type in alerts
+        ))
+    else:
+        section("<div class='alert-box alert-success'>"
+                "<strong>✅ All systems normal:</strong> No active alerts or warnings</div>")
+
+
+# Only the live sections rerun on the refresh timer; the logo, CSS and
+# process information are sent once per full rerun. A section whose
+# markup is unchanged goes out as a reference to the browser's message
+# cache (see .streamlit/config.toml)
+refresh_interval = REFRESH_INTERVALS[st.session_state.refresh_interval] if st.session_state.auto_refresh else None
+st.fragment(render_live_sections, run_every=refresh_interval)()
 
 # ==================== FOOTER ====================
 st.markdown("<div class='footer'>", unsafe_allow_html=True)
@@ -843,8 +607,3 @@ st.markdown("""
     time=datetime.now().strftime('%H:%M:%S')
 ), unsafe_allow_html=True)
 st.markdown("</div>", unsafe_allow_html=True)
-
-# Auto-refresh logic
-if st.session_state.auto_refresh:
-    time.sleep(5)
-    st.rerun()
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Payload size and figure build time of trend charts with and without downsampling.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_downsample
+
+Browser render time grows with the number of points Plotly.js has to lay
+out, so the serialized point count and payload size are reported as its
+proxy alongside the server-side build and serialization time.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from utils.downsample import downsample_frame
+
+SIZES = [10_000, 100_000, 1_000_000]
+PROCESSES = ['Roll_Production', 'Profile_Ext', 'Tube_Ext']
+
+
+def make_history(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=rows, freq='s'),
+        'process': rng.choice(PROCESSES, rows),
+        'front_temp': 410 + np.cumsum(rng.standard_normal(rows)) * 0.05 + rng.standard_normal(rows) * 2,
+    })
+
+
+def measure(frame):
+    start = time.perf_counter()
+    fig = px.line(frame, x='timestamp', y='front_temp', color='process')
+    payload = fig.to_json()
+    elapsed = time.perf_counter() - start
+    points = sum(len(trace.x) for trace in fig.data)
+    return points, len(payload), elapsed
+
+
+def main():
+    print(f"{'rows':>10} {'mode':>12} {'points':>10} {'payload':>12} {'build+json':>12}")
+    for rows in SIZES:
+        history = make_history(rows)
+        start = time.perf_counter()
+        reduced = downsample_frame(history, 'timestamp', 'front_temp', by='process')
+        downsample_time = time.perf_counter() - start
+        for mode, frame, extra in (('raw', history, 0.0), ('lttb', reduced, downsample_time)):
+            points, size, elapsed = measure(frame)
+            print(f"{rows:>10} {mode:>12} {points:>10} {size / 1e6:>10.2f}MB {(elapsed + extra) * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Throughput and latency of the ingest endpoint against the local load generator.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingest                         # 3 presses, 2000 samples/s each, line protocol
+    python -m benchmarks.bench_ingest --format binary --rate 0
+    python -m benchmarks.bench_ingest --transport udp --rate 20000
+
+The load generator runs as a separate process. The endpoint publishes
+into real Samplers (buffers, control charts, anomaly detector and
+alerts) whose writers log every sample to a throwaway store, so the
+numbers include the columnar store writes. Latency is from a chunk
+being read off the socket to its samples being published. CPU is the
+process time of the endpoint over the wall time, so 100% is one core.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from data.store import StoreWriter, TimeSeriesStore, press_root
+from utils.acquisition import Sampler
+from utils.data_generator import press_ids
+from utils.ingest import IngestServer
+from utils.perf import REGISTRY
+
+# Seconds to wait for the queue to drain once the generator is done
+DRAIN_TIMEOUT = 30
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--presses', type=int, default=3)
+    parser.add_argument('--rate', type=float, default=2000, help="samples per second per press, 0 for no limit")
+    parser.add_argument('--batch', type=int, default=100, help="samples per send")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--format', choices=['line', 'binary'], default='line')
+    parser.add_argument('--transport', choices=['tcp', 'udp'], default='tcp')
+    parser.add_argument('--port', type=int, default=8095)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        samplers = {
+            press: Sampler(press, writer=StoreWriter(TimeSeriesStore(press_root(press, root)), interval=0))
+            for press in press_ids(args.presses)
+        }
+        server = IngestServer(samplers, '127.0.0.1', args.port).start()
+        load = subprocess.Popen(
+            [sys.executable, '-m', 'utils.ingest_load', '--port', str(args.port), '--presses', str(args.presses),
+             '--rate', str(args.rate), '--batch', str(args.batch), '--seconds', str(args.seconds),
+             '--format', args.format, '--transport', args.transport],
+            stdout=subprocess.PIPE, text=True,
+        )
+        # The generator prints a line once its samples are made and it starts sending
+        load.stdout.readline()
+        wall, cpu = time.perf_counter(), time.process_time()
+        report = load.communicate()[0].strip()
+        sent = int(report.split()[1])
+        # Wait for the queue to drain; UDP datagrams dropped on the way never arrive
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while server.samples + server.unknown < sent and time.monotonic() < deadline:
+            ingested = server.samples
+            time.sleep(0.5)
+            if server.samples == ingested:
+                break
+        wall, cpu = server.published - wall, time.process_time() - cpu
+        server.stop()
+        for sampler in samplers.values():
+            sampler.stop()
+        stored = sum(len(sampler.writer.store.read('1970-01-01', '2100-01-01', ['ram_pressure']))
+                     for sampler in samplers.values())
+
+    latencies = np.array(server.latencies) * 1000
+    print(report)
+    print(f"ingested {server.samples:,} samples in {wall:.2f} s ({server.samples / wall:,.0f} samples/s), "
+          f"{stored:,} stored")
+    print(f"dropped {server.dropped} datagrams, {server.malformed} malformed, {server.unknown} for unknown presses")
+    print(f"latency p50 {np.percentile(latencies, 50):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms, "
+          f"max {latencies.max():.1f} ms")
+    batch = REGISTRY.timings().set_index('section').loc['ingest.batch']
+    print(f"batches {batch['calls']}: p50 {batch['p50_ms']:.1f} ms, p95 {batch['p95_ms']:.1f} ms")
+    print(f"CPU {100 * cpu / wall:.0f}% of one core")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Poll rate and CPU cost of the PLC adapter against the local simulator.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_plc                  # one press at 100 Hz for 10 s
+    python -m benchmarks.bench_plc --presses 4 --rate 200
+
+The simulator runs as a separate process, as a real PLC would be, and
+the adapters publish into real Samplers (buffers, control charts,
+anomaly detector and alerts) without their generator threads. CPU is
+the process time of this process over the wall time, so 100% is one
+core.
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from utils.acquisition import Sampler
+from utils.data_generator import press_ids
+from utils.perf import REGISTRY
+from utils.plc import PLCAdapter, PLCPoller
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--presses', type=int, default=1)
+    parser.add_argument('--rate', type=float, default=100, help="polls per second per press")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5021)
+    args = parser.parse_args()
+
+    simulator = subprocess.Popen(
+        [sys.executable, '-m', 'utils.plc_simulator', '--port', str(args.port),
+         '--presses', str(args.presses), '--rate', str(args.rate)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        # The simulator prints its endpoints once it is listening
+        simulator.stdout.readline()
+        simulator.stdout.readline()
+        samplers = [Sampler(press) for press in press_ids(args.presses)]
+        adapters = [PLCAdapter(sampler, '127.0.0.1', args.port, unit, args.rate)
+                    for unit, sampler in enumerate(samplers, start=1)]
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        poller = PLCPoller(adapters).start()
+        time.sleep(args.seconds)
+        poller.stop()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        simulator.terminate()
+        simulator.wait()
+
+    for adapter in adapters:
+        print(f"{adapter.sampler.press}  {adapter.polls / wall:>7.1f} polls/s  {adapter.errors} errors  "
+              f"{len(adapter.sampler.buffer)} samples buffered")
+    publish = REGISTRY.timings().set_index('section').loc['plc.publish']
+    print(f"publish per batch: p50 {publish['p50_ms']:.2f} ms, p95 {publish['p95_ms']:.2f} ms")
+    print(f"CPU {100 * cpu / wall:.0f}% of one core for {args.presses} press(es) at {args.rate:g} Hz")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Time a retention purge of a long store while a dashboard keeps reading it.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_retention                     # a year at 1 Hz, keep 30 days
+    python -m benchmarks.bench_retention --days 90 --retention-days 7
+
+The store is filled with a day of random values per partition, written
+through TimeSeriesStore.append, in a temporary directory. A reader thread
+reads the last hour every 50 ms, as a Live page rerun does, before and
+during the purge, so the read latencies show whether the purge stalls
+reruns.
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.retention import RetentionEngine
+from data.store import TimeSeriesStore
+from utils.data_generator import LIVE_SIGNALS, QUALITY_SIGNALS
+
+
+def fill(store, days, freq, rng):
+    """Append days of history ending now, one partition per day"""
+    end = pd.Timestamp.now().floor('D') + pd.Timedelta(days=1)
+    columns = LIVE_SIGNALS + QUALITY_SIGNALS
+    for start in pd.date_range(end=end, periods=days + 1, freq='D')[:-1]:
+        index = pd.date_range(start, start + pd.Timedelta(days=1), freq=freq, inclusive='left', name='timestamp')
+        store.append(pd.DataFrame(rng.random((len(index), len(columns))), index=index, columns=columns))
+
+
+def read_latencies(store, stopped, latencies):
+    while not stopped.is_set():
+        now = pd.Timestamp.now()
+        began = time.perf_counter()
+        store.read(now - pd.Timedelta(hours=1), now, LIVE_SIGNALS)
+        latencies.append(time.perf_counter() - began)
+        stopped.wait(0.05)
+
+
+def summary(latencies):
+    values = np.array(latencies) * 1000
+    return f"{len(values)} reads, p50 {np.percentile(values, 50):.1f} ms, max {values.max():.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--freq', default='1s', help="sample period, e.g. 1s or 100ms")
+    parser.add_argument('--retention-days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench-retention-')
+    try:
+        store = TimeSeriesStore(root, retention_days=args.retention_days)
+        began = time.perf_counter()
+        fill(store, args.days, args.freq, np.random.default_rng(args.seed))
+        partitions = len(store.partitions())
+        print(f"Wrote {partitions} partitions, {store.size_bytes() / 1e9:.2f} GB in {time.perf_counter() - began:.1f} s")
+
+        stopped = threading.Event()
+        baseline, during = [], []
+        reader = threading.Thread(target=read_latencies, args=(store, stopped, baseline))
+        reader.start()
+        time.sleep(2)
+        stopped.set()
+        reader.join()
+
+        stopped.clear()
+        reader = threading.Thread(target=read_latencies, args=(store, stopped, during))
+        reader.start()
+        report = RetentionEngine({'bench': store}).purge()
+        stopped.set()
+        reader.join()
+
+        dropped = partitions - len(store.partitions())
+        print(f"Purged {dropped} partitions, {report.reclaimed['bench'] / 1e9:.2f} GB reclaimed "
+              f"in {report.seconds:.2f} s ({dropped / report.seconds:,.0f} partitions/s)")
+        print(f"Reads before the purge: {summary(baseline)}")
+        print(f"Reads during the purge: {summary(during)}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Write synthetic press history for scale testing, in bounded-memory chunks.
+
+Run from the repository root:
+
+    # 90 days at 1 Hz for three presses into the live store (23M rows)
+    python -m benchmarks.generate_history --days 90 --presses 3 --store data/timeseries
+
+    # a year at 10 Hz for four presses as Parquet (1.26 billion rows)
+    python -m benchmarks.generate_history --days 365 --freq 100ms --presses 4 --parquet /data/history
+
+The history ends now, so the pages show it as recent data. Each chunk is
+written before the next one is generated, so memory stays flat at any
+row count. The same --seed, --freq and --chunk-rows always produce the
+same data.
+
+The store keeps float columns only, so the process, material and operator
+categories are written to Parquet but not to the store. Each press gets
+its own store under ``<store>/<press id>``, as the live samplers do. Keep
+--days within the store's retention, or the retention engine will drop
+the older partitions at its next pass.
+
+Point the Historical Analysis page at a Parquet output with the
+STREAMLET_HISTORY_PARQUET environment variable.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from data.store import TimeSeriesStore, press_root
+from utils.data_generator import HISTORY_CHUNK_ROWS, LIVE_SIGNALS, QUALITY_SIGNALS, iter_history_chunks
+
+
+def store_sink(root):
+    """Return a chunk writer that appends the numeric columns to a TimeSeriesStore per press"""
+    stores = {}
+
+    def write(press, frame):
+        if press not in stores:
+            stores[press] = TimeSeriesStore(press_root(press, root))
+        return stores[press].append(frame[LIVE_SIGNALS + QUALITY_SIGNALS])
+
+    return write, lambda: None
+
+
+def parquet_sink(directory, compression):
+    """Return a chunk writer for a hive-partitioned dataset, one file per press"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writers = {}
+
+    def write(press, frame):
+        table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+        if press not in writers:
+            path = os.path.join(directory, f'press={press}', 'history.parquet')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writers[press] = pq.ParquetWriter(path, table.schema, compression=compression)
+        writers[press].write_table(table)
+        return table.num_rows
+
+    def close():
+        for writer in writers.values():
+            writer.close()
+
+    return write, close
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=float, default=30, help="days of history ending now")
+    parser.add_argument('--freq', default='1s', help="sample period, e.g. 1s or 100ms")
+    parser.add_argument('--presses', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=HISTORY_CHUNK_ROWS)
+    sink = parser.add_mutually_exclusive_group(required=True)
+    sink.add_argument('--store', metavar='ROOT', help="append to a TimeSeriesStore at ROOT")
+    sink.add_argument('--parquet', metavar='DIR', help="write a Parquet dataset under DIR")
+    parser.add_argument('--compression', default='snappy', help="Parquet compression codec")
+    args = parser.parse_args()
+
+    end = pd.Timestamp.now().floor(args.freq)
+    start = end - pd.Timedelta(days=args.days)
+    if args.store:
+        write, close = store_sink(args.store)
+    else:
+        write, close = parquet_sink(args.parquet, args.compression)
+
+    began = time.perf_counter()
+    total = 0
+    try:
+        for press, frame in iter_history_chunks(start, end, args.freq, args.presses, args.seed, args.chunk_rows):
+            total += write(press, frame)
+            elapsed = time.perf_counter() - began
+            print(f"{press} {frame.index[-1]:%Y-%m-%d %H:%M}  {total:>14,} rows  {total / elapsed:>12,.0f} rows/s", flush=True)
+    finally:
+        close()
+    print(f"Wrote {total:,} rows in {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Cold import time of the app and every page, with an optional budget check.
+
+Run from the repository root:
+
+    python -m benchmarks.import_profile            # profile every page
+    python -m benchmarks.import_profile --check    # exit 1 if a page is over budget
+
+Each page's module-level imports are executed in a fresh interpreter,
+which is what a cold start or the first switch to a page pays before any
+of its code runs. The slowest top-level modules are listed from Python's
+``-X importtime`` trace. The budget defaults to IMPORT_BUDGET seconds and
+can be set with --budget or the STREAMLET_IMPORT_BUDGET environment
+variable, since panel PCs and CI machines differ.
+"""
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds a page's imports may take in a fresh interpreter
+IMPORT_BUDGET = float(os.environ.get('STREAMLET_IMPORT_BUDGET', 2.0))
+
+# Cold runs per page; the fastest is reported to damp disk cache noise
+REPEATS = 3
+
+TOP_MODULES = 6
+
+
+def page_files():
+    return ['app.py'] + sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+
+def module_imports(path):
+    """Return the source of a file's module-level import statements"""
+    with open(os.path.join(ROOT, path)) as handle:
+        tree = ast.parse(handle.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def cold_import(source):
+    """Time the import statements in a fresh interpreter; returns seconds and -X importtime lines"""
+    timed = (
+        'import time\n'
+        '_start = time.perf_counter()\n'
+        f'{source}\n'
+        'print(time.perf_counter() - _start)\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', timed],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr.splitlines()
+
+
+def slowest_modules(trace, limit=TOP_MODULES):
+    """Return (cumulative seconds, module) of the slowest top-level imports in a trace"""
+    entries = []
+    for line in trace:
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  ') or not cumulative.strip().isdigit():
+            continue
+        entries.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--check', action='store_true', help="exit with status 1 if a page exceeds the budget")
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET, help="seconds allowed per page")
+    args = parser.parse_args()
+
+    over = []
+    for page in page_files():
+        runs = [cold_import(module_imports(page)) for _ in range(REPEATS)]
+        elapsed, trace = min(runs, key=lambda run: run[0])
+        status = 'OK' if elapsed <= args.budget else 'OVER'
+        print(f"{page:<36} {elapsed * 1000:>8.0f}ms  {status}")
+        for seconds, module in slowest_modules(trace):
+            print(f"    {seconds * 1000:>8.0f}ms  {module}")
+        if elapsed > args.budget:
+            over.append(page)
+
+    if args.check:
+        if over:
+            print(f"Over the {args.budget:g}s import budget: {', '.join(over)}")
+            sys.exit(1)
+        print(f"All pages within the {args.budget:g}s import budget")
+
+
+if __name__ == '__main__':
+    main()
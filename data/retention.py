@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date
+
+import pandas as pd
+
+from utils.perf import count, timed
+
+# Seconds between scheduled retention passes
+RETENTION_INTERVAL = float(os.environ.get('STREAMLET_RETENTION_INTERVAL', 3600))
+
+# Outcome of one pass: when it finished, how long it took, and bytes reclaimed per press
+PurgeReport = namedtuple('PurgeReport', ['finished', 'seconds', 'reclaimed'])
+
+
+class RetentionEngine:
+    """Enforces each store's retention_days on a background thread.
+
+    A pass runs at start-up, every ``interval`` seconds and whenever one is
+    requested, e.g. from the Purge button, which returns at once. Stores
+    drop whole day partitions, so a pass costs one rename and one removal
+    per expired day however many rows they hold, and it never runs on the
+    sampling or script threads.
+    """
+
+    def __init__(self, stores, interval=RETENTION_INTERVAL):
+        self.stores = dict(stores)
+        self.interval = interval
+        self.last = None
+        self.reclaimed = 0
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+        self._running = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='retention', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._requested.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def request(self):
+        """Ask for a pass now, without waiting for it"""
+        self._requested.set()
+
+    @property
+    def running(self):
+        return self._running.is_set() or self._requested.is_set()
+
+    def purge(self, today=None):
+        """Drop the partitions of every store that fall outside its retention, returning a PurgeReport"""
+        today = date.today() if today is None else today
+        with self._lock, timed('retention.purge'):
+            began = time.perf_counter()
+            reclaimed = {press: store.enforce_retention(today) for press, store in self.stores.items()}
+            report = PurgeReport(pd.Timestamp.now(), time.perf_counter() - began, reclaimed)
+        self.reclaimed += sum(reclaimed.values())
+        count('retention.bytes', sum(reclaimed.values()))
+        self.last = report
+        return report
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._running.set()
+            self._requested.clear()
+            try:
+                self.purge()
+            except OSError:
+                count('retention.errors')
+            finally:
+                self._running.clear()
+            self._requested.wait(self.interval)
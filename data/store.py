@@ -0,0 +1,307 @@
+import os
+import shutil
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Default location of the on-disk store, overridable per deployment
+DEFAULT_ROOT = os.environ.get(
+    'STREAMLET_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'timeseries')
+)
+
+TIMESTAMP_FILE = 'timestamp.bin'
+COLUMN_SUFFIX = '.bin'
+PARTITION_FORMAT = '%Y-%m-%d'
+# Expired partitions are moved here before they are deleted
+TRASH_DIR = '.purge'
+NS_PER_DAY = 86400 * 10**9
+
+
+def press_root(press, root=DEFAULT_ROOT):
+    """Return the store directory of one press; presses never share partitions"""
+    return os.path.join(root, press)
+
+
+class TimeSeriesStore:
+    """Append-only columnar store partitioned by day.
+
+    Each day is a directory holding one raw file per column: int64
+    nanosecond timestamps in ``timestamp.bin`` and float64 values in
+    ``<signal>.bin``. Appends extend the files in place and range reads
+    only open the partitions that overlap the requested window, using a
+    binary search on the timestamps to find the rows.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, retention_days=90):
+        self.root = root
+        self.retention_days = retention_days
+        self._last_timestamp = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    # -------------------- partitions --------------------
+    def partitions(self):
+        """Return the dates of all partitions, oldest first"""
+        days = []
+        for name in os.listdir(self.root):
+            try:
+                days.append(datetime.strptime(name, PARTITION_FORMAT).date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def partition_path(self, day):
+        return os.path.join(self.root, day.strftime(PARTITION_FORMAT))
+
+    def partition_size(self, day):
+        """Return the bytes used by one partition"""
+        path = self.partition_path(day)
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+    def size_bytes(self):
+        return sum(self.partition_size(day) for day in self.partitions())
+
+    def columns(self, day):
+        """Return the signal columns stored in a partition"""
+        return sorted(
+            name[:-len(COLUMN_SUFFIX)] for name in os.listdir(self.partition_path(day))
+            if name.endswith(COLUMN_SUFFIX) and name != TIMESTAMP_FILE
+        )
+
+    # -------------------- writes --------------------
+    def append(self, frame):
+        """Append a DataFrame indexed by timestamp, one batch per partition"""
+        if frame.empty:
+            return 0
+        frame = frame.sort_index()
+        stamps = frame.index.as_unit('ns').asi8
+        day_numbers = stamps // NS_PER_DAY
+        boundaries = np.flatnonzero(np.diff(day_numbers)) + 1
+        starts = np.concatenate(([0], boundaries))
+        stops = np.concatenate((boundaries, [len(stamps)]))
+
+        written = 0
+        for start, stop in zip(starts, stops):
+            day = (datetime(1970, 1, 1) + timedelta(days=int(day_numbers[start]))).date()
+            written += self._append_partition(day, stamps[start:stop], frame.iloc[start:stop])
+        return written
+
+    def _append_partition(self, day, stamps, frame):
+        path = self.partition_path(day)
+        os.makedirs(path, exist_ok=True)
+
+        # Keep each partition strictly increasing so reads can bisect it
+        last = self._partition_last_timestamp(day)
+        if last is not None:
+            keep = stamps > last
+            stamps, frame = stamps[keep], frame[keep]
+        if len(stamps) == 0:
+            return 0
+
+        # Columns first, timestamps last: readers never see rows whose
+        # values have not been written yet
+        rows_before = self._row_count(day)
+        for name in frame.columns:
+            column_path = os.path.join(path, name + COLUMN_SUFFIX)
+            if not os.path.exists(column_path) and rows_before:
+                np.full(rows_before, np.nan).tofile(column_path)
+            with open(column_path, 'ab') as f:
+                frame[name].to_numpy(dtype=np.float64).tofile(f)
+        # Columns this batch lacks are padded so every file stays row-aligned
+        if rows_before:
+            for name in set(self.columns(day)) - set(frame.columns):
+                with open(os.path.join(path, name + COLUMN_SUFFIX), 'ab') as f:
+                    np.full(len(stamps), np.nan).tofile(f)
+        with open(os.path.join(path, TIMESTAMP_FILE), 'ab') as f:
+            stamps.astype(np.int64).tofile(f)
+
+        self._last_timestamp[day] = int(stamps[-1])
+        return len(stamps)
+
+    def _row_count(self, day):
+        ts_path = os.path.join(self.partition_path(day), TIMESTAMP_FILE)
+        try:
+            return os.path.getsize(ts_path) // 8
+        except FileNotFoundError:
+            return 0
+
+    def _partition_last_timestamp(self, day):
+        if day not in self._last_timestamp:
+            rows = self._row_count(day)
+            if rows == 0:
+                return None
+            ts_path = os.path.join(self.partition_path(day), TIMESTAMP_FILE)
+            last = np.fromfile(ts_path, dtype=np.int64, offset=(rows - 1) * 8, count=1)
+            self._last_timestamp[day] = int(last[0])
+        return self._last_timestamp[day]
+
+    # -------------------- reads --------------------
+    def read(self, start, end, columns=None):
+        """Return the rows with start <= timestamp <= end as a DataFrame"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        lo, hi = start.as_unit('ns').value, end.as_unit('ns').value
+        days = [d for d in self.partitions() if start.date() <= d <= end.date()]
+        if columns is None:
+            columns = sorted({name for day in days for name in self.columns(day)})
+        columns = list(columns)
+
+        # Bisect each partition's timestamps, then read every column
+        # straight into one preallocated block
+        spans, stamps = [], []
+        for day in days:
+            rows = self._row_count(day)
+            if rows == 0:
+                continue
+            path = self.partition_path(day)
+            try:
+                ts = np.memmap(os.path.join(path, TIMESTAMP_FILE), dtype=np.int64, mode='r', shape=(rows,))
+            except FileNotFoundError:
+                # Purged by retention since it was listed
+                continue
+            first = int(np.searchsorted(ts, lo, side='left'))
+            last = int(np.searchsorted(ts, hi, side='right'))
+            if first < last:
+                spans.append((path, first, last))
+                stamps.append(np.array(ts[first:last]))
+
+        total = sum(last - first for _, first, last in spans)
+        block = np.full((len(columns), total), np.nan)
+        offset = 0
+        for path, first, last in spans:
+            for row, name in enumerate(columns):
+                self._read_column(path, name, first, block[row, offset:offset + last - first])
+            offset += last - first
+
+        index = pd.DatetimeIndex(
+            np.concatenate(stamps).view('datetime64[ns]') if stamps else np.array([], dtype='datetime64[ns]'),
+            name='timestamp'
+        )
+        return pd.DataFrame(block.T, index=index, columns=columns, copy=False)
+
+    def _read_column(self, path, name, first, out):
+        """Fill out with rows [first, first + len(out)) of a column file"""
+        column_path = os.path.join(path, name + COLUMN_SUFFIX)
+        try:
+            with open(column_path, 'rb') as f:
+                f.seek(first * 8)
+                f.readinto(memoryview(out).cast('B'))
+        except FileNotFoundError:
+            return
+
+    # -------------------- retention --------------------
+    def drop_partitions_before(self, cutoff):
+        """Delete every partition older than cutoff, returning bytes reclaimed.
+
+        Whole partitions go, never rows, so the cost is one rename and one
+        directory removal per day. The expired partitions are all renamed
+        into the trash first, so reads stop seeing them at once, and are
+        deleted afterwards; a purge cut short leaves them in the trash for
+        the next one.
+        """
+        trash = os.path.join(self.root, TRASH_DIR)
+        os.makedirs(trash, exist_ok=True)
+        for day in self.partitions():
+            if day >= cutoff:
+                break
+            self._last_timestamp.pop(day, None)
+            name = day.strftime(PARTITION_FORMAT)
+            try:
+                os.rename(self.partition_path(day), os.path.join(trash, name))
+            except OSError:
+                # A partition of that day is still in the trash
+                shutil.rmtree(os.path.join(trash, name), ignore_errors=True)
+                os.rename(self.partition_path(day), os.path.join(trash, name))
+
+        reclaimed = 0
+        for entry in os.scandir(trash):
+            reclaimed += sum(item.stat().st_size for item in os.scandir(entry.path) if item.is_file())
+            shutil.rmtree(entry.path, ignore_errors=True)
+        return reclaimed
+
+    def enforce_retention(self, today=None):
+        """Drop the partitions that fall outside retention_days"""
+        today = date.today() if today is None else today
+        return self.drop_partitions_before(today - timedelta(days=self.retention_days))
+
+
+class StoreWriter:
+    """Batches samples for a TimeSeriesStore.
+
+    Samples closer together than the logging interval are skipped, and
+    the batch is written once it holds ``batch_size`` rows or is older
+    than ``max_delay`` seconds. Batches of samples from ``add_frame`` stay
+    columnar until they are written. Old partitions are dropped by the
+    retention engine, off the writing thread.
+    """
+
+    def __init__(self, store, interval=5, batch_size=600, max_delay=30):
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._rows = []
+        self._stamps = []
+        self._frames = []
+        self._pending = 0
+        self._last_logged = None
+        self._batch_started = None
+
+    def configure(self, interval=None, retention_days=None):
+        """Apply data_logging settings"""
+        if interval is not None:
+            self.interval = interval
+        if retention_days is not None:
+            self.store.retention_days = retention_days
+
+    def add(self, timestamp, record):
+        """Queue one sample, keeping only numeric fields"""
+        timestamp = pd.Timestamp(timestamp)
+        if self._last_logged is not None and (timestamp - self._last_logged).total_seconds() < self.interval:
+            return
+        self._last_logged = timestamp
+        self._stamps.append(timestamp)
+        self._rows.append({
+            name: value for name, value in record.items()
+            if isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+        })
+        self._queued(1)
+
+    def add_frame(self, frame):
+        """Queue a batch of samples indexed by timestamp, keeping the first of each logging interval"""
+        frame = frame.select_dtypes('number').sort_index()
+        stamps = frame.index.as_unit('ns').asi8
+        last = None if self._last_logged is None else self._last_logged.as_unit('ns').value
+        step = int(self.interval * 1e9)
+        if step > 0:
+            slots = stamps // step
+            keep = np.concatenate(([True], slots[1:] != slots[:-1])) if len(slots) else slots.astype(bool)
+            if last is not None:
+                keep &= slots > last // step
+        else:
+            keep = np.ones(len(stamps), dtype=bool) if last is None else stamps > last
+        frame = frame[keep]
+        if frame.empty:
+            return
+        self._last_logged = frame.index[-1]
+        self._frames.append(frame)
+        self._queued(len(frame))
+
+    def _queued(self, rows):
+        self._pending += rows
+        if self._batch_started is None:
+            self._batch_started = time.monotonic()
+        if self._pending >= self.batch_size or time.monotonic() - self._batch_started >= self.max_delay:
+            self.flush()
+
+    def flush(self):
+        """Write the pending batch to the store"""
+        if not self._pending:
+            return 0
+        frames = self._frames
+        if self._rows:
+            frames = [pd.DataFrame(self._rows, index=pd.DatetimeIndex(self._stamps, name='timestamp'))] + frames
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames)
+        self._rows, self._stamps, self._frames, self._pending, self._batch_started = [], [], [], 0, None
+        return self.store.append(frame)
@@ -3,17 +3,31 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import os
 from datetime import datetime, timedelta
 from plotly.subplots import make_subplots
+from utils.acquisition import PRESSES, PressShards, select_press
+from utils.analysis import ANALYSES, CORRELATION_COLUMNS
+from utils.anomaly import detect, flagged
+from utils.downsample import downsample_frame, downsample_xy
+from utils.export import EXPORT_FORMATS, export_file_name, export_frame, export_mime, format_available, rows_fit
+from utils.perf import count, laps
+from utils.plot_utils import render_mode, scatter_trace
+from utils.query import HistoryIndex
+from utils.rollups import GRAINS, RollupTable
 
 st.set_page_config(layout="wide")
 st.title("📈 Historical Data Analysis")
 
+# Rerun sections are timed into the process-wide registry (System Settings > Performance)
+count('historical.reruns')
+page_laps = laps('historical')
+
 # Generate historical data
-@st.cache_data
-def generate_historical_data(days=30):
-    """Generate historical extrusion data"""
-    np.random.seed(42)
+def generate_historical_data(days=30, press=PRESSES[0]):
+    """Generate historical extrusion data for one press"""
+    # A private generator per press, since presses are built in parallel
+    rng = np.random.RandomState(42 + PRESSES.index(press))
     
     # Generate timestamps for the last N days
     end_date = datetime.now()
@@ -26,83 +40,146 @@ def generate_historical_data(days=30):
     # Generate process data with trends
     data = {
         'timestamp': timestamps,
-        'process': np.random.choice(['Roll_Production', 'Profile_Ext', 'Tube_Ext'], hours),
-        'material': np.random.choice(['AL-6061', 'AL-7075', 'Copper'], hours),
-        'operator': np.random.choice(['OP01', 'OP02', 'OP03', 'Auto'], hours),
+        'process': rng.choice(['Roll_Production', 'Profile_Ext', 'Tube_Ext'], hours),
+        'material': rng.choice(['AL-6061', 'AL-7075', 'Copper'], hours),
+        'operator': rng.choice(['OP01', 'OP02', 'OP03', 'Auto'], hours),
         
         # Parameters with some correlation
-        'ram_pressure': 45 + np.cumsum(np.random.randn(hours) * 0.1),
-        'billet_pressure': 220 + np.cumsum(np.random.randn(hours) * 0.5),
-        'front_temp': 410 + np.sin(np.arange(hours) / 24) * 5 + np.random.randn(hours) * 2,
-        'ram_speed': np.abs(0.5 + np.random.randn(hours) * 0.2),
-        'extrusion_time': 120 + np.random.randn(hours) * 15,
-        'quality_score': 90 + np.random.randn(hours) * 3,
-        'defect_count': np.random.poisson(0.5, hours),
-        'product_length': 6000 + np.random.randn(hours) * 200
+        'ram_pressure': 45 + np.cumsum(rng.randn(hours) * 0.1),
+        'billet_pressure': 220 + np.cumsum(rng.randn(hours) * 0.5),
+        'front_temp': 410 + np.sin(np.arange(hours) / 24) * 5 + rng.randn(hours) * 2,
+        'ram_speed': np.abs(0.5 + rng.randn(hours) * 0.2),
+        'extrusion_time': 120 + rng.randn(hours) * 15,
+        'quality_score': 90 + rng.randn(hours) * 3,
+        'defect_count': rng.poisson(0.5, hours),
+        'product_length': 6000 + rng.randn(hours) * 200
     }
     
-    # Add some outliers
-    outlier_indices = np.random.choice(hours, size=hours//20, replace=False)
-    for idx in outlier_indices:
-        if np.random.rand() > 0.5:
-            data['front_temp'][idx] += np.random.uniform(10, 20)
-        else:
-            data['ram_pressure'][idx] += np.random.uniform(5, 15)
+    # Add some outliers, half to front temperature and half to RAM pressure
+    outlier_indices = rng.choice(hours, size=hours//20, replace=False)
+    to_temp = rng.rand(len(outlier_indices)) > 0.5
+    data['front_temp'][outlier_indices[to_temp]] += rng.uniform(10, 20, to_temp.sum())
+    data['ram_pressure'][outlier_indices[~to_temp]] += rng.uniform(5, 15, (~to_temp).sum())
     
-    df = pd.DataFrame(data)
+    return add_calendar_columns(pd.DataFrame(data))
+
+def add_calendar_columns(df):
     df['date'] = df['timestamp'].dt.date
     df['hour'] = df['timestamp'].dt.hour
     df['day_of_week'] = df['timestamp'].dt.day_name()
-    
     return df
 
-# Load data
-df = generate_historical_data(30)
+# Parquet dataset written by benchmarks.generate_history, used instead of
+# the built-in sample data when set (for scale testing)
+HISTORY_PARQUET = os.environ.get('STREAMLET_HISTORY_PARQUET')
+
+def parquet_presses(path):
+    """Return the presses of a Parquet history dataset from its press=<id> directories"""
+    return sorted(name.split('=', 1)[1] for name in os.listdir(path) if name.startswith('press='))
+
+def read_history_parquet(path, days=30, press=None):
+    """Read the last N days of one press from a Parquet history dataset"""
+    import pyarrow.dataset as ds
+
+    since = pd.Timestamp.now() - pd.Timedelta(days=days)
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    table = dataset.to_table(filter=(ds.field('press') == press) & (ds.field('timestamp') >= since))
+    return add_calendar_columns(table.drop_columns(['press']).to_pandas())
+
+# Signals aggregated into the hour, shift and day rollups
+ROLLUP_SIGNALS = [
+    'ram_pressure', 'billet_pressure', 'front_temp', 'ram_speed',
+    'extrusion_time', 'quality_score', 'defect_count', 'product_length'
+]
+
+# Signals scored by the anomaly detector
+ANOMALY_SIGNALS = ['ram_pressure', 'billet_pressure', 'front_temp', 'ram_speed', 'quality_score']
+
+def build_press_history(press, days=30):
+    """Index, rollup tables and anomaly scores of one press"""
+    if HISTORY_PARQUET:
+        history = HistoryIndex(read_history_parquet(HISTORY_PARQUET, days, press))
+    else:
+        history = HistoryIndex(generate_historical_data(days, press))
+    frame = history.frame
+    rollups = {grain: RollupTable(grain, ROLLUP_SIGNALS) for grain in GRAINS}
+    for table in rollups.values():
+        table.update(frame)
+    # Rolling median/MAD after removing the hour-of-day profile
+    anomalies = detect(frame, ANOMALY_SIGNALS, phase=frame['hour'].to_numpy())
+    return history, rollups, anomalies
+
+@st.cache_resource
+def load_press_histories(days=30):
+    """Start building every press's history in parallel, one shard per press"""
+    presses = parquet_presses(HISTORY_PARQUET) if HISTORY_PARQUET else PRESSES
+    return PressShards(presses, lambda press: build_press_history(press, days))
+
+# Load data; only the selected press has to be ready
+histories = load_press_histories(30)
+press = select_press(histories.presses)
+history, rollups, anomaly_scores = histories.get(press)
+page_laps.lap('load')
+
+# Cached analysis results; the least recently used are evicted beyond this
+ANALYSIS_CACHE_ENTRIES = 64
+
+@st.cache_data(max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def run_analysis(analysis, parameter, press, start, end, processes, materials, days=30):
+    """Run one analysis over the filtered history, cached per filter and parameter"""
+    count('historical.analysis_cache_misses')
+    history = load_press_histories(days).get(press)[0]
+    frame = history.select(start, end, process=list(processes), material=list(materials))
+    return ANALYSES[analysis](frame, parameter)
 
 # Sidebar filters
 st.sidebar.header("🔍 Analysis Filters")
 
 date_range = st.sidebar.date_input(
     "Date Range",
-    [df['date'].min(), df['date'].max()]
+    [history.start.date(), history.end.date()]
 )
+start_date = date_range[0]
+end_date = date_range[1] if len(date_range) > 1 else date_range[0]
 
 selected_process = st.sidebar.multiselect(
     "Process Type",
-    options=df['process'].unique(),
-    default=df['process'].unique()
+    options=history.categories('process'),
+    default=history.categories('process')
 )
 
 selected_material = st.sidebar.multiselect(
     "Material",
-    options=df['material'].unique(),
-    default=df['material'].unique()
+    options=history.categories('material'),
+    default=history.categories('material')
 )
 
 # Apply filters
-mask = (
-    (df['date'] >= date_range[0]) &
-    (df['date'] <= date_range[1]) &
-    (df['process'].isin(selected_process)) &
-    (df['material'].isin(selected_material))
-)
-
-filtered_df = df[mask].copy()
+range_start = pd.Timestamp(start_date)
+range_end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+selections = {'process': selected_process, 'material': selected_material}
+filtered_df = history.select(range_start, range_end, **selections)
+# Identifies the current filters in the analysis cache
+filter_key = (press, range_start, range_end, tuple(sorted(selected_process)), tuple(sorted(selected_material)))
+totals = rollups['day'].totals(range_start, range_end, **selections)
+page_laps.lap('filter')
 
 # Summary statistics
 st.subheader("📊 Summary Statistics")
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
-    st.metric("Total Records", len(filtered_df))
+    st.metric("Total Records", int(totals.loc['ram_pressure', 'count']))
 with col2:
-    st.metric("Avg RAM Pressure", f"{filtered_df['ram_pressure'].mean():.1f}")
+    st.metric("Avg RAM Pressure", f"{totals.loc['ram_pressure', 'mean']:.1f}")
 with col3:
-    st.metric("Avg Temperature", f"{filtered_df['front_temp'].mean():.1f}°C")
+    st.metric("Avg Temperature", f"{totals.loc['front_temp', 'mean']:.1f}°C")
 with col4:
-    st.metric("Avg Quality", f"{filtered_df['quality_score'].mean():.1f}%")
+    st.metric("Avg Quality", f"{totals.loc['quality_score', 'mean']:.1f}%")
 with col5:
-    st.metric("Total Defects", int(filtered_df['defect_count'].sum()))
+    st.metric("Total Defects", int(totals.loc['defect_count', 'sum']))
+
+page_laps.lap('summary')
 
 # Tabs for different analyses
 tab1, tab2, tab3, tab4 = st.tabs(["Trend Analysis", "Statistical Analysis", "Quality Analysis", "Export Data"])
@@ -116,37 +193,61 @@ with tab1:
     )
     
     # Create trend chart
+    trend_df = downsample_frame(filtered_df, 'timestamp', parameter, by='process')
     fig_trend = px.line(
-        filtered_df,
+        trend_df,
         x='timestamp',
         y=parameter,
         color='process',
+        render_mode=render_mode(len(trend_df)),
         title=f"{parameter.replace('_', ' ').title()} Trend",
         labels={parameter: parameter.replace('_', ' ').title()}
     )
     
     # Add moving average
     if st.checkbox("Show Moving Average (24h)"):
-        filtered_df['moving_avg'] = filtered_df[parameter].rolling(window=24, center=True).mean()
+        # A separate series: filtered_df is a slice of the cached history and is never written to
+        moving_avg = filtered_df[parameter].rolling(window=24, center=True).mean()
+        ma_x, ma_y = downsample_xy(filtered_df['timestamp'].to_numpy(), moving_avg.to_numpy())
         fig_trend.add_trace(
-            go.Scatter(
-                x=filtered_df['timestamp'],
-                y=filtered_df['moving_avg'],
+            scatter_trace(
+                x=ma_x,
+                y=ma_y,
                 name='24h Moving Average',
                 line=dict(color='black', width=3, dash='dash')
             )
         )
     
+    # Mark the points the detector flagged
+    if st.checkbox("Show Anomalies", value=True):
+        scores = anomaly_scores[parameter].to_numpy()[filtered_df.index]
+        outliers = filtered_df[flagged(scores)]
+        fig_trend.add_trace(
+            scatter_trace(
+                x=outliers['timestamp'],
+                y=outliers[parameter],
+                name=f'Anomalies ({len(outliers)})',
+                mode='markers',
+                marker=dict(color='red', size=9, symbol='x')
+            )
+        )
+    
+    page_laps.lap('trend.figure')
     st.plotly_chart(fig_trend, use_container_width=True)
+    page_laps.lap('trend.render')
     
     # Daily averages
     st.subheader("Daily Averages")
-    daily_avg = filtered_df.groupby('date').agg({
-        'ram_pressure': 'mean',
-        'front_temp': 'mean',
-        'quality_score': 'mean',
-        'defect_count': 'sum'
-    }).reset_index()
+    rollup_grain = st.radio("Aggregation", ["day", "shift", "hour"], horizontal=True,
+                            format_func=str.title)
+    rollup = rollups[rollup_grain].query(range_start, range_end, **selections)
+    daily_avg = pd.DataFrame({
+        'date': rollup.index,
+        'ram_pressure': rollup['ram_pressure']['mean'].to_numpy(),
+        'front_temp': rollup['front_temp']['mean'].to_numpy(),
+        'quality_score': rollup['quality_score']['mean'].to_numpy(),
+        'defect_count': rollup['defect_count']['sum'].to_numpy()
+    })
     
     fig_daily = make_subplots(
         rows=2, cols=1,
@@ -155,7 +256,7 @@ with tab1:
     )
     
     fig_daily.add_trace(
-        go.Scatter(
+        scatter_trace(
             x=daily_avg['date'],
             y=daily_avg['ram_pressure'],
             name='RAM Pressure',
@@ -165,7 +266,7 @@ with tab1:
     )
     
     fig_daily.add_trace(
-        go.Scatter(
+        scatter_trace(
             x=daily_avg['date'],
             y=daily_avg['front_temp'],
             name='Front Temp',
@@ -176,7 +277,7 @@ with tab1:
     )
     
     fig_daily.add_trace(
-        go.Scatter(
+        scatter_trace(
             x=daily_avg['date'],
             y=daily_avg['quality_score'],
             name='Quality Score',
@@ -201,7 +302,9 @@ with tab1:
     fig_daily.update_yaxes(title_text="Quality Score", row=2, col=1)
     fig_daily.update_yaxes(title_text="Defect Count", row=2, col=1, secondary_y=True)
     
+    page_laps.lap('daily.figure')
     st.plotly_chart(fig_daily, use_container_width=True)
+    page_laps.lap('daily.render')
 
 with tab2:
     st.subheader("Statistical Analysis")
@@ -215,17 +318,34 @@ with tab2:
             ['ram_pressure', 'front_temp', 'quality_score', 'ram_speed']
         )
         
-        fig_dist = px.histogram(
-            filtered_df,
-            x=param_dist,
-            nbins=30,
+        dist = run_analysis('histogram', param_dist, *filter_key)
+        edges = dist['edges']
+        box = dist['box']
+        fig_dist = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+        fig_dist.add_trace(go.Box(
+            q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+            lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+            y=[param_dist], orientation='h', showlegend=False, marker_color='#636efa'
+        ), row=1, col=1)
+        fig_dist.add_trace(go.Scatter(
+            x=box['outliers'], y=[param_dist] * len(box['outliers']), mode='markers',
+            showlegend=False, marker=dict(color='#636efa', size=4)
+        ), row=1, col=1)
+        fig_dist.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2, y=dist['counts'], width=np.diff(edges),
+            showlegend=False, marker_color='#636efa'
+        ), row=2, col=1)
+        fig_dist.update_layout(
             title=f"Distribution of {param_dist.replace('_', ' ').title()}",
-            marginal="box"
+            bargap=0
         )
+        fig_dist.update_yaxes(showticklabels=False, row=1, col=1)
+        fig_dist.update_yaxes(title_text="count", row=2, col=1)
+        fig_dist.update_xaxes(title_text=param_dist, row=2, col=1)
         
-        # Add mean and std lines
-        mean_val = filtered_df[param_dist].mean()
-        std_val = filtered_df[param_dist].std()
+        # Add mean and std lines, merged from the daily rollup partials
+        mean_val = totals.loc[param_dist, 'mean']
+        std_val = totals.loc[param_dist, 'std']
         
         fig_dist.add_vline(
             x=mean_val,
@@ -242,7 +362,9 @@ with tab2:
             annotation_text="±1σ"
         )
         
+        page_laps.lap('dist.figure')
         st.plotly_chart(fig_dist, use_container_width=True)
+        page_laps.lap('dist.render')
     
     with col2:
         # Box plots
@@ -251,18 +373,28 @@ with tab2:
             ['process', 'material', 'day_of_week']
         )
         
-        fig_box = px.box(
-            filtered_df,
-            x=category,
-            y='quality_score',
-            title=f"Quality Score by {category.replace('_', ' ').title()}"
+        fig_box = go.Figure()
+        for name, stats in run_analysis('box', category, *filter_key).items():
+            fig_box.add_trace(go.Box(
+                x=[name], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+                lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+                name=str(name), marker_color='#636efa', showlegend=False
+            ))
+            fig_box.add_trace(go.Scatter(
+                x=[name] * len(stats['outliers']), y=stats['outliers'], mode='markers',
+                marker=dict(color='#636efa', size=4), showlegend=False
+            ))
+        fig_box.update_layout(
+            title=f"Quality Score by {category.replace('_', ' ').title()}",
+            xaxis_title=category, yaxis_title='quality_score'
         )
+        page_laps.lap('box.figure')
         st.plotly_chart(fig_box, use_container_width=True)
+        page_laps.lap('box.render')
         
         # Correlation matrix
         if st.checkbox("Show Correlation Matrix"):
-            numeric_cols = ['ram_pressure', 'front_temp', 'ram_speed', 'quality_score', 'extrusion_time']
-            corr_matrix = filtered_df[numeric_cols].corr()
+            corr_matrix = run_analysis('correlation', CORRELATION_COLUMNS, *filter_key)
             
             fig_corr = px.imshow(
                 corr_matrix,
@@ -271,7 +403,9 @@ with tab2:
                 title="Correlation Matrix",
                 color_continuous_scale='RdBu'
             )
+            page_laps.lap('corr.figure')
             st.plotly_chart(fig_corr, use_container_width=True)
+            page_laps.lap('corr.render')
 
 with tab3:
     st.subheader("Quality & Defect Analysis")
@@ -280,44 +414,79 @@ with tab3:
     
     with col1:
         # Defects by material
-        defect_by_material = filtered_df.groupby('material')['defect_count'].sum().reset_index()
+        defect_by_material = rollups['day'].query(
+            range_start, range_end, by='material', **selections
+        )['defect_count'][['sum']].rename(columns={'sum': 'defect_count'}).reset_index()
         fig_defects = px.pie(
             defect_by_material,
             values='defect_count',
             names='material',
             title="Defects by Material"
         )
+        page_laps.lap('defects.figure')
         st.plotly_chart(fig_defects, use_container_width=True)
+        page_laps.lap('defects.render')
     
     with col2:
         # Quality trend
+        quality_df = downsample_frame(filtered_df, 'timestamp', 'quality_score', by='process')
         fig_quality = px.line(
-            filtered_df,
+            quality_df,
             x='timestamp',
             y='quality_score',
             color='process',
+            render_mode=render_mode(len(quality_df)),
             title="Quality Score Trend by Process"
         )
+        page_laps.lap('quality.figure')
         st.plotly_chart(fig_quality, use_container_width=True)
+        page_laps.lap('quality.render')
     
     # Scatter plot: Pressure vs Quality
     st.subheader("Process Parameter vs Quality")
     
-    x_param = st.selectbox(
-        "X-axis Parameter",
-        ['ram_pressure', 'front_temp', 'ram_speed', 'extrusion_time'],
-        key='x_param'
-    )
+    col1, col2 = st.columns(2)
+    with col1:
+        x_param = st.selectbox(
+            "X-axis Parameter",
+            ['ram_pressure', 'front_temp', 'ram_speed', 'extrusion_time'],
+            key='x_param'
+        )
+    with col2:
+        trend_model = st.radio("Trend Model", ["Linear (OLS)", "LOWESS"], horizontal=True)
     
     fig_scatter = px.scatter(
         filtered_df,
         x=x_param,
         y='quality_score',
         color='process',
-        trendline="ols",
+        render_mode=render_mode(len(filtered_df)),
         title=f"{x_param.replace('_', ' ').title()} vs Quality Score"
     )
+    
+    # Trend per process, drawn as a plain line in the color of its points
+    colors = {trace.name: trace.marker.color for trace in fig_scatter.data}
+    if trend_model == "LOWESS":
+        for process, (curve_x, curve_y) in run_analysis('lowess', x_param, *filter_key).items():
+            fig_scatter.add_trace(go.Scatter(
+                x=curve_x, y=curve_y, mode='lines', name=f"{process} trend",
+                line=dict(color=colors.get(str(process))), showlegend=False
+            ))
+    else:
+        for fit in run_analysis('trendline', x_param, *filter_key).itertuples(index=False):
+            fit_x = np.array([fit.x_min, fit.x_max])
+            fig_scatter.add_trace(go.Scatter(
+                x=fit_x,
+                y=fit.intercept + fit.slope * fit_x,
+                mode='lines',
+                name=f"{fit.process} trend",
+                line=dict(color=colors.get(str(fit.process))),
+                hovertemplate=f"quality_score = {fit.slope:.4g} * {x_param} + {fit.intercept:.4g}<br>R² = {fit.r2:.3f}<extra></extra>",
+                showlegend=False
+            ))
+    page_laps.lap('scatter.figure')
     st.plotly_chart(fig_scatter, use_container_width=True)
+    page_laps.lap('scatter.render')
 
 with tab4:
     st.subheader("Data Export")
@@ -329,27 +498,37 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
-        export_format = st.selectbox("Export Format", ["CSV", "Excel"])
+        export_format = st.selectbox("Export Format", list(EXPORT_FORMATS))
+        compression = st.selectbox(
+            "Compression",
+            EXPORT_FORMATS[export_format]['compression'],
+            format_func=lambda option: option or "none",
+            disabled=len(EXPORT_FORMATS[export_format]['compression']) == 1
+        )
         include_all = st.checkbox("Include all columns", value=True)
     
     with col2:
         st.write("")
         st.write("")
-        if st.button("📥 Download Data", use_container_width=True, type="primary"):
-            # Prepare data for download
-            export_df = filtered_df if include_all else filtered_df[['timestamp', 'process', 'material', 'ram_pressure', 'front_temp', 'quality_score']]
-            
-            if export_format == "CSV":
-                csv = export_df.to_csv(index=False)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name="extrusion_data.csv",
-                    mime="text/csv"
-                )
-            else:
-                # For Excel, you'd typically use BytesIO
-                st.info("Excel export requires additional setup. CSV export is recommended.")
+        export_df = filtered_df if include_all else filtered_df[['timestamp', 'process', 'material', 'ram_pressure', 'front_temp', 'quality_score']]
+        
+        if not format_available(export_format):
+            st.info(f"{export_format} export requires the "
+                    f"'{EXPORT_FORMATS[export_format]['module']}' package. CSV export is always available.")
+        elif not rows_fit(export_format, len(export_df)):
+            st.error(f"{len(export_df):,} rows exceed the {export_format} sheet limit; "
+                     "narrow the date range or export CSV or Parquet instead.")
+        else:
+            # The file is only encoded when the button is clicked
+            st.download_button(
+                label="📥 Download Data",
+                data=lambda: export_frame(export_df, export_format, compression),
+                file_name=export_file_name("extrusion_data", export_format, compression),
+                mime=export_mime(export_format, compression),
+                use_container_width=True,
+                type="primary"
+            )
+    page_laps.lap('export')
 
 # Insights section
 with st.expander("💡 Analysis Insights"):
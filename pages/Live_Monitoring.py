@@ -2,297 +2,394 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import numpy as np
-from datetime import datetime, timedelta
-import time
+from utils.acquisition import get_sampler, select_press, wait_for_press
+from utils.downsample import downsample_indices, downsample_xy
+from utils.perf import count, laps
+from utils.plot_utils import scatter_trace
+from utils.spc import SPC_SIGNALS, WE_RULES, run_chart
 
 st.set_page_config(layout="wide")
 st.title("📊 Live Process Monitoring")
 
-# Initialize session state for data
-if 'live_data' not in st.session_state:
-    st.session_state.live_data = pd.DataFrame()
-
-# Generate live data function
-def generate_live_data_points(num_points=60):
-    """Generate live data for visualization"""
-    np.random.seed(int(time.time()))
-    
-    timestamps = [datetime.now() - timedelta(seconds=i) for i in range(num_points, -1, -1)]
-    
-    # Generate realistic extrusion data
-    base_pressure = 48.7
-    base_temp = 410
-    base_speed = 0.5
-    
-    data = []
-    for i, ts in enumerate(timestamps):
-        # Add some trends and cycles
-        trend = np.sin(i / 10) * 2
-        cycle = np.sin(i / 5) * 1.5
-        
-        point = {
-            'timestamp': ts,
-            'ram_pressure': base_pressure + trend + np.random.randn() * 0.5,
-            'billet_pressure': 224.5 + trend * 10 + np.random.randn() * 3,
-            'front_temp': base_temp + cycle + np.random.randn() * 2,
-            'back_temp': base_temp - 5 + cycle + np.random.randn() * 2,
-            'oil_temp': 29.1 + np.random.randn() * 0.5,
-            'ram_speed': max(0, base_speed + np.random.randn() * 0.3),
-            'container_position': 450 + np.random.randn() * 1,
-            'sys_pressure': 3.0 + np.random.randn() * 0.1,
-            'pilot_pressure': 48.7 + np.random.randn() * 0.3
-        }
-        data.append(point)
-    
-    return pd.DataFrame(data)
-
-# Update live data
-st.session_state.live_data = generate_live_data_points()
+# Rerun sections are timed into the process-wide registry (System Settings > Performance)
+count('live.reruns')
+
+# Seconds between reruns of the live view while Auto Update is on, chosen per session
+REFRESH_RATES = {"1 sec": 1, "5 sec": 5, "10 sec": 10, "30 sec": 30}
 
 # Control panel
 st.sidebar.header("Monitoring Controls")
-sample_rate = st.sidebar.selectbox("Sample Rate", ["1 sec", "5 sec", "10 sec", "30 sec"], index=1)
+
+# All sessions read from the process-wide sampler of the selected press
+press = select_press()
+sampler = get_sampler(press)
+wait_for_press(press)
+
+# Only this session's refresh; the presses sample at the saved logging interval
+refresh_rate = st.sidebar.selectbox("Refresh Rate", list(REFRESH_RATES), index=1, key="refresh_rate")
+st.sidebar.caption(f"{press} samples every {sampler.interval:g} s "
+                   "(System Settings › Data Management)")
 history_points = st.sidebar.slider("History Points", 30, 300, 120)
 auto_update = st.sidebar.checkbox("Auto Update", value=True)
 
 if st.sidebar.button("Refresh Data"):
     st.rerun()
 
-# Display current values
-st.subheader("Current Values")
-col1, col2, col3, col4 = st.columns(4)
-current = st.session_state.live_data.iloc[-1]
-
-with col1:
-    st.metric("RAM Pressure", f"{current['ram_pressure']:.1f}")
-with col2:
-    st.metric("Front Temp", f"{current['front_temp']:.1f}°C")
-with col3:
-    st.metric("RAM Speed", f"{current['ram_speed']:.1f} mm/s")
-with col4:
-    st.metric("Billet Pressure", f"{current['billet_pressure']:.1f}")
-
-# Create tabs for different visualizations
-tab1, tab2, tab3 = st.tabs(["Pressure Monitoring", "Temperature Monitoring", "Combined View"])
-
-with tab1:
-    st.subheader("Pressure Trends")
-    
-    fig_pressure = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=('RAM & Billet Pressure', 'System Pressures'),
-        vertical_spacing=0.15
-    )
-    
-    # RAM and Billet Pressure
-    fig_pressure.add_trace(
-        go.Scatter(
-            x=st.session_state.live_data['timestamp'],
-            y=st.session_state.live_data['ram_pressure'],
-            name='RAM Pressure',
-            line=dict(color='blue', width=2),
-            mode='lines'
-        ),
-        row=1, col=1
-    )
-    
-    fig_pressure.add_trace(
-        go.Scatter(
-            x=st.session_state.live_data['timestamp'],
-            y=st.session_state.live_data['billet_pressure'],
-            name='Billet Pressure',
-            line=dict(color='red', width=2),
-            mode='lines',
-            yaxis="y2"
-        ),
-        row=1, col=1
-    )
-    
-    # System Pressures
-    fig_pressure.add_trace(
-        go.Scatter(
-            x=st.session_state.live_data['timestamp'],
-            y=st.session_state.live_data['sys_pressure'],
-            name='System Pressure',
-            line=dict(color='green', width=2),
-            mode='lines'
-        ),
-        row=2, col=1
-    )
-    
-    fig_pressure.add_trace(
-        go.Scatter(
-            x=st.session_state.live_data['timestamp'],
-            y=st.session_state.live_data['pilot_pressure'],
-            name='Pilot Pressure',
-            line=dict(color='orange', width=2),
-            mode='lines'
-        ),
-        row=2, col=1
-    )
-    
-    fig_pressure.update_layout(
-        height=600,
-        showlegend=True,
-        hovermode='x unified'
-    )
-    
-    # Add range sliders
-    fig_pressure.update_xaxes(rangeslider_visible=True, row=1, col=1)
-    fig_pressure.update_xaxes(rangeslider_visible=True, row=2, col=1)
-    
-    st.plotly_chart(fig_pressure, use_container_width=True)
-
-with tab2:
-    st.subheader("Temperature Trends")
-    
-    fig_temp = go.Figure()
-    
-    fig_temp.add_trace(go.Scatter(
-        x=st.session_state.live_data['timestamp'],
-        y=st.session_state.live_data['front_temp'],
-        name='Front Temperature',
-        line=dict(color='red', width=2)
-    ))
-    
-    fig_temp.add_trace(go.Scatter(
-        x=st.session_state.live_data['timestamp'],
-        y=st.session_state.live_data['back_temp'],
-        name='Back Temperature',
-        line=dict(color='orange', width=2)
-    ))
-    
-    fig_temp.add_trace(go.Scatter(
-        x=st.session_state.live_data['timestamp'],
-        y=st.session_state.live_data['oil_temp'],
-        name='Oil Temperature',
-        line=dict(color='blue', width=2),
-        yaxis="y2"
-    ))
-    
-    fig_temp.update_layout(
-        title="Temperature Monitoring",
-        yaxis=dict(title="Container Temperature (°C)"),
-        yaxis2=dict(
-            title="Oil Temperature (°C)",
-            overlaying="y",
-            side="right"
-        ),
-        height=500,
-        hovermode='x unified'
-    )
-    
-    fig_temp.add_hline(y=420, line_dash="dash", line_color="red", 
-                      annotation_text="Max Temp Limit", row=1, col=1)
-    
-    st.plotly_chart(fig_temp, use_container_width=True)
-
-with tab3:
-    st.subheader("Combined Process View")
-    
-    # Create gauge charts
+def render_live_view():
+    """Render the live values, charts and control charts from the sampler"""
+    # Laps start with each run of the view, so timer reruns never time the idle wait between them
+    page_laps = laps('live')
+    live_data = sampler.window(history_points)
+
+    def trace_data(signal):
+        """Return the downsampled x/y of one live trace"""
+        x, y = downsample_xy(live_data['timestamp'], live_data[signal])
+        return dict(x=x, y=y)
+
+    # Samples the online detector flagged inside the visible window
+    window_start = live_data['timestamp'][0] if len(live_data['timestamp']) else None
+    live_anomalies = sampler.anomalies.recent(since=window_start)
+    page_laps.lap('data')
+
+    def anomaly_markers(signal, label, **kwargs):
+        """Return a marker trace of the flagged samples of one signal"""
+        points = [(ts, value) for ts, name, value, _ in live_anomalies if name == signal]
+        return go.Scatter(
+            x=[ts for ts, _ in points], y=[value for _, value in points],
+            name=f'{label} anomaly', mode='markers',
+            marker=dict(color='red', size=9, symbol='x'), **kwargs
+        )
+
+    # Display current values
+    st.subheader("Current Values")
     col1, col2, col3, col4 = st.columns(4)
-    
+    current = sampler.latest()
+    # Limit lines follow the press's saved alert limits: the tightest high limit of the front temperature
+    front_limit = sampler.alerts.limit('front_temp')
+
     with col1:
-        fig_gauge1 = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=current['ram_pressure'],
-            title={'text': "RAM Pressure"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 40], 'color': "lightgray"},
-                    {'range': [40, 80], 'color': "gray"},
-                    {'range': [80, 100], 'color': "lightcoral"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90
-                }
-            }
-        ))
-        fig_gauge1.update_layout(height=250)
-        st.plotly_chart(fig_gauge1, use_container_width=True)
-    
+        st.metric("RAM Pressure", f"{current['ram_pressure']:.1f}")
     with col2:
-        fig_gauge2 = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=current['front_temp'],
-            title={'text': "Front Temp"},
-            gauge={
-                'axis': {'range': [350, 450]},
-                'bar': {'color': "darkred"},
-                'steps': [
-                    {'range': [350, 400], 'color': "lightblue"},
-                    {'range': [400, 420], 'color': "lightgreen"},
-                    {'range': [420, 450], 'color': "lightcoral"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 420
-                }
-            }
-        ))
-        fig_gauge2.update_layout(height=250)
-        st.plotly_chart(fig_gauge2, use_container_width=True)
-    
+        st.metric("Front Temp", f"{current['front_temp']:.1f}°C")
     with col3:
-        fig_gauge3 = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=current['billet_pressure'],
-            title={'text': "Billet Pressure"},
-            gauge={
-                'axis': {'range': [0, 300]},
-                'bar': {'color': "darkgreen"},
-                'steps': [
-                    {'range': [0, 150], 'color': "lightgray"},
-                    {'range': [150, 250], 'color': "lightyellow"},
-                    {'range': [250, 300], 'color': "lightcoral"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 250
-                }
-            }
-        ))
-        fig_gauge3.update_layout(height=250)
-        st.plotly_chart(fig_gauge3, use_container_width=True)
-    
+        st.metric("RAM Speed", f"{current['ram_speed']:.1f} mm/s")
     with col4:
-        fig_gauge4 = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=current['ram_speed'],
-            title={'text': "RAM Speed"},
-            gauge={
-                'axis': {'range': [0, 10]},
-                'bar': {'color': "purple"},
-                'steps': [
-                    {'range': [0, 5], 'color': "lightgreen"},
-                    {'range': [5, 8], 'color': "lightyellow"},
-                    {'range': [8, 10], 'color': "lightcoral"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 8
-                }
-            }
+        st.metric("Billet Pressure", f"{current['billet_pressure']:.1f}")
+
+    for title, message, alert_type in sampler.alerts.active():
+        if alert_type == "danger":
+            st.error(f"⚠️ **{title}:** {message}")
+        else:
+            st.warning(f"⚠️ **{title}:** {message}")
+
+    page_laps.lap('current_values')
+
+    # Create tabs for different visualizations
+    tab1, tab2, tab3, tab4 = st.tabs(["Pressure Monitoring", "Temperature Monitoring", "Combined View", "Control Charts"])
+
+    with tab1:
+        st.subheader("Pressure Trends")
+
+        fig_pressure = make_subplots(
+            rows=2, cols=1,
+            subplot_titles=('RAM & Billet Pressure', 'System Pressures'),
+            vertical_spacing=0.15
+        )
+
+        # RAM and Billet Pressure
+        fig_pressure.add_trace(
+            scatter_trace(
+                **trace_data('ram_pressure'),
+                name='RAM Pressure',
+                line=dict(color='blue', width=2),
+                mode='lines'
+            ),
+            row=1, col=1
+        )
+
+        fig_pressure.add_trace(
+            scatter_trace(
+                **trace_data('billet_pressure'),
+                name='Billet Pressure',
+                line=dict(color='red', width=2),
+                mode='lines',
+                yaxis="y2"
+            ),
+            row=1, col=1
+        )
+        fig_pressure.add_trace(anomaly_markers('ram_pressure', 'RAM Pressure'), row=1, col=1)
+        fig_pressure.add_trace(anomaly_markers('billet_pressure', 'Billet Pressure', yaxis="y2"), row=1, col=1)
+
+        # System Pressures
+        fig_pressure.add_trace(
+            scatter_trace(
+                **trace_data('sys_pressure'),
+                name='System Pressure',
+                line=dict(color='green', width=2),
+                mode='lines'
+            ),
+            row=2, col=1
+        )
+
+        fig_pressure.add_trace(
+            scatter_trace(
+                **trace_data('pilot_pressure'),
+                name='Pilot Pressure',
+                line=dict(color='orange', width=2),
+                mode='lines'
+            ),
+            row=2, col=1
+        )
+
+        fig_pressure.update_layout(
+            height=600,
+            showlegend=True,
+            hovermode='x unified'
+        )
+
+        # Add range sliders
+        fig_pressure.update_xaxes(rangeslider_visible=True, row=1, col=1)
+        fig_pressure.update_xaxes(rangeslider_visible=True, row=2, col=1)
+
+        page_laps.lap('pressure.figure')
+        st.plotly_chart(fig_pressure, use_container_width=True)
+        page_laps.lap('pressure.render')
+
+    with tab2:
+        st.subheader("Temperature Trends")
+
+        fig_temp = go.Figure()
+
+        fig_temp.add_trace(scatter_trace(
+            **trace_data('front_temp'),
+            name='Front Temperature',
+            line=dict(color='red', width=2)
         ))
-        fig_gauge4.update_layout(height=250)
-        st.plotly_chart(fig_gauge4, use_container_width=True)
-    
-    # Recent data table
-    st.subheader("Recent Data Points")
-    display_data = st.session_state.live_data.tail(20).copy()
-    display_data['timestamp'] = display_data['timestamp'].dt.strftime('%H:%M:%S')
-    st.dataframe(display_data.set_index('timestamp'), use_container_width=True)
-
-# Auto-refresh
-if auto_update:
-    time.sleep(5)
-    st.rerun()
\ No newline at end of file
+
+        fig_temp.add_trace(scatter_trace(
+            **trace_data('back_temp'),
+            name='Back Temperature',
+            line=dict(color='orange', width=2)
+        ))
+
+        fig_temp.add_trace(scatter_trace(
+            **trace_data('oil_temp'),
+            name='Oil Temperature',
+            line=dict(color='blue', width=2),
+            yaxis="y2"
+        ))
+
+        fig_temp.add_trace(anomaly_markers('front_temp', 'Front Temperature'))
+        fig_temp.add_trace(anomaly_markers('back_temp', 'Back Temperature'))
+
+        fig_temp.update_layout(
+            title="Temperature Monitoring",
+            yaxis=dict(title="Container Temperature (°C)"),
+            yaxis2=dict(
+                title="Oil Temperature (°C)",
+                overlaying="y",
+                side="right"
+            ),
+            height=500,
+            hovermode='x unified'
+        )
+
+        if front_limit is not None:
+            fig_temp.add_hline(y=front_limit, line_dash="dash", line_color="red",
+                              annotation_text="Max Temp Limit", row=1, col=1)
+
+        page_laps.lap('temperature.figure')
+        st.plotly_chart(fig_temp, use_container_width=True)
+        page_laps.lap('temperature.render')
+
+    with tab3:
+        st.subheader("Combined Process View")
+
+        # Create gauge charts
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            fig_gauge1 = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=current['ram_pressure'],
+                title={'text': "RAM Pressure"},
+                gauge={
+                    'axis': {'range': [0, 100]},
+                    'bar': {'color': "darkblue"},
+                    'steps': [
+                        {'range': [0, 40], 'color': "lightgray"},
+                        {'range': [40, 80], 'color': "gray"},
+                        {'range': [80, 100], 'color': "lightcoral"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 90
+                    }
+                }
+            ))
+            fig_gauge1.update_layout(height=250)
+            st.plotly_chart(fig_gauge1, use_container_width=True)
+
+        with col2:
+            fig_gauge2 = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=current['front_temp'],
+                title={'text': "Front Temp"},
+                gauge={
+                    'axis': {'range': [350, 450]},
+                    'bar': {'color': "darkred"},
+                    'steps': [
+                        {'range': [350, 400], 'color': "lightblue"},
+                        {'range': [400, front_limit or 450], 'color': "lightgreen"},
+                        {'range': [front_limit or 450, 450], 'color': "lightcoral"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': front_limit or 450
+                    }
+                }
+            ))
+            fig_gauge2.update_layout(height=250)
+            st.plotly_chart(fig_gauge2, use_container_width=True)
+
+        with col3:
+            fig_gauge3 = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=current['billet_pressure'],
+                title={'text': "Billet Pressure"},
+                gauge={
+                    'axis': {'range': [0, 300]},
+                    'bar': {'color': "darkgreen"},
+                    'steps': [
+                        {'range': [0, 150], 'color': "lightgray"},
+                        {'range': [150, 250], 'color': "lightyellow"},
+                        {'range': [250, 300], 'color': "lightcoral"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 250
+                    }
+                }
+            ))
+            fig_gauge3.update_layout(height=250)
+            st.plotly_chart(fig_gauge3, use_container_width=True)
+
+        with col4:
+            fig_gauge4 = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=current['ram_speed'],
+                title={'text': "RAM Speed"},
+                gauge={
+                    'axis': {'range': [0, 10]},
+                    'bar': {'color': "purple"},
+                    'steps': [
+                        {'range': [0, 5], 'color': "lightgreen"},
+                        {'range': [5, 8], 'color': "lightyellow"},
+                        {'range': [8, 10], 'color': "lightcoral"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 8
+                    }
+                }
+            ))
+            fig_gauge4.update_layout(height=250)
+            st.plotly_chart(fig_gauge4, use_container_width=True)
+        page_laps.lap('gauges')
+
+        # Recent data table
+        st.subheader("Recent Data Points")
+        display_data = sampler.to_frame(20)
+        display_data['timestamp'] = display_data['timestamp'].dt.strftime('%H:%M:%S')
+        st.dataframe(display_data.set_index('timestamp'), use_container_width=True)
+        page_laps.lap('table')
+
+    with tab4:
+        st.subheader("Statistical Process Control")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            spc_signal = st.selectbox("Signal", SPC_SIGNALS, format_func=lambda s: s.replace('_', ' ').title())
+        with col2:
+            spc_source = st.radio("Source", ["Live buffer", "Stored history"], horizontal=True)
+
+        chart, limits = None, None
+        if spc_source == "Live buffer":
+            # Charted incrementally by the sampler as each sample arrives
+            limits = sampler.spc.limits(spc_signal)
+            if limits is None:
+                st.info("Collecting the baseline window for the control limits...")
+            else:
+                chart = sampler.spc.window(spc_signal, history_points)
+        else:
+            spc_hours = st.slider("Hours of history", 1, 24, 4)
+            end = pd.Timestamp.now()
+            stored = sampler.writer.store.read(end - pd.Timedelta(hours=spc_hours), end, columns=[spc_signal])
+            if stored[spc_signal].count() < 2:
+                st.info("Not enough stored samples in this window yet.")
+            else:
+                chart, limits = run_chart(stored, spc_signal)
+
+        page_laps.lap('spc.data')
+        if chart is not None:
+            fig_spc = make_subplots(
+                rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                subplot_titles=('Individuals (Shewhart)', 'EWMA', 'CUSUM')
+            )
+            broken = chart[chart['rule'] > 0]
+            # Lines are downsampled for drawing; violations are all marked
+            chart = chart.iloc[downsample_indices(chart.index, chart['value'])]
+            x = chart.index
+
+            fig_spc.add_trace(scatter_trace(x, chart['value'], name='Value', mode='lines',
+                                            line=dict(color='blue', width=1)), row=1, col=1)
+            fig_spc.add_trace(scatter_trace(
+                broken.index, broken['value'], name='Rule violation', mode='markers',
+                marker=dict(color='red', size=7),
+                text=[WE_RULES[r] for r in broken['rule']], hovertemplate='%{text}<extra></extra>'
+            ), row=1, col=1)
+            for name, color in (('center', 'green'), ('ucl', 'red'), ('lcl', 'red')):
+                fig_spc.add_hline(y=limits[name], line_dash='dash', line_color=color, row=1, col=1)
+
+            fig_spc.add_trace(scatter_trace(x, chart['ewma'], name='EWMA', mode='lines',
+                                            line=dict(color='purple', width=2)), row=2, col=1)
+            fig_spc.add_trace(scatter_trace(x, chart['ewma_ucl'], name='EWMA limits', mode='lines',
+                                            line=dict(color='red', dash='dot')), row=2, col=1)
+            fig_spc.add_trace(scatter_trace(x, chart['ewma_lcl'], showlegend=False, mode='lines',
+                                            line=dict(color='red', dash='dot')), row=2, col=1)
+
+            fig_spc.add_trace(scatter_trace(x, chart['cusum_hi'], name='CUSUM+', mode='lines',
+                                            line=dict(color='darkorange')), row=3, col=1)
+            fig_spc.add_trace(scatter_trace(x, chart['cusum_lo'], name='CUSUM-', mode='lines',
+                                            line=dict(color='teal')), row=3, col=1)
+            fig_spc.add_hline(y=limits['cusum_h'], line_dash='dash', line_color='red', row=3, col=1)
+
+            fig_spc.update_layout(height=750, hovermode='x unified')
+            page_laps.lap('spc.figure')
+            st.plotly_chart(fig_spc, use_container_width=True)
+            page_laps.lap('spc.render')
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Center Line", f"{limits['center']:.2f}")
+            with col2:
+                st.metric("UCL / LCL", f"{limits['ucl']:.1f} / {limits['lcl']:.1f}")
+            with col3:
+                st.metric("Points Out of Control", len(broken))
+
+        violations = sampler.spc.violations()
+        if violations:
+            st.subheader("Recent Rule Violations")
+            st.dataframe(pd.DataFrame(
+                [(ts.strftime('%H:%M:%S'), signal, WE_RULES[rule]) for ts, signal, rule in violations],
+                columns=['Time', 'Signal', 'Rule']
+            ), use_container_width=True, hide_index=True)
+        page_laps.lap('spc.violations')
+
+
+# Only the live view reruns on the timer, without holding the session between runs
+st.fragment(render_live_view, run_every=REFRESH_RATES[refresh_rate] if auto_update else None)()
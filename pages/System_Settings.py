@@ -1,38 +1,25 @@
 import streamlit as st
 import json
+import pandas as pd
+from utils.acquisition import get_fleet, select_press
+from utils.perf import REGISTRY
 
 st.set_page_config(layout="wide")
 st.title("⚙️ System Configuration")
 
-# Initialize session state for settings
-if 'system_settings' not in st.session_state:
-    st.session_state.system_settings = {
-        'pressure_limits': {
-            'ram_min': 40, 'ram_max': 100, 'ram_warning': 80,
-            'billet_min': 150, 'billet_max': 300, 'billet_warning': 250,
-            'sys_min': 2, 'sys_max': 5, 'sys_warning': 4
-        },
-        'temperature_limits': {
-            'front_min': 350, 'front_max': 450, 'front_warning': 420,
-            'back_min': 340, 'back_max': 440, 'back_warning': 410,
-            'oil_min': 20, 'oil_max': 40, 'oil_warning': 35
-        },
-        'alerts': {
-            'email': True, 'sms': False, 'sound': True,
-            'popup': True, 'log': True
-        },
-        'data_logging': {
-            'interval': 5, 'retention_days': 90,
-            'backup_enabled': True, 'backup_interval': 'daily'
-        },
-        'maintenance': {
-            'ram_hours': 5000, 'container_hours': 4000,
-            'heater_hours': 3000, 'pump_hours': 2000
-        }
-    }
+# Limits and alerts are set per press; data logging applies to the whole plant
+press = select_press()
+st.sidebar.caption(f"Process limits and alert settings apply to {press}")
+
+# Saved settings are shared by every session; saving applies them to the
+# running presses straight away
+fleet = get_fleet()
+settings_store = fleet.settings
+settings = settings_store.settings(press)
+st.sidebar.caption(f"Settings file: `{settings_store.path}`")
 
 # Create tabs
-tab1, tab2, tab3, tab4 = st.tabs(["Process Limits", "Alert Settings", "Data Management", "Maintenance"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Process Limits", "Alert Settings", "Data Management", "Maintenance", "Performance"])
 
 with tab1:
     st.header("Process Control Limits")
@@ -44,51 +31,52 @@ with tab1:
         
         st.write("**RAM Pressure**")
         ram_min = st.number_input("Min RAM Pressure", 0, 200, 
-                                 st.session_state.system_settings['pressure_limits']['ram_min'])
+                                 settings['pressure_limits']['ram_min'])
         ram_max = st.number_input("Max RAM Pressure", 0, 200, 
-                                 st.session_state.system_settings['pressure_limits']['ram_max'])
+                                 settings['pressure_limits']['ram_max'])
         ram_warn = st.number_input("RAM Warning", 0, 200, 
-                                  st.session_state.system_settings['pressure_limits']['ram_warning'])
+                                  settings['pressure_limits']['ram_warning'])
         
         st.write("**Billet Pressure**")
         billet_min = st.number_input("Min Billet Pressure", 0, 500, 
-                                    st.session_state.system_settings['pressure_limits']['billet_min'])
+                                    settings['pressure_limits']['billet_min'])
         billet_max = st.number_input("Max Billet Pressure", 0, 500, 
-                                    st.session_state.system_settings['pressure_limits']['billet_max'])
+                                    settings['pressure_limits']['billet_max'])
         billet_warn = st.number_input("Billet Warning", 0, 500, 
-                                     st.session_state.system_settings['pressure_limits']['billet_warning'])
+                                     settings['pressure_limits']['billet_warning'])
     
     with col2:
         st.subheader("Temperature Limits (°C)")
         
         st.write("**Front Temperature**")
         front_min = st.number_input("Min Front Temp", 200, 500, 
-                                   st.session_state.system_settings['temperature_limits']['front_min'])
+                                   settings['temperature_limits']['front_min'])
         front_max = st.number_input("Max Front Temp", 200, 500, 
-                                   st.session_state.system_settings['temperature_limits']['front_max'])
+                                   settings['temperature_limits']['front_max'])
         front_warn = st.number_input("Front Warning", 200, 500, 
-                                    st.session_state.system_settings['temperature_limits']['front_warning'])
+                                    settings['temperature_limits']['front_warning'])
         
         st.write("**Oil Temperature**")
         oil_min = st.number_input("Min Oil Temp", 0, 100, 
-                                 st.session_state.system_settings['temperature_limits']['oil_min'])
+                                 settings['temperature_limits']['oil_min'])
         oil_max = st.number_input("Max Oil Temp", 0, 100, 
-                                 st.session_state.system_settings['temperature_limits']['oil_max'])
+                                 settings['temperature_limits']['oil_max'])
         oil_warn = st.number_input("Oil Warning", 0, 100, 
-                                  st.session_state.system_settings['temperature_limits']['oil_warning'])
+                                  settings['temperature_limits']['oil_warning'])
     
     if st.button("💾 Save Process Limits", type="primary"):
-        st.session_state.system_settings['pressure_limits'] = {
-            'ram_min': ram_min, 'ram_max': ram_max, 'ram_warning': ram_warn,
-            'billet_min': billet_min, 'billet_max': billet_max, 'billet_warning': billet_warn,
-            'sys_min': 2, 'sys_max': 5, 'sys_warning': 4
-        }
-        
-        st.session_state.system_settings['temperature_limits'] = {
-            'front_min': front_min, 'front_max': front_max, 'front_warning': front_warn,
-            'back_min': 340, 'back_max': 440, 'back_warning': 410,
-            'oil_min': oil_min, 'oil_max': oil_max, 'oil_warning': oil_warn
-        }
+        settings_store.update(press, {
+            'pressure_limits': {
+                'ram_min': ram_min, 'ram_max': ram_max, 'ram_warning': ram_warn,
+                'billet_min': billet_min, 'billet_max': billet_max, 'billet_warning': billet_warn,
+                'sys_min': 2, 'sys_max': 5, 'sys_warning': 4
+            },
+            'temperature_limits': {
+                'front_min': front_min, 'front_max': front_max, 'front_warning': front_warn,
+                'back_min': 340, 'back_max': 440, 'back_warning': 410,
+                'oil_min': oil_min, 'oil_max': oil_max, 'oil_warning': oil_warn
+            },
+        })
         
         st.success("Process limits saved successfully!")
 
@@ -101,27 +89,40 @@ with tab2:
         st.subheader("Alert Channels")
         
         email_alerts = st.checkbox("Email Alerts",
-                                  value=st.session_state.system_settings['alerts']['email'])
+                                  value=settings['alerts']['email'])
         sms_alerts = st.checkbox("SMS Alerts",
-                                value=st.session_state.system_settings['alerts']['sms'])
+                                value=settings['alerts']['sms'])
         sound_alerts = st.checkbox("Sound Alerts",
-                                  value=st.session_state.system_settings['alerts']['sound'])
+                                  value=settings['alerts']['sound'])
         popup_alerts = st.checkbox("Popup Alerts",
-                                  value=st.session_state.system_settings['alerts']['popup'])
+                                  value=settings['alerts']['popup'])
         
         st.subheader("Alert Thresholds")
         
-        high_temp_alert = st.number_input("High Temp Alert (°C)", 0, 500, 425)
-        high_pressure_alert = st.number_input("High Pressure Alert (bar)", 0, 200, 90)
-        low_pressure_alert = st.number_input("Low Pressure Alert (bar)", 0, 200, 30)
+        # Saved thresholds, or the page's defaults until the first save
+        saved_thresholds = settings.get('alert_thresholds', {})
+
+        def saved_threshold(key, default):
+            # A saved 0 is kept; only a missing or empty value falls back
+            value = saved_thresholds.get(key)
+            return default if value is None else value
+
+        high_temp_alert = st.number_input("High Temp Alert (°C)", 0, 500,
+                                          saved_threshold('high_temp', 425))
+        high_pressure_alert = st.number_input("High Pressure Alert (bar)", 0, 200,
+                                              saved_threshold('high_pressure', 90))
+        low_pressure_alert = st.number_input("Low Pressure Alert (bar)", 0, 200,
+                                             saved_threshold('low_pressure', 30))
     
     with col2:
         st.subheader("Auto Actions")
         
-        auto_shutdown = st.checkbox("Enable Auto Shutdown", value=True)
+        auto_shutdown = st.checkbox("Enable Auto Shutdown", value=saved_thresholds.get('auto_shutdown', True))
         if auto_shutdown:
-            shutdown_temp = st.number_input("Shutdown Temp (°C)", 0, 500, 450)
-            shutdown_pressure = st.number_input("Shutdown Pressure (bar)", 0, 300, 100)
+            shutdown_temp = st.number_input("Shutdown Temp (°C)", 0, 500,
+                                            saved_threshold('shutdown_temp', 450))
+            shutdown_pressure = st.number_input("Shutdown Pressure (bar)", 0, 300,
+                                                saved_threshold('shutdown_pressure', 100))
         
         auto_pause = st.checkbox("Enable Auto Pause", value=True)
         if auto_pause:
@@ -133,22 +134,23 @@ with tab2:
                                  value="operator@factory.com,manager@factory.com")
     
     if st.button("💾 Save Alert Settings", type="primary"):
-        st.session_state.system_settings['alerts'] = {
-            'email': email_alerts,
-            'sms': sms_alerts,
-            'sound': sound_alerts,
-            'popup': popup_alerts,
-            'log': True
-        }
-        
-        st.session_state.system_settings['alert_thresholds'] = {
-            'high_temp': high_temp_alert,
-            'high_pressure': high_pressure_alert,
-            'low_pressure': low_pressure_alert,
-            'auto_shutdown': auto_shutdown,
-            'shutdown_temp': shutdown_temp if auto_shutdown else None,
-            'shutdown_pressure': shutdown_pressure if auto_shutdown else None
-        }
+        settings_store.update(press, {
+            'alerts': {
+                'email': email_alerts,
+                'sms': sms_alerts,
+                'sound': sound_alerts,
+                'popup': popup_alerts,
+                'log': True
+            },
+            'alert_thresholds': {
+                'high_temp': high_temp_alert,
+                'high_pressure': high_pressure_alert,
+                'low_pressure': low_pressure_alert,
+                'auto_shutdown': auto_shutdown,
+                'shutdown_temp': shutdown_temp if auto_shutdown else None,
+                'shutdown_pressure': shutdown_pressure if auto_shutdown else None
+            },
+        })
         
         st.success("Alert settings saved!")
 
@@ -163,18 +165,18 @@ with tab3:
         log_interval = st.selectbox(
             "Logging Interval (seconds)",
             [1, 5, 10, 30, 60],
-            index=[1, 5, 10, 30, 60].index(st.session_state.system_settings['data_logging']['interval'])
+            index=[1, 5, 10, 30, 60].index(settings['data_logging']['interval'])
         )
         
         retention_days = st.slider(
             "Data Retention (days)",
             1, 365,
-            st.session_state.system_settings['data_logging']['retention_days']
+            settings['data_logging']['retention_days']
         )
         
         backup_enabled = st.checkbox(
             "Enable Auto Backup",
-            value=st.session_state.system_settings['data_logging']['backup_enabled']
+            value=settings['data_logging']['backup_enabled']
         )
         
         if backup_enabled:
@@ -182,7 +184,7 @@ with tab3:
                 "Backup Interval",
                 ["hourly", "daily", "weekly", "monthly"],
                 index=["hourly", "daily", "weekly", "monthly"].index(
-                    st.session_state.system_settings['data_logging']['backup_interval']
+                    settings['data_logging']['backup_interval']
                 )
             )
     
@@ -204,22 +206,31 @@ with tab3:
             st.cache_data.clear()
             st.success("Cache cleared!")
         
-        if st.button("🧹 Purge Old Data", use_container_width=True):
-            st.warning("This will delete data older than retention period!")
-            confirm = st.checkbox("I confirm this action")
-            if confirm and st.button("Confirm Purge", type="primary"):
-                st.success("Old data purged successfully!")
+        # Purges run on the fleet's retention thread, so this rerun never waits for one
+        saved_retention = settings['data_logging']['retention_days']
+        confirm = st.checkbox(f"I confirm deleting data older than {saved_retention} days")
+        if st.button("🧹 Purge Old Data", use_container_width=True, disabled=not confirm):
+            fleet.retention.request()
+            st.success("Purge started; old data is removed in the background.")
+        if fleet.retention.running:
+            st.caption("Purge in progress…")
+        report = fleet.retention.last
+        if report is not None:
+            st.caption(f"Last purge {report.finished:%Y-%m-%d %H:%M}: "
+                       f"{sum(report.reclaimed.values()) / 1e6:,.1f} MB reclaimed in {report.seconds:.2f} s")
         
         if st.button("💾 Manual Backup", use_container_width=True, type="primary"):
             st.success("Backup initiated. Check backup folder.")
     
     if st.button("💾 Save Data Settings", type="primary"):
-        st.session_state.system_settings['data_logging'] = {
+        data_logging = {
             'interval': log_interval,
             'retention_days': retention_days,
             'backup_enabled': backup_enabled,
             'backup_interval': backup_interval if backup_enabled else 'daily'
         }
+        # Plant-wide: the fleet applies the interval and retention to every press
+        settings_store.update(None, {'data_logging': data_logging})
         st.success("Data settings saved!")
 
 with tab4:
@@ -233,25 +244,25 @@ with tab4:
         ram_hours = st.number_input(
             "RAM System Hours",
             0, 10000,
-            st.session_state.system_settings['maintenance']['ram_hours']
+            settings['maintenance']['ram_hours']
         )
         
         container_hours = st.number_input(
             "Container Hours",
             0, 10000,
-            st.session_state.system_settings['maintenance']['container_hours']
+            settings['maintenance']['container_hours']
         )
         
         heater_hours = st.number_input(
             "Heater Hours",
             0, 10000,
-            st.session_state.system_settings['maintenance']['heater_hours']
+            settings['maintenance']['heater_hours']
         )
         
         pump_hours = st.number_input(
             "Pump Hours",
             0, 10000,
-            st.session_state.system_settings['maintenance']['pump_hours']
+            settings['maintenance']['pump_hours']
         )
         
         st.subheader("Calibration Schedule")
@@ -297,14 +308,69 @@ with tab4:
             st.success("Maintenance logged successfully")
     
     if st.button("💾 Save Maintenance Settings", type="primary"):
-        st.session_state.system_settings['maintenance'] = {
-            'ram_hours': ram_hours,
-            'container_hours': container_hours,
-            'heater_hours': heater_hours,
-            'pump_hours': pump_hours
-        }
+        settings_store.update(press, {
+            'maintenance': {
+                'ram_hours': ram_hours,
+                'container_hours': container_hours,
+                'heater_hours': heater_hours,
+                'pump_hours': pump_hours
+            },
+        })
         st.success("Maintenance settings saved!")
 
+with tab5:
+    st.header("Rerun Performance")
+    st.caption(f"Rolling timings over the last {REGISTRY.window} calls of each section, shared by all sessions")
+
+    timings = REGISTRY.timings()
+    counters = REGISTRY.counters()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Sections Timed", len(timings))
+    with col2:
+        st.metric("Page Reruns", sum(value for name, value in counters.items() if name.endswith('.reruns')))
+    with col3:
+        slowest = timings.loc[timings['p95_ms'].idxmax()] if len(timings) else None
+        st.metric("Slowest Section (p95)", f"{slowest['p95_ms']:.1f} ms" if slowest is not None else "-",
+                  slowest['section'] if slowest is not None else None, delta_color="off")
+
+    if len(timings):
+        st.dataframe(
+            timings.sort_values('p95_ms', ascending=False),
+            use_container_width=True, hide_index=True,
+            column_config={
+                column: st.column_config.NumberColumn(format="%.2f")
+                for column in ('last_ms', 'p50_ms', 'p95_ms', 'max_ms', 'total_s')
+            }
+        )
+    else:
+        st.info("No sections timed yet. Open the dashboard pages to collect timings.")
+
+    if counters:
+        st.subheader("Counters")
+        st.dataframe(pd.DataFrame(counters.items(), columns=['Counter', 'Value']),
+                     use_container_width=True, hide_index=True)
+
+    st.subheader("Prometheus Export")
+    if REGISTRY.path:
+        st.write(f"Metrics file: `{REGISTRY.path}` (rewritten at most every {REGISTRY.interval:g} s)")
+    else:
+        st.info("Set STREAMLET_METRICS_FILE to write these metrics for the node exporter textfile collector.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📝 Write Metrics File", use_container_width=True, disabled=not REGISTRY.path):
+            REGISTRY.write_textfile()
+            st.success("Metrics file written")
+    with col2:
+        if st.button("🔄 Reset Timings", use_container_width=True):
+            REGISTRY.reset()
+            st.rerun()
+
+    with st.expander("Exposition text"):
+        st.code(REGISTRY.prometheus(), language="text")
+
 # Export/Import Settings
 st.divider()
 st.subheader("Configuration Management")
@@ -313,7 +379,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     if st.button("📤 Export Configuration", use_container_width=True):
-        settings_json = json.dumps(st.session_state.system_settings, indent=2)
+        settings_json = json.dumps(settings, indent=2)
         st.download_button(
             label="Download Settings JSON",
             data=settings_json,
@@ -327,11 +393,11 @@ with col2:
         try:
             imported_settings = json.load(uploaded_file)
             if st.button("Apply Imported Settings", type="primary"):
-                st.session_state.system_settings = imported_settings
+                settings_store.replace(press, imported_settings)
                 st.success("Settings imported successfully!")
         except:
             st.error("Invalid configuration file")
 
 # Current settings display
 with st.expander("📋 Current Configuration"):
-    st.json(st.session_state.system_settings)
\ No newline at end of file
+    st.json(settings)
\ No newline at end of file
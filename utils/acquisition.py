@@ -0,0 +1,359 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.retention import RetentionEngine
+from data.store import StoreWriter, TimeSeriesStore, press_root
+from utils.alerts import AlertEngine
+from utils.anomaly import OnlineDetector
+from utils.data_generator import LIVE_SIGNALS, generate_current_data, generate_live_data_points, press_ids
+from utils.ingest import INGEST_ADDRESS, INGEST_PRESSES, IngestServer, parse_address
+from utils.perf import count, timed
+from utils.plc import PLC_ENDPOINTS, PLCAdapter, PLCPoller
+from utils.ring_buffer import RingBuffer
+from utils.settings import SettingsStore, default_settings
+from utils.spc import SPCMonitor
+
+# Presses on the plant floor, P01 to Pnn
+PRESSES = press_ids(int(os.environ.get('STREAMLET_PRESSES', 3)))
+
+# Samples kept in the shared live buffer (10 hours at 1 Hz)
+LIVE_BUFFER_CAPACITY = 36000
+
+# Default polling interval in seconds, matches data_logging.interval
+DEFAULT_INTERVAL = 5
+
+# Samples generated on start-up so the live charts are not empty
+BACKFILL_POINTS = 300
+
+# Seconds to wait for the first reply of each PLC on start-up; a PLC that
+# stays silent leaves its press waiting for data, not the fleet stopped
+PLC_START_TIMEOUT = 5
+
+# Seconds between checks of a page waiting for a press's first sample
+WAITING_POLL_SECONDS = 2
+
+# Signals averaged in the fleet overview
+OVERVIEW_SIGNALS = ['ram_pressure', 'billet_pressure', 'front_temp', 'oil_temp']
+
+
+class Sampler:
+    """Single background producer for one press, shared by every browser session.
+
+    The sampling thread is the only writer. Sessions read the latest
+    sample or a window of the live buffer, so the acquisition cost
+    depends on the sample rate and not on the number of viewers.
+    """
+
+    def __init__(self, press=PRESSES[0], interval=DEFAULT_INTERVAL, capacity=LIVE_BUFFER_CAPACITY, writer=None):
+        self.press = press
+        self.buffer = RingBuffer(capacity, LIVE_SIGNALS)
+        self.writer = writer
+        self.alerts = AlertEngine(default_settings())
+        self.spc = SPCMonitor()
+        self.anomalies = OnlineDetector(LIVE_SIGNALS)
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._rng = np.random.default_rng()
+        self._current = None
+        self._thread = threading.Thread(target=self._run, name=f'press-sampler-{press}', daemon=True)
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def set_interval(self, seconds):
+        """Change the polling interval, taking effect immediately"""
+        seconds = float(seconds)
+        if seconds <= 0:
+            raise ValueError("Sampling interval must be positive")
+        if seconds != self._interval:
+            self._interval = seconds
+            self._wake.set()
+
+    def start(self):
+        backfill = generate_live_data_points(
+            BACKFILL_POINTS, freq=pd.Timedelta(seconds=self._interval), rng=self._rng
+        )
+        with self._lock:
+            self.buffer.extend_frame(backfill)
+        self.spc.extend_frame(backfill)
+        self.anomalies.extend_frame(backfill)
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.writer is not None:
+            self.writer.flush()
+
+    @timed('sampler.sample')
+    def sample(self):
+        """Take one sample and publish it to readers"""
+        current = generate_current_data(self._rng)
+        current['press'] = self.press
+        live = generate_live_data_points(1, end=current['timestamp'], rng=self._rng)
+        for name in LIVE_SIGNALS:
+            current[name] = float(live[name].iloc[0])
+
+        with self._lock:
+            self.buffer.append(current['timestamp'], current)
+            self._current = current
+        # Stored first, so a failure in the analytics never loses the sample
+        if self.writer is not None:
+            self.writer.add(current['timestamp'], current)
+        self.alerts.evaluate(current)
+        self.spc.push(current['timestamp'], current)
+        self.anomalies.push(current['timestamp'], current)
+
+    def publish(self, frame, current):
+        """Publish a batch of samples from an external source such as a PLC
+
+        ``frame`` holds the numeric fields indexed by timestamp, with every
+        live signal present (NaN where missing), and ``current`` the newest
+        full record. The buffers, charts, alert state and store writer are
+        updated once per batch.
+        """
+        current['press'] = self.press
+        with self._lock:
+            self.buffer.extend_frame(frame)
+            self._current = current
+        # Stored first, so a failure in the analytics never loses the batch
+        if self.writer is not None:
+            self.writer.add_frame(frame)
+        self.alerts.evaluate({name: frame[name].to_numpy() for name in frame.columns})
+        self.spc.extend_frame(frame)
+        self.anomalies.extend_frame(frame)
+
+    def latest(self):
+        """Return the most recent sample record as a dict"""
+        return self._current
+
+    def window(self, n):
+        """Return views of the last n buffered samples.
+
+        The views stay valid until the writer wraps around the buffer,
+        which takes ``capacity - n`` further samples.
+        """
+        with self._lock:
+            return self.buffer.last(n)
+
+    def to_frame(self, n):
+        """Copy the last n buffered samples into a DataFrame"""
+        with self._lock:
+            return self.buffer.to_frame(n)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.sample()
+            except Exception:
+                # Keep sampling; a failed sample must not freeze every dashboard
+                count('sampler.errors')
+
+
+class Fleet:
+    """One sampler per press, each with its own buffers, locks and store.
+
+    Presses share nothing on the read path, so reading one press costs
+    the same however many others are running. Work that spans the fleet
+    runs per press on a thread pool; the NumPy reductions release the
+    GIL, so the presses are aggregated in parallel.
+    """
+
+    def __init__(self, presses=PRESSES, endpoints=PLC_ENDPOINTS, ingest=INGEST_ADDRESS, pushed=INGEST_PRESSES,
+                 settings=None, **params):
+        self.presses = list(presses)
+        self.samplers = {
+            press: Sampler(press, writer=StoreWriter(TimeSeriesStore(press_root(press))), **params)
+            for press in self.presses
+        }
+        # Saved settings apply on start-up and whenever any session or process saves
+        self.settings = SettingsStore(presses=self.presses) if settings is None else settings
+        self._data_logging = None
+        self.apply_settings(self.presses)
+        self.settings.subscribe(self.apply_settings)
+        self.retention = RetentionEngine({press: sampler.writer.store for press, sampler in self.samplers.items()})
+        # Presses with a PLC endpoint are polled, presses that push are fed
+        # by the ingest endpoint, and the rest use the generator
+        self.endpoints = {press: endpoint for press, endpoint in endpoints.items() if press in self.samplers}
+        self.ingest_address = ingest
+        self.pushed = [] if not ingest else [
+            press for press in (self.presses if pushed is None else pushed)
+            if press in self.samplers and press not in self.endpoints
+        ]
+        self.poller = None
+        self.ingest = None
+        # Where each press fed from outside gets its samples, for the waiting notice
+        self.sources = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(len(self.presses), os.cpu_count() or 1), thread_name_prefix='fleet'
+        )
+
+    def start(self):
+        self.settings.watch()
+        self.retention.start()
+        # Each press backfills its buffers and charts independently
+        self.map(Sampler.start, [press for press in self.presses
+                                 if press not in self.endpoints and press not in self.pushed])
+        if self.endpoints:
+            self.poller = PLCPoller(
+                PLCAdapter(self.samplers[press], *endpoint) for press, endpoint in self.endpoints.items()
+            ).start()
+            plcs = {press: f"the PLC at {host}:{port}" for press, (host, port, _) in self.endpoints.items()}
+            self.sources.update(plcs)
+            self._wait_for_data(plcs, PLC_START_TIMEOUT)
+        if self.pushed:
+            host, port = parse_address(self.ingest_address)
+            self.ingest = IngestServer({press: self.samplers[press] for press in self.pushed}, host, port).start()
+            # Pushing presses report when their senders do; until then they show as waiting
+            self.sources.update({press: f"a push to {host}:{port}" for press in self.pushed})
+        return self
+
+    def _wait_for_data(self, sources, timeout):
+        """Wait up to timeout for the first sample of each press fed from outside"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(self.samplers[press].latest() is not None for press in sources):
+                return
+            time.sleep(0.05)
+
+    def waiting_for(self, press):
+        """Return the source a press is still waiting on for its first sample, None once it has reported"""
+        if self.samplers[press].latest() is not None:
+            return None
+        return self.sources.get(press, "the sampler")
+
+    def stop(self):
+        self.settings.close()
+        self.retention.stop()
+        if self.poller is not None:
+            self.poller.stop()
+        if self.ingest is not None:
+            self.ingest.stop()
+        for sampler in self.samplers.values():
+            sampler.stop()
+        self._executor.shutdown()
+
+    def sampler(self, press=None):
+        return self.samplers[press or self.presses[0]]
+
+    def map(self, func, presses=None):
+        """Run func(sampler) for each press in parallel, returning {press: result}"""
+        presses = self.presses if presses is None else presses
+        results = self._executor.map(lambda press: func(self.samplers[press]), presses)
+        return dict(zip(presses, results))
+
+    def apply_settings(self, presses):
+        """Switch the alert engines of presses to their saved thresholds and apply data logging"""
+        for press in presses:
+            if press in self.samplers:
+                self.samplers[press].alerts.use(self.settings.thresholds(press))
+        data_logging = self.settings.settings(self.presses[0])['data_logging']
+        if data_logging != self._data_logging:
+            self._data_logging = data_logging
+            self.set_interval(data_logging['interval'])
+            self.configure_writers(interval=data_logging['interval'], retention_days=data_logging['retention_days'])
+
+    def set_interval(self, seconds):
+        for sampler in self.samplers.values():
+            sampler.set_interval(seconds)
+
+    def configure_writers(self, **settings):
+        for sampler in self.samplers.values():
+            sampler.writer.configure(**settings)
+
+    def overview(self, n=BACKFILL_POINTS):
+        """Summarize the last n samples of every press, one row per press"""
+        return pd.DataFrame.from_dict(self.map(lambda sampler: press_summary(sampler, n)), orient='index')
+
+
+def press_summary(sampler, n):
+    """Window means and current alert and SPC state of one press"""
+    window = sampler.window(n)
+    alerts = sampler.alerts.active()
+    # NaN for a press that has not reported yet
+    summary = {f'{signal}_mean': float(np.nanmean(window[signal])) if len(window[signal]) else np.nan
+               for signal in OVERVIEW_SIGNALS}
+    summary['alerts'] = len(alerts)
+    summary['danger'] = sum(level == 'danger' for _, _, level in alerts)
+    summary['violations'] = len(sampler.spc.violations())
+    return summary
+
+
+class PressShards:
+    """Per-press results built in parallel on a thread pool.
+
+    Every press is submitted up front and ``get`` waits only for the press
+    asked for, so a page can show one press while the others finish.
+    """
+
+    def __init__(self, presses, build):
+        self.presses = list(presses)
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(len(self.presses), os.cpu_count() or 1) or 1, thread_name_prefix='press-shard'
+        )
+        self._futures = {press: self._executor.submit(build, press) for press in self.presses}
+
+    def get(self, press):
+        return self._futures[press].result()
+
+    def ready(self):
+        return [press for press, future in self._futures.items() if future.done()]
+
+
+@st.cache_resource
+def get_fleet():
+    """Return the process-wide fleet, starting every press on first use"""
+    return Fleet().start()
+
+
+def get_sampler(press=None):
+    """Return the sampler of one press, the first press by default"""
+    return get_fleet().sampler(press)
+
+
+def wait_for_press(press):
+    """Stop the page with a notice while a press has not reported, rerunning it once the press does"""
+    fleet = get_fleet()
+    source = fleet.waiting_for(press)
+    if source is None:
+        return
+
+    st.info(f"⏳ {press} is waiting for data from {source}.")
+
+    def check():
+        if fleet.waiting_for(press) is None:
+            st.rerun()
+
+    st.fragment(check, run_every=WAITING_POLL_SECONDS)()
+    st.stop()
+
+
+def select_press(presses=PRESSES, label="Press"):
+    """Sidebar press selector; the choice is kept across pages in session state"""
+    presses = list(presses)
+    if st.session_state.get('press') not in presses:
+        st.session_state.press = presses[0]
+
+    def remember():
+        st.session_state.press = st.session_state.press_select
+
+    st.sidebar.selectbox(label, presses, index=presses.index(st.session_state.press),
+                         key='press_select', on_change=remember)
+    return st.session_state.press
@@ -0,0 +1,202 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# (signal, label, unit, settings section, key prefix) for the saved process limits
+LIMIT_SIGNALS = [
+    ('ram_pressure', 'RAM Pressure', 'bar', 'pressure_limits', 'ram'),
+    ('billet_pressure', 'Billet Pressure', 'bar', 'pressure_limits', 'billet'),
+    ('sys_pressure', 'System Pressure', 'bar', 'pressure_limits', 'sys'),
+    ('front_temp', 'Front Temperature', '°C', 'temperature_limits', 'front'),
+    ('back_temp', 'Back Temperature', '°C', 'temperature_limits', 'back'),
+    ('oil_temp', 'Oil Temperature', '°C', 'temperature_limits', 'oil'),
+]
+
+# Rules that have no setting on the configuration page
+FIXED_RULES = [
+    ('container_residue', 'Container Residue', 'mm', 'low', 1100, 'warning'),
+]
+
+LEVELS = ('warning', 'danger')
+
+# Consecutive samples a condition must hold before an alert raises or clears
+DEFAULT_DEBOUNCE = 3
+
+# Fraction of the threshold a value must recover by before an alert clears
+DEFAULT_HYSTERESIS = 0.01
+
+
+def build_rules(settings):
+    """Translate saved settings into (signal, label, unit, direction, threshold, level) rules"""
+    rules = []
+    for signal, label, unit, section, prefix in LIMIT_SIGNALS:
+        limits = settings.get(section, {})
+        if f'{prefix}_max' in limits:
+            rules.append((signal, label, unit, 'high', limits[f'{prefix}_max'], 'danger'))
+        if f'{prefix}_warning' in limits:
+            rules.append((signal, label, unit, 'high', limits[f'{prefix}_warning'], 'warning'))
+        if f'{prefix}_min' in limits:
+            rules.append((signal, label, unit, 'low', limits[f'{prefix}_min'], 'danger'))
+
+    thresholds = settings.get('alert_thresholds', {})
+    if thresholds.get('high_temp') is not None:
+        for signal, label in (('front_temp', 'Front Temperature'), ('back_temp', 'Back Temperature')):
+            rules.append((signal, label, '°C', 'high', thresholds['high_temp'], 'danger'))
+    if thresholds.get('high_pressure') is not None:
+        rules.append(('ram_pressure', 'RAM Pressure', 'bar', 'high', thresholds['high_pressure'], 'danger'))
+    if thresholds.get('low_pressure') is not None:
+        rules.append(('ram_pressure', 'RAM Pressure', 'bar', 'low', thresholds['low_pressure'], 'danger'))
+
+    return rules + FIXED_RULES
+
+
+# Alert rules compiled from one press's settings. Rules are ordered high
+# limits first, ``columns`` maps each rule to its signal in ``signals``
+# and ``raise_at``/``clear_at`` are (rules, 1) read-only arrays, so a
+# batch of samples is checked without touching the settings dicts
+CompiledThresholds = namedtuple('CompiledThresholds', ['rules', 'signals', 'columns', 'split', 'raise_at', 'clear_at'])
+
+
+def compile_thresholds(settings, hysteresis=DEFAULT_HYSTERESIS):
+    """Compile saved settings into the immutable threshold arrays of an AlertEngine"""
+    # High-limit rules first, so each half is one plain comparison
+    rules = tuple(sorted(build_rules(settings), key=lambda rule: rule[3] != 'high'))
+    signals = tuple(sorted({rule[0] for rule in rules}))
+    threshold = np.array([rule[4] for rule in rules], dtype=float)
+    margin = np.abs(threshold) * hysteresis
+    split = sum(rule[3] == 'high' for rule in rules)
+
+    columns = np.array([signals.index(rule[0]) for rule in rules], dtype=np.intp)
+    raise_at = threshold[:, None]
+    clear_at = np.concatenate((threshold[:split] - margin[:split], threshold[split:] + margin[split:]))[:, None]
+    for array in (columns, raise_at, clear_at):
+        array.flags.writeable = False
+    return CompiledThresholds(rules, signals, columns, split, raise_at, clear_at)
+
+
+def _held(flags, carry, debounce):
+    """Mark samples that end a run of at least debounce True flags.
+
+    ``flags`` has one row per rule and one column per sample, and
+    ``carry`` is the length of each rule's run already in progress before
+    the first sample. Returns the marks and the run lengths after the last
+    sample.
+    """
+    rules, samples = flags.shape
+    history = carry[:, None] >= np.arange(debounce - 1, 0, -1)
+    extended = np.concatenate((history, flags), axis=1)
+    held = flags.copy()
+    for lag in range(1, debounce):
+        held &= extended[:, debounce - 1 - lag:debounce - 1 - lag + samples]
+
+    reversed_flags = flags[:, ::-1]
+    trailing = np.argmin(reversed_flags, axis=1)
+    run = np.where(reversed_flags.all(axis=1), samples + carry, trailing)
+    return held, run
+
+
+class AlertEngine:
+    """Vectorized limit checks with debounce and hysteresis.
+
+    The saved limits are compiled into arrays, one entry per rule, and a
+    batch of samples is checked against every rule in a handful of NumPy
+    operations. An alert raises after ``debounce`` consecutive samples past
+    its threshold and clears only after the same number of samples back
+    inside the threshold by the hysteresis margin, so it does not flap.
+    Compiled thresholds are swapped in whole by ``use``, so a settings
+    change never meets an evaluation half way.
+    """
+
+    def __init__(self, settings, debounce=DEFAULT_DEBOUNCE, hysteresis=DEFAULT_HYSTERESIS):
+        self.debounce = debounce
+        self.hysteresis = hysteresis
+        self._lock = threading.Lock()
+        self.configure(settings)
+
+    def configure(self, settings):
+        """Recompile the rules from settings, resetting alert state"""
+        self.use(compile_thresholds(settings, self.hysteresis))
+
+    def use(self, thresholds):
+        """Switch to compiled thresholds, resetting alert state"""
+        rules = len(thresholds.rules)
+        with self._lock:
+            self.thresholds = thresholds
+            self._active = np.zeros(rules, dtype=bool)
+            self._raise_run = np.zeros(rules, dtype=np.int64)
+            self._clear_run = np.zeros(rules, dtype=np.int64)
+            self._values = np.full(rules, np.nan)
+
+    def evaluate(self, samples):
+        """Update the alert state from a batch of samples (mapping of signal -> array)"""
+        with self._lock:
+            thresholds = self.thresholds
+            columns = [np.atleast_1d(np.asarray(samples.get(name, np.nan), dtype=float))
+                       for name in thresholds.signals]
+            length = max(len(column) for column in columns)
+            matrix = np.stack([np.broadcast_to(column, (length,)) for column in columns])
+
+            # One row per rule, one column per sample
+            values = matrix[thresholds.columns]
+            split, raise_at, clear_at = thresholds.split, thresholds.raise_at, thresholds.clear_at
+            raising = np.concatenate((values[:split] > raise_at[:split], values[split:] < raise_at[split:]))
+            clearing = np.concatenate((values[:split] < clear_at[:split], values[split:] > clear_at[split:]))
+
+            raised, self._raise_run = _held(raising, self._raise_run, self.debounce)
+            cleared, self._clear_run = _held(clearing, self._clear_run, self.debounce)
+
+            # The state after the batch is set by the last raise or clear event
+            events = (raised | cleared)[:, ::-1]
+            last_event = length - 1 - np.argmax(events, axis=1)
+            rule_index = np.arange(len(thresholds.rules))
+            self._active = np.where(events.any(axis=1), raised[rule_index, last_event], self._active)
+            self._values = values[:, -1]
+
+    def limit(self, signal, direction='high'):
+        """Return the tightest threshold of a signal's rules in one direction, None if it has none"""
+        thresholds = [rule[4] for rule in self.thresholds.rules if rule[0] == signal and rule[3] == direction]
+        if not thresholds:
+            return None
+        return min(thresholds) if direction == 'high' else max(thresholds)
+
+    def statuses(self):
+        """Return the card status of each signal with an active alert, 'alert' or 'warning'"""
+        with self._lock:
+            rules = self.thresholds.rules
+            active = np.flatnonzero(self._active)
+        statuses = {}
+        for i in active:
+            signal, level = rules[i][0], rules[i][5]
+            if level == 'danger' or signal not in statuses:
+                statuses[signal] = 'alert' if level == 'danger' else 'warning'
+        return statuses
+
+    def active(self):
+        """Return the active alerts as (title, message, level) tuples, most severe per signal"""
+        with self._lock:
+            rules = self.thresholds.rules
+            active = np.flatnonzero(self._active)
+            values = self._values.copy()
+
+        worst = {}
+        for i in active:
+            signal, label, unit, direction, threshold, level = rules[i]
+            current = worst.get(signal)
+            if current is None or LEVELS.index(level) > LEVELS.index(current[-1]):
+                worst[signal] = (i, signal, label, unit, direction, threshold, level)
+
+        # An alert held by debounce or hysteresis may be back inside its limit,
+        # so the message gives the limit crossed and the value now
+        alerts = []
+        for i, signal, label, unit, direction, threshold, level in worst.values():
+            value = values[i]
+            unit = unit if unit.startswith('°') else f" {unit}"
+            if direction == 'high':
+                title = f"High {label}" if level == 'danger' else f"Warning: {label}"
+                message = f"{threshold:g}{unit} limit exceeded (now {value:.1f}{unit})"
+            else:
+                title = f"Low {label}"
+                message = f"Fell below {threshold:g}{unit} (now {value:.1f}{unit})"
+            alerts.append((title, message, level))
+        return alerts
@@ -0,0 +1,73 @@
+import numpy as np
+
+from utils.regression import fit_by
+
+# Columns of the correlation matrix on the Statistical Analysis tab
+CORRELATION_COLUMNS = ('ram_pressure', 'front_temp', 'ram_speed', 'quality_score', 'extrusion_time')
+
+HISTOGRAM_BINS = 30
+
+
+def correlation(frame, columns=CORRELATION_COLUMNS):
+    """Pearson correlation matrix of the given columns"""
+    return frame[list(columns)].corr()
+
+
+def histogram(frame, column, bins=HISTOGRAM_BINS):
+    """Bin one column, returning the counts, the bin edges and its box statistics"""
+    values = frame[column].to_numpy(dtype=float)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    return {'counts': counts, 'edges': edges, 'box': _box(values)}
+
+
+def _box(values):
+    """Tukey box statistics of one group: quartiles, 1.5 IQR fences and outliers"""
+    if len(values) == 0:
+        return {'q1': np.nan, 'median': np.nan, 'q3': np.nan,
+                'lowerfence': np.nan, 'upperfence': np.nan, 'outliers': values}
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    reach = 1.5 * (q3 - q1)
+    inside = values[(values >= q1 - reach) & (values <= q3 + reach)]
+    return {
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': inside.min(), 'upperfence': inside.max(),
+        'outliers': values[(values < q1 - reach) | (values > q3 + reach)],
+    }
+
+
+def box_stats(frame, by, column='quality_score'):
+    """Box statistics of a column per value of a grouping column"""
+    stats = {}
+    for name, group in frame.groupby(by, observed=True, sort=True)[column]:
+        values = group.to_numpy(dtype=float)
+        stats[name] = _box(values[np.isfinite(values)])
+    return stats
+
+
+def trendlines(frame, x, y='quality_score', by='process'):
+    """Least-squares line of y on x per group, as a frame of fits"""
+    return fit_by(frame, x, y, by)
+
+
+def lowess_curves(frame, x, y='quality_score', by='process', frac=0.3):
+    """LOWESS smooth of y on x per group, as {group: (x, y)} arrays"""
+    from statsmodels.nonparametric.smoothers_lowess import lowess
+
+    curves = {}
+    for name, group in frame.groupby(by, observed=True, sort=True):
+        group = group[[x, y]].dropna()
+        if len(group) >= 3:
+            smoothed = lowess(group[y].to_numpy(), group[x].to_numpy(), frac=frac)
+            curves[name] = (smoothed[:, 0], smoothed[:, 1])
+    return curves
+
+
+# Analyses that can be cached per filter, by name; each takes (frame, parameter)
+ANALYSES = {
+    'correlation': correlation,
+    'histogram': histogram,
+    'box': box_stats,
+    'trendline': trendlines,
+    'lowess': lowess_curves,
+}
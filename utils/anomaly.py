@@ -0,0 +1,169 @@
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Samples in the trailing window the median and MAD are taken over
+DEFAULT_WINDOW = 24
+
+# Robust z-score beyond which a sample is flagged
+DEFAULT_THRESHOLD = 4.0
+
+# Scales the MAD to a standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+# Windows processed per batch; small enough for a chunk to stay in cache
+CHUNK_ROWS = 8192
+
+
+def _row_median(block):
+    """Median of each row by partial selection, without np.median's NaN handling"""
+    width = block.shape[1]
+    middle = width // 2
+    parted = np.partition(block, middle, axis=1)
+    if width % 2:
+        return parted[:, middle]
+    # Everything left of the pivot is smaller, so its maximum is the other middle value
+    return (parted[:, :middle].max(axis=1) + parted[:, middle]) / 2
+
+
+def rolling_median_mad(values, window=DEFAULT_WINDOW, chunk_rows=CHUNK_ROWS):
+    """Return the median and MAD of the ``window`` samples before each point.
+
+    The windows are strided views over the input, so only one chunk of
+    them is ever copied. The first ``window`` points have no full history
+    and get NaN, as do points whose window contains a missing value.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    median = np.full(n, np.nan)
+    mad = np.full(n, np.nan)
+    if n <= window:
+        return median, mad
+
+    windows = np.lib.stride_tricks.sliding_window_view(values[:-1], window)
+    for start in range(0, len(windows), chunk_rows):
+        block = windows[start:start + chunk_rows]
+        centre = _row_median(block)
+        spread = _row_median(np.abs(block - centre[:, None]))
+        median[window + start:window + start + len(block)] = centre
+        mad[window + start:window + start + len(block)] = spread
+
+    missing = np.concatenate(([0], np.cumsum(np.isnan(values))))
+    gaps = (missing[window:n] - missing[:n - window]) > 0
+    median[window:][gaps] = np.nan
+    mad[window:][gaps] = np.nan
+    return median, mad
+
+
+def robust_scores(values, window=DEFAULT_WINDOW):
+    """Return the robust z-score of every point against its trailing window"""
+    values = np.asarray(values, dtype=float)
+    median, mad = rolling_median_mad(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = (values - median) / (MAD_SCALE * mad)
+    # A flat window has no spread: any change from it counts as extreme
+    flat = mad == 0
+    scores[flat] = np.where(values[flat] == median[flat], 0.0, np.inf * np.sign(values[flat] - median[flat]))
+    return scores
+
+
+def seasonal_residuals(values, phase):
+    """Subtract the median of each seasonal phase, e.g. hour of day"""
+    values = np.asarray(values, dtype=float)
+    profile = pd.Series(values).groupby(np.asarray(phase)).median()
+    return values - profile.reindex(phase).to_numpy()
+
+
+def detect(frame, signals, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD, phase=None):
+    """Score every signal of a time-ordered frame in bulk.
+
+    With ``phase`` given, the seasonal profile is removed before the
+    rolling statistics, so a regular daily swing is not flagged. Returns
+    a frame of robust z-scores; points beyond ``threshold`` are anomalies.
+    """
+    scores = {}
+    for signal in signals:
+        values = frame[signal].to_numpy(dtype=float)
+        if phase is not None:
+            values = seasonal_residuals(values, phase)
+        scores[signal] = robust_scores(values, window)
+    return pd.DataFrame(scores, index=frame.index)
+
+
+def flagged(scores, threshold=DEFAULT_THRESHOLD):
+    """Return the boolean anomaly mask of a score frame or array"""
+    return np.abs(scores) > threshold
+
+
+class OnlineDetector:
+    """Rolling median/MAD detector fed one sample at a time.
+
+    Keeps the last ``window`` values of every signal in a small ring, so
+    each sample costs O(window) regardless of how long the stream has run,
+    and scores match ``robust_scores`` over the same series. Flagged
+    samples are kept as a short event log.
+    """
+
+    def __init__(self, signals, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD):
+        self.signals = list(signals)
+        self.window = window
+        self.threshold = threshold
+        self.events = deque(maxlen=500)
+        self._ring = np.full((len(self.signals), window), np.nan)
+        self._head = 0
+        self._seen = 0
+        self._lock = threading.Lock()
+
+    def push(self, timestamp, sample):
+        """Score one sample (mapping of signal -> value), returning the scores"""
+        values = np.array([sample.get(name, np.nan) for name in self.signals], dtype=float)
+        with self._lock:
+            if self._seen >= self.window:
+                median = np.median(self._ring, axis=1)
+                mad = np.median(np.abs(self._ring - median[:, None]), axis=1)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    scores = (values - median) / (MAD_SCALE * mad)
+                flat = mad == 0
+                scores[flat] = np.where(values[flat] == median[flat], 0.0,
+                                        np.inf * np.sign(values[flat] - median[flat]))
+            else:
+                scores = np.full(len(self.signals), np.nan)
+
+            for i in np.flatnonzero(np.abs(scores) > self.threshold):
+                self.events.append((pd.Timestamp(timestamp), self.signals[i], float(values[i]), float(scores[i])))
+            self._ring[:, self._head] = values
+            self._head = (self._head + 1) % self.window
+            self._seen += 1
+        return dict(zip(self.signals, scores))
+
+    def extend_frame(self, frame):
+        """Score a batch of samples in one pass, as pushing them one at a time would"""
+        values = frame.reindex(columns=self.signals).to_numpy(dtype=float).T
+        if not values.shape[1]:
+            return
+        with self._lock:
+            # The ring in time order, then the batch: each sample is scored
+            # against the window before it, as in push
+            known = min(self._seen, self.window)
+            history = np.roll(self._ring, -self._head, axis=1)[:, self.window - known:]
+            series = np.concatenate((history, values), axis=1)
+            scores = np.vstack([robust_scores(row, self.window) for row in series])[:, known:]
+
+            for j, i in np.argwhere(np.abs(scores.T) > self.threshold):
+                self.events.append((pd.Timestamp(frame.index[j]), self.signals[i], float(values[i, j]), float(scores[i, j])))
+            tail = series[:, -self.window:]
+            self._ring = np.full((len(self.signals), self.window), np.nan)
+            self._ring[:, :tail.shape[1]] = tail
+            self._head = tail.shape[1] % self.window
+            self._seen += values.shape[1]
+
+    def recent(self, since=None):
+        """Return flagged samples as (timestamp, signal, value, score), oldest first"""
+        with self._lock:
+            events = list(self.events)
+        if since is not None:
+            since = pd.Timestamp(since)
+            events = [event for event in events if event[0] >= since]
+        return events
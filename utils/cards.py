@@ -0,0 +1,51 @@
+from collections import namedtuple
+from html import escape
+
+# One metric card: value is a number or text, type picks the card colors
+# (pressure, temperature, position, status), status adds a good/warning/alert
+# dot and change a signed delta shown under the value
+Card = namedtuple('Card', 'label value unit type status change', defaults=('', 'status', None, None))
+
+# Templates are bound once; rendering a section is string formatting only
+_CARD = """<div class='metric-card {type}'><div class='metric-label'>{label}</div><div class='metric-value'>{dot}{value}{unit}</div>{change}</div>""".format
+_DOT = "<span class='status-dot status-{}'></span>".format
+_UNIT = "<span class='metric-unit'>{}</span>".format
+_CHANGE = "<div class='metric-change change-{}'>{} {}{}</div>".format
+_GRID = "<div class='card-grid' style='grid-template-columns: repeat({}, minmax(0, 1fr));'>{}</div>".format
+_TILE = "<div class='stat-tile' style='border-left-color: {accent};'><div class='stat-tile-label'>{label}</div><div class='stat-tile-value'>{value}</div></div>".format
+_ROW = "<div class='stat-row'><span class='stat-row-label'>{}:</span><span class='stat-row-value'>{}</span></div>".format
+
+_ARROWS = {'positive': '▲', 'negative': '▼', 'neutral': '→'}
+
+
+def format_value(value, digits=1):
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return escape(str(value))
+
+
+def card_html(card):
+    """Render one card from the bound template"""
+    unit = _UNIT(escape(card.unit)) if card.unit else ''
+    dot = _DOT(card.status) if card.status else ''
+    change = ''
+    if card.change is not None:
+        direction = 'positive' if card.change > 0 else 'negative' if card.change < 0 else 'neutral'
+        suffix = f" {card.unit}" if card.unit and not card.unit.startswith('°') else card.unit
+        change = _CHANGE(direction, _ARROWS[direction], f"{abs(card.change):.1f}", escape(suffix))
+    return _CARD(type=card.type, label=escape(card.label), dot=dot, value=format_value(card.value), unit=unit, change=change)
+
+
+def card_grid(cards, columns=4):
+    """Render a whole section of cards as a single HTML block"""
+    return _GRID(columns, ''.join(card_html(card) for card in cards))
+
+
+def stat_tiles(items, accent='#3b82f6'):
+    """Render (label, value) pairs as a stack of dark tiles in one block"""
+    return ''.join(_TILE(accent=accent, label=escape(label), value=format_value(value)) for label, value in items)
+
+
+def stat_rows(items):
+    """Render (label, value) pairs as label/value rows in one block"""
+    return ''.join(_ROW(escape(label), format_value(value)) for label, value in items)
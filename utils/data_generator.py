@@ -19,4 +19,228 @@ def generate_extrusion_data(num_records=1000):
         'quality_score': 90 + np.random.randn(num_records) * 5
     }
     
-    return pd.DataFrame(data)
\ No newline at end of file
+    return pd.DataFrame(data)
+
+# Signals sampled by the live monitoring page
+LIVE_SIGNALS = [
+    'ram_pressure', 'billet_pressure', 'front_temp', 'back_temp', 'oil_temp',
+    'ram_speed', 'container_position', 'sys_pressure', 'pilot_pressure'
+]
+
+
+def generate_live_data_points(num_points=60, end=None, freq='1s', rng=None):
+    """Generate a batch of live samples indexed by timestamp
+
+    Every column is drawn in one vectorized pass. Trends and cycles are a
+    function of absolute time, so consecutive batches join up smoothly.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    index = pd.date_range(end=end, periods=num_points, freq=freq, name='timestamp')
+
+    seconds = index.as_unit('ns').asi8 / 1e9
+    trend = np.sin(seconds / 10) * 2
+    cycle = np.sin(seconds / 5) * 1.5
+    noise = rng.standard_normal((len(LIVE_SIGNALS), num_points))
+
+    base_pressure = 48.7
+    base_temp = 410
+    base_speed = 0.5
+
+    data = {
+        'ram_pressure': base_pressure + trend + noise[0] * 0.5,
+        'billet_pressure': 224.5 + trend * 10 + noise[1] * 3,
+        'front_temp': base_temp + cycle + noise[2] * 2,
+        'back_temp': base_temp - 5 + cycle + noise[3] * 2,
+        'oil_temp': 29.1 + noise[4] * 0.5,
+        'ram_speed': np.maximum(0, base_speed + noise[5] * 0.3),
+        'container_position': 450 + noise[6] * 1,
+        'sys_pressure': 3.0 + noise[7] * 0.1,
+        'pilot_pressure': 48.7 + noise[8] * 0.3
+    }
+
+    return pd.DataFrame(data, index=index)
+
+
+def generate_current_data(rng=None):
+    """Generate current extrusion data matching the control panel"""
+    rng = np.random.default_rng() if rng is None else rng
+
+    data = {
+        'timestamp': datetime.now(),
+
+        # Core positions
+        'main_ram_position': 298.8 + rng.standard_normal() * 0.5,
+        'container_position': 450.0 + rng.standard_normal() * 0.5,
+
+        # Pressure system
+        'sys_pressure': 3.0 + rng.standard_normal() * 0.1,
+        'aux_pressure': 2.4 + rng.standard_normal() * 0.1,
+        'pilot_pressure': 48.7 + rng.standard_normal() * 0.5,
+        'ram_pressure': 48.7 + rng.standard_normal() * 0.5,
+        'ram_press': 0.0 + rng.standard_normal() * 0.1,
+        'lock_pressure': 2.3 + rng.standard_normal() * 0.1,
+        'low_pressure': 2.7 + rng.standard_normal() * 0.1,
+        'billet_pressure': 224.5 + rng.standard_normal() * 2,
+
+        # Temperature system
+        'oil_temp': 29.1 + rng.standard_normal() * 0.3,
+        'front_temp': 412.8 + rng.standard_normal() * 2,
+        'back_temp': 405.5 + rng.standard_normal() * 2,
+        'profile_temp': 0.0,
+
+        # Speed system
+        'ram_speed': 0.0 + rng.standard_normal() * 0.1,
+        'container_speed': 0.0 + rng.standard_normal() * 0.1,
+        'extrusion_time': 0.0,
+
+        # Residue & counters
+        'container_residue': max(1100, 1149.2 - rng.random() * 0.5),
+        'billet_residue': 0.0,
+        'die_counter': 0,
+        'total_count': 45,
+
+        # Status flags
+        'ram_status': 'STOP',
+        'mode': 'MANUAL',
+        'puller_status': 'ON',
+        'phase': 'PLUX',
+        'data_status': 'ACTIVE',
+        'ram_stop': 30,
+        'manual_mode': 30
+    }
+    return data
+
+
+# Categories of the historical records, shared with the Historical Analysis page
+PROCESSES = ['Roll_Production', 'Profile_Ext', 'Tube_Ext']
+MATERIALS = ['AL-6061', 'AL-7075', 'Copper']
+OPERATORS = ['OP01', 'OP02', 'OP03', 'Auto']
+
+# Quality columns added to the live signals in synthetic history
+QUALITY_SIGNALS = ['extrusion_time', 'quality_score', 'defect_count', 'product_length']
+
+# Rows per generated chunk; generating and writing one takes about
+# 0.5 KB per row at the peak, whatever the total row count
+HISTORY_CHUNK_ROWS = 500_000
+
+# Seconds between points of the slow pressure and temperature drifts,
+# which are interpolated to the sample rate
+DRIFT_STEP = 60
+
+# Seconds a press runs one process/material/operator combination
+RUN_SECONDS = 4 * 3600
+
+
+def press_ids(presses):
+    return [f'P{number:02d}' for number in range(1, presses + 1)]
+
+
+def iter_history_chunks(start, end, freq='1s', presses=1, seed=0, chunk_rows=HISTORY_CHUNK_ROWS):
+    """Yield (press id, DataFrame) chunks of synthetic history for start <= t < end
+
+    Each press draws from its own stream spawned from ``seed`` with
+    np.random.SeedSequence, and each chunk from a child of that stream,
+    so the same seed, frequency and chunk size always give the same data
+    whatever the number of presses. The slow drifts carry over between
+    chunks, so chunks join up without steps, and only one chunk is held
+    in memory at a time. Frames are indexed by timestamp and hold
+    LIVE_SIGNALS, QUALITY_SIGNALS and the process, material and operator
+    categories, which change every RUN_SECONDS.
+    """
+    step = pd.Timedelta(freq).as_unit('ns').value
+    first = pd.Timestamp(start).as_unit('ns').value
+    rows = max(0, -(-(pd.Timestamp(end).as_unit('ns').value - first) // step))
+    runs = rows * step // (RUN_SECONDS * 10**9) + 1
+
+    for press, press_seed in zip(press_ids(presses), np.random.SeedSequence(seed).spawn(presses)):
+        run_seed, drift_seed, *chunk_seeds = press_seed.spawn(2 + -(-rows // chunk_rows))
+        run_rng = np.random.default_rng(run_seed)
+        run_categories = {
+            'process': run_rng.integers(len(PROCESSES), size=runs),
+            'material': run_rng.integers(len(MATERIALS), size=runs),
+            'operator': run_rng.integers(len(OPERATORS), size=runs),
+        }
+        drift = _Drift(np.random.default_rng(drift_seed))
+        for chunk, begin in enumerate(range(0, rows, chunk_rows)):
+            stamps = first + step * np.arange(begin, min(begin + chunk_rows, rows), dtype=np.int64)
+            rng = np.random.default_rng(chunk_seeds[chunk])
+            yield press, _history_frame(stamps, rng, drift, run_categories, first)
+
+
+def _smooth(values, weight, start, block=32):
+    """Exponentially smooth values from start: y[i] = weight * x[i] + (1 - weight) * y[i-1].
+
+    Closed form per short block, y[i] = d[i] * (start + weight * cumsum(x / d)[i])
+    with d[i] = (1 - weight) ** (i + 1), so 1 / d stays well inside float range.
+    """
+    out = np.empty(len(values))
+    decay = (1 - weight) ** np.arange(1, block + 1)
+    for begin in range(0, len(values), block):
+        chunk = values[begin:begin + block]
+        d = decay[:len(chunk)]
+        out[begin:begin + len(chunk)] = d * (start + weight * np.cumsum(chunk / d))
+        start = out[begin + len(chunk) - 1]
+    return out
+
+
+class _Drift:
+    """Slow mean-reverting drifts sampled every DRIFT_STEP seconds"""
+
+    # Weight of each new step; about a 20 minute memory
+    WEIGHT = 0.05
+
+    def __init__(self, rng, channels=2):
+        self.rng = rng
+        self.channels = channels
+        self.step = None
+        self.values = np.zeros((channels, 0))
+
+    def at(self, seconds):
+        """Return the drifts at sorted times in seconds, extending them as needed"""
+        steps = np.floor(seconds / DRIFT_STEP).astype(np.int64)
+        if self.step is None:
+            self.step = steps[0]
+            self.values = self.rng.standard_normal((self.channels, 1))
+        needed = steps[-1] + 2 - self.step - self.values.shape[1]
+        if needed > 0:
+            # Keep the last known point so interpolation spans the seam
+            noise = self.rng.standard_normal((self.channels, needed)) * np.sqrt(2 / self.WEIGHT)
+            grown = np.array([_smooth(row, self.WEIGHT, last) for row, last in zip(noise, self.values[:, -1])])
+            self.values = np.concatenate((self.values, grown), axis=1)
+        # Drop the points behind this chunk
+        keep = steps[0] - self.step
+        self.values = self.values[:, keep:]
+        self.step = steps[0]
+        grid = (self.step + np.arange(self.values.shape[1])) * DRIFT_STEP
+        return [np.interp(seconds, grid, row) for row in self.values]
+
+
+def _history_frame(stamps, rng, drift, run_categories, first):
+    n = len(stamps)
+    seconds = stamps / 1e9
+    pressure_drift, temp_drift = drift.at(seconds)
+    daily = np.sin(2 * np.pi * (seconds % 86400) / 86400)
+    noise = rng.standard_normal((len(LIVE_SIGNALS) + 3, n))
+
+    front_temp = 410 + daily * 5 + temp_drift * 2 + noise[2] * 2
+    data = {
+        'ram_pressure': 48.7 + pressure_drift + noise[0] * 0.5,
+        'billet_pressure': 224.5 + pressure_drift * 5 + noise[1] * 3,
+        'front_temp': front_temp,
+        'back_temp': front_temp - 5 + noise[3] * 1.5,
+        'oil_temp': 29.1 + daily + noise[4] * 0.5,
+        'ram_speed': np.maximum(0, 0.5 + noise[5] * 0.3),
+        'container_position': 450 + noise[6],
+        'sys_pressure': 3.0 + noise[7] * 0.1,
+        'pilot_pressure': 48.7 + noise[8] * 0.3,
+        'extrusion_time': 120 + noise[9] * 15,
+        # Quality falls off above 420°C at the die
+        'quality_score': 90 - np.maximum(front_temp - 420, 0) * 0.5 + noise[10] * 3,
+        'defect_count': rng.poisson(0.5, n).astype(float),
+        'product_length': 6000 + noise[11] * 200,
+    }
+    run = (stamps - first) // (RUN_SECONDS * 10**9)
+    for name, values in (('process', PROCESSES), ('material', MATERIALS), ('operator', OPERATORS)):
+        data[name] = pd.Categorical.from_codes(run_categories[name][run], categories=values)
+    return pd.DataFrame(data, index=pd.DatetimeIndex(stamps.view('datetime64[ns]'), name='timestamp'))
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# Plot width assumed for full-width charts in the wide layout
+DEFAULT_CHART_WIDTH = 1600
+
+# Points kept per horizontal pixel; two per pixel keeps peaks visible
+POINTS_PER_PIXEL = 2
+
+
+def point_budget(width_px=DEFAULT_CHART_WIDTH):
+    """Return how many points a trace of the given pixel width can show"""
+    return int(width_px * POINTS_PER_PIXEL)
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').view(np.int64)
+        return (x - x[0]).astype(float) if len(x) else x.astype(float)
+    return x.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """Select n_out points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket, which preserves
+    peaks and troughs.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges = np.append(edges, n)
+    # Average of every bucket, used as the third vertex of the triangle
+    sums_x = np.add.reduceat(x, edges[:-1])
+    sums_y = np.add.reduceat(y, edges[:-1])
+    sizes = np.diff(edges)
+    avg_x, avg_y = sums_x / sizes, sums_y / sizes
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i + 1]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Keep the minimum and maximum of n_out // 2 equal-width buckets"""
+    n = len(y)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    size = n // buckets
+    body = y[:size * buckets].reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    picks = np.concatenate((offsets + body.argmin(axis=1), offsets + body.argmax(axis=1)))
+    if size * buckets < n:
+        picks = np.append(picks, n - 1)
+    return np.unique(picks)
+
+
+def downsample_indices(x, y, n_out=None, method='lttb'):
+    """Return the indices of the points to plot, skipping missing values"""
+    n_out = point_budget() if n_out is None else n_out
+    y = np.asarray(y, dtype=float)
+    if len(y) <= n_out:
+        return np.arange(len(y))
+    finite = np.flatnonzero(np.isfinite(y))
+    if method == 'minmax':
+        picks = minmax_indices(y[finite], n_out)
+    else:
+        picks = lttb_indices(np.asarray(x)[finite], y[finite], n_out)
+    return finite[picks]
+
+
+def downsample_xy(x, y, n_out=None, method='lttb'):
+    """Downsample one trace, returning (x, y) unchanged when it already fits"""
+    keep = downsample_indices(x, y, n_out, method)
+    if len(keep) == len(y):
+        return x, y
+    return np.asarray(x)[keep], np.asarray(y)[keep]
+
+
+def downsample_frame(frame, x, y, by=None, n_out=None, method='lttb'):
+    """Downsample the rows of a frame per trace before handing it to Plotly.
+
+    With ``by`` set, every group becomes its own trace and gets an equal
+    share of the point budget.
+    """
+    n_out = point_budget() if n_out is None else n_out
+    if len(frame) <= n_out:
+        return frame
+    if by is None:
+        return frame.iloc[downsample_indices(frame[x].to_numpy(), frame[y].to_numpy(), n_out, method)]
+
+    codes, uniques = pd.factorize(frame[by])
+    share = max(n_out // max(len(uniques), 1), 3)
+    xs, ys = frame[x].to_numpy(), frame[y].to_numpy()
+    keep = []
+    for code in range(len(uniques)):
+        rows = np.flatnonzero(codes == code)
+        keep.append(rows[downsample_indices(xs[rows], ys[rows], share, method)])
+    return frame.iloc[np.sort(np.concatenate(keep))]
@@ -0,0 +1,129 @@
+import gzip
+import importlib.util
+import tempfile
+
+# Rows converted per batch; bounds the memory used while encoding
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Exports larger than this spill from memory to a temporary file
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+
+# Sheet row limit of the xlsx format, header included
+EXCEL_MAX_ROWS = 1_048_576
+
+EXPORT_FORMATS = {
+    'CSV': {
+        'extension': 'csv', 'mime': 'text/csv',
+        'compression': [None, 'gzip'], 'module': None,
+    },
+    'Parquet': {
+        'extension': 'parquet', 'mime': 'application/vnd.apache.parquet',
+        'compression': ['snappy', 'zstd', 'gzip', None], 'module': 'pyarrow',
+    },
+    'Excel': {
+        'extension': 'xlsx', 'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'compression': [None], 'module': 'openpyxl',
+    },
+}
+
+
+def format_available(fmt):
+    """Return whether the optional dependency of an export format is installed"""
+    module = EXPORT_FORMATS[fmt]['module']
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def rows_fit(fmt, rows):
+    """Return whether rows data rows fit in one file of the format"""
+    return fmt != 'Excel' or rows + 1 <= EXCEL_MAX_ROWS
+
+
+def export_file_name(base, fmt, compression=None):
+    name = f"{base}.{EXPORT_FORMATS[fmt]['extension']}"
+    if fmt == 'CSV' and compression == 'gzip':
+        name += '.gz'
+    return name
+
+
+def export_mime(fmt, compression=None):
+    if fmt == 'CSV' and compression == 'gzip':
+        return 'application/gzip'
+    return EXPORT_FORMATS[fmt]['mime']
+
+
+def iter_chunks(frame, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield consecutive row batches of a DataFrame"""
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def iter_csv_chunks(frame, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield the CSV encoding of a DataFrame as bytes, one row batch at a time"""
+    if len(frame) == 0:
+        yield frame.to_csv(index=False).encode()
+        return
+    for i, chunk in enumerate(iter_chunks(frame, chunk_rows)):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode()
+
+
+def write_csv(frame, sink, compression=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    target = gzip.GzipFile(fileobj=sink, mode='wb') if compression == 'gzip' else sink
+    for block in iter_csv_chunks(frame, chunk_rows):
+        target.write(block)
+    if target is not sink:
+        target.close()
+
+
+def write_parquet(frame, sink, compression='snappy', chunk_rows=DEFAULT_CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for chunk in iter_chunks(frame, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema, compression=compression or 'none')
+        writer.write_table(table)
+    if writer is None:
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), sink)
+    else:
+        writer.close()
+
+
+def write_excel(frame, sink, chunk_rows=DEFAULT_CHUNK_ROWS):
+    from openpyxl import Workbook
+
+    if not rows_fit('Excel', len(frame)):
+        raise ValueError(
+            f"{len(frame):,} rows exceed the Excel sheet limit; export CSV or Parquet instead"
+        )
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('extrusion_data')
+    sheet.append([str(col) for col in frame.columns])
+    for chunk in iter_chunks(frame, chunk_rows):
+        # Excel cells cannot hold pandas categoricals
+        chunk = chunk.astype({col: str for col in chunk.columns if chunk[col].dtype == 'category'})
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(sink)
+
+
+def export_frame(frame, fmt, compression=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Encode a DataFrame batch by batch and return the file as bytes.
+
+    The output is spooled in memory and moves to a temporary file once it
+    outgrows SPOOL_MAX_BYTES, so only one batch is held in encoded form
+    until the finished file is read back for the download.
+    """
+    sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    if fmt == 'CSV':
+        write_csv(frame, sink, compression, chunk_rows)
+    elif fmt == 'Parquet':
+        write_parquet(frame, sink, compression, chunk_rows)
+    elif fmt == 'Excel':
+        write_excel(frame, sink, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    with sink:
+        sink.seek(0)
+        return sink.read()
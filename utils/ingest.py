@@ -0,0 +1,382 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.data_generator import LIVE_SIGNALS
+from utils.perf import count, timed
+from utils.plc import REGISTER_MAP, decode_records, local_to_utc, record_dtype, utc_to_local
+
+# Samples are pushed in one of two formats, chosen per TCP connection by
+# its first bytes and per UDP datagram.
+#
+# Timestamps on the wire are always UTC, in nanoseconds since the epoch;
+# parsing converts them to the local time the rest of the app uses.
+#
+# Line protocol, one sample per line: press id, UTC timestamp in nanoseconds
+# since the epoch, then comma-separated field=value pairs using the field
+# names of generate_current_data. Fields left out are missing for that
+# sample; the first line of a press should carry every field. Each
+# press's lines are expected in time order.
+#
+#   P01 1718000000000000000 ram_pressure=48.7,front_temp=412.8,phase=EXTRUDE
+#
+# Binary frames: BINARY_MAGIC, a big-endian uint16 record count, then the
+# records. A record is the press id (PRESS_ID_BYTES, zero padded), the
+# UTC timestamp as a big-endian int64 in nanoseconds and the PLC register
+# image of REGISTER_MAP.
+BINARY_MAGIC = b'\xa5\x5a'
+FRAME_HEADER = struct.Struct('>2sH')
+PRESS_ID_BYTES = 8
+
+# Bytes read from a TCP connection at a time
+READ_SIZE = 64 * 1024
+
+# Chunks waiting to be parsed. A full queue stops the TCP connections
+# from reading, so TCP flow control slows the senders; UDP datagrams
+# that find it full are dropped and counted
+QUEUE_SIZE = 64
+
+# Bytes of queued chunks parsed and published together, and the seconds
+# a batch waits for more chunks; like the PLC adapter's PUBLISH_INTERVAL,
+# this bounds how often each press's buffers and charts are updated
+BATCH_BYTES = 1024 * 1024
+BATCH_INTERVAL = 0.1
+
+# A TCP line longer than this closes the connection
+MAX_LINE = 64 * 1024
+
+# Chunk latencies kept for the percentiles
+LATENCY_WINDOW = 100_000
+
+# Listen address of the ingest endpoint, e.g. STREAMLET_INGEST="0.0.0.0:8094";
+# nothing listens when the variable is unset
+INGEST_ADDRESS = os.environ.get('STREAMLET_INGEST')
+
+# Presses fed by pushes instead of the built-in generator, e.g.
+# STREAMLET_INGEST_PRESSES="P02,P03"; by default every press without a PLC
+INGEST_PRESSES = [press.strip() for press in os.environ['STREAMLET_INGEST_PRESSES'].split(',') if press.strip()] \
+    if os.environ.get('STREAMLET_INGEST_PRESSES') else None
+
+# Placeholder for a field a line leaves out; parses as NaN
+_MISSING = 'nan'
+
+_INTEGER_FIELDS = {field for field, _, kind in REGISTER_MAP if kind in ('uint16', 'uint32')}
+
+
+def parse_address(spec, default_port=8094):
+    """Parse 'host:port' into (host, port)"""
+    host, _, port = (spec or '').rpartition(':')
+    return host or '0.0.0.0', int(port or default_port)
+
+
+def binary_dtype(register_map=REGISTER_MAP):
+    """Structured dtype of one binary record: press id, timestamp and register image"""
+    image = record_dtype(register_map)
+    header = PRESS_ID_BYTES + 8
+    return np.dtype({
+        'names': ['press', 'timestamp'] + list(image.names),
+        'formats': [f'S{PRESS_ID_BYTES}', '>i8'] + [image.fields[name][0] for name in image.names],
+        'offsets': [0, PRESS_ID_BYTES] + [header + image.fields[name][1] for name in image.names],
+        'itemsize': header + image.itemsize,
+    })
+
+
+RECORD_SIZE = binary_dtype().itemsize
+
+
+def format_line(press, record):
+    """Return one sample record, stamped in local time, as a line of the line protocol"""
+    stamp = local_to_utc(record['timestamp'])
+    fields = ','.join(f'{name}={value}' for name, value in record.items() if name not in ('timestamp', 'press'))
+    return f'{press} {stamp} {fields}\n'
+
+
+def encode_frame(records):
+    """Return a binary frame of a structured array of binary_dtype records"""
+    return FRAME_HEADER.pack(BINARY_MAGIC, len(records)) + records.tobytes()
+
+
+def parse_lines(text):
+    """Parse line-protocol text into {press: (frame, last record)}, skipping malformed lines.
+
+    Returns the samples per press and the number of lines skipped.
+    """
+    lines = {}
+    malformed = 0
+    for line in text.splitlines():
+        if not line or line[0] == '#':
+            continue
+        parts = line.split(' ', 2)
+        if len(parts) != 3 or not parts[1].isdigit():
+            malformed += 1
+            continue
+        stamps, fields = lines.setdefault(parts[0], ([], []))
+        stamps.append(int(parts[1]))
+        fields.append(parts[2])
+
+    parsed = {}
+    for press, (stamps, fields) in lines.items():
+        columns, keep = _field_columns(fields)
+        malformed += len(fields) - len(keep)
+        if not keep:
+            continue
+        index = pd.DatetimeIndex(utc_to_local(np.array(stamps, dtype=np.int64)[keep]), name='timestamp')
+        numeric, last = {}, {'timestamp': index[-1]}
+        for name, values in columns.items():
+            try:
+                numeric[name] = np.array(list(map(float, values)))
+            except ValueError:
+                # Status text such as phase=EXTRUDE only matters as the latest value
+                latest = next((value for value in reversed(values) if value != _MISSING), None)
+                if latest is not None:
+                    last[name] = latest
+                continue
+            valid = np.flatnonzero(~np.isnan(numeric[name]))
+            if len(valid):
+                value = numeric[name][valid[-1]]
+                last[name] = int(value) if name in _INTEGER_FIELDS else float(value)
+        frame = pd.DataFrame(numeric, index=index)
+        parsed[press] = (frame, last)
+    return parsed, malformed
+
+
+def _field_columns(fields):
+    """Split the field lists of one press's lines into string columns.
+
+    Returns {name: values} and the positions of the lines used. Senders
+    usually repeat one field layout, which is split out of a single
+    joined string; otherwise every line is parsed on its own and fields a
+    line leaves out are missing.
+    """
+    names = fields[0].replace('=', ',').split(',')[0::2]
+    tokens = ','.join(fields).replace('=', ',').split(',')
+    if len(tokens) == 2 * len(names) * len(fields) and tokens[0::2] == names * len(fields):
+        width = 2 * len(names)
+        return {name: tokens[2 * j + 1::width] for j, name in enumerate(names)}, list(range(len(fields)))
+
+    rows, keep = [], []
+    for position, line in enumerate(fields):
+        try:
+            rows.append(dict(pair.split('=') for pair in line.split(',')))
+        except ValueError:
+            continue
+        keep.append(position)
+    names = dict.fromkeys(name for row in rows for name in row)
+    return {name: [row.get(name, _MISSING) for row in rows] for name in names}, keep
+
+
+def parse_frames(chunks, register_map=REGISTER_MAP):
+    """Parse chunks of whole binary frames into {press: (frame, last record)}.
+
+    Returns the samples per press and the number of chunks skipped for a
+    bad frame header.
+    """
+    dtype = binary_dtype(register_map)
+    bodies = []
+    malformed = 0
+    for chunk in chunks:
+        offset, parts = 0, []
+        try:
+            while offset < len(chunk):
+                length = frame_length(chunk, offset, dtype.itemsize)
+                if length is None or offset + length > len(chunk):
+                    raise ValueError(f"Truncated frame at byte {offset}")
+                parts.append(chunk[offset + FRAME_HEADER.size:offset + length])
+                offset += length
+        except ValueError:
+            malformed += 1
+            continue
+        bodies += parts
+    decoded = np.frombuffer(b''.join(bodies), dtype=dtype)
+
+    parsed = {}
+    for press in np.unique(decoded['press']):
+        rows = decoded[decoded['press'] == press]
+        rows = rows[np.argsort(rows['timestamp'], kind='stable')]
+        index = pd.DatetimeIndex(utc_to_local(rows['timestamp']), name='timestamp')
+        parsed[press.decode('ascii')] = decode_records(rows, index, register_map)
+    return parsed, malformed
+
+
+def frame_length(data, offset=0, record_size=None):
+    """Return the byte length of the binary frame at offset, or None if its header is incomplete"""
+    if len(data) - offset < FRAME_HEADER.size:
+        return None
+    magic, records = FRAME_HEADER.unpack_from(data, offset)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"Bad frame header at byte {offset}")
+    return FRAME_HEADER.size + records * (record_size or RECORD_SIZE)
+
+
+class IngestServer:
+    """TCP and UDP endpoint for presses that push their samples.
+
+    Connections only cut the stream into whole lines or frames and queue
+    the chunks; one consumer drains the queue in batches of up to
+    BATCH_BYTES or BATCH_INTERVAL, parses each batch on a worker thread and
+    hands every press's samples to its Sampler with ``Sampler.publish``.
+    The store writers keep the batches columnar. Like PLCPoller, the
+    event loop runs on its own thread.
+    """
+
+    def __init__(self, samplers, host='0.0.0.0', port=8094, queue_size=QUEUE_SIZE, batch_bytes=BATCH_BYTES,
+                 batch_interval=BATCH_INTERVAL):
+        self.samplers = samplers
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.batch_bytes = batch_bytes
+        self.batch_interval = batch_interval
+        self.samples = 0
+        self.malformed = 0
+        self.unknown = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.published = None
+        self._current = {}
+        self._queue = None
+        self._loop = None
+        self._stopped = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='ingest-server', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join()
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._queue = asyncio.Queue(self.queue_size)
+        tcp = await asyncio.start_server(self._handle, self.host, self.port)
+        udp, _ = await self._loop.create_datagram_endpoint(lambda: _Datagrams(self), local_addr=(self.host, self.port))
+        consumer = asyncio.create_task(self._consume())
+        self._ready.set()
+        try:
+            await self._stopped.wait()
+        finally:
+            tcp.close()
+            udp.close()
+            await self._queue.join()
+            consumer.cancel()
+
+    async def _handle(self, reader, writer):
+        """Cut one TCP stream into whole lines or frames and queue them"""
+        pending = b''
+        binary = None
+        try:
+            while data := await reader.read(READ_SIZE):
+                pending += data
+                if binary is None:
+                    if len(pending) < len(BINARY_MAGIC):
+                        continue
+                    binary = pending.startswith(BINARY_MAGIC)
+                if binary:
+                    cut = 0
+                    while (length := frame_length(pending, cut)) is not None and cut + length <= len(pending):
+                        cut += length
+                else:
+                    cut = pending.rfind(b'\n') + 1
+                    if not cut and len(pending) > MAX_LINE:
+                        raise ValueError("Line too long")
+                if cut:
+                    # Waits while the queue is full, which stops this reader
+                    await self._queue.put((time.perf_counter(), pending[:cut]))
+                    pending = pending[cut:]
+        except (ValueError, ConnectionError):
+            self.malformed += 1
+            count('ingest.malformed')
+        finally:
+            writer.close()
+
+    def _datagram(self, data):
+        try:
+            self._queue.put_nowait((time.perf_counter(), data))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            count('ingest.dropped')
+
+    async def _consume(self):
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][1])
+            deadline = self._loop.time() + self.batch_interval
+            while size < self.batch_bytes:
+                if self._queue.empty():
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), deadline - self._loop.time())
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                batch.append(item)
+                size += len(item[1])
+            try:
+                await asyncio.to_thread(self._process, batch)
+            except Exception:
+                # A bad batch must not stop the consumer, or every sender would stall
+                count('ingest.errors')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _process(self, batch):
+        """Parse a batch of chunks and publish it, one call per press and format"""
+        with timed('ingest.batch'):
+            chunks = [chunk for _, chunk in batch]
+            # UDP datagrams need not end in a newline; keep their last lines apart
+            text = b''.join(chunk if chunk.endswith(b'\n') else chunk + b'\n'
+                            for chunk in chunks if not chunk.startswith(BINARY_MAGIC))
+            frames = [chunk for chunk in chunks if chunk.startswith(BINARY_MAGIC)]
+            parsed = []
+            if text:
+                parsed.append(parse_lines(text.decode('utf-8', 'replace')))
+            if frames:
+                parsed.append(parse_frames(frames))
+            for samples, malformed in parsed:
+                self.malformed += malformed
+                count('ingest.malformed', malformed)
+                for press, (frame, current) in samples.items():
+                    self._publish(press, frame, current)
+        self.published = time.perf_counter()
+        self.latencies.extend(self.published - received for received, _ in batch)
+
+    def _publish(self, press, frame, current):
+        sampler = self.samplers.get(press)
+        if sampler is None:
+            self.unknown += len(frame)
+            count('ingest.unknown', len(frame))
+            return
+        # The newest record carries forward the fields this batch left out
+        record = dict(self._current.get(press, {}))
+        record.update(current)
+        self._current[press] = record
+        for name in LIVE_SIGNALS:
+            if name not in frame:
+                frame[name] = np.nan
+        sampler.publish(frame, dict(record))
+        self.samples += len(frame)
+        count('ingest.samples', len(frame))
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server._datagram(data)
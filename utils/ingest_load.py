@@ -0,0 +1,153 @@
+"""Load generator for the ingest endpoint, pushing synthetic press samples.
+
+Run from the repository root against a running ingest endpoint:
+
+    python -m utils.ingest_load --port 8094 --presses 3 --rate 1000
+    python -m utils.ingest_load --format binary --transport udp --rate 0
+
+Each press sends ``--rate`` samples a second (0 sends as fast as the
+endpoint accepts them) in sends of ``--batch`` samples. Samples cycle
+through a pool made by the data generator and are stamped in UTC when
+sent, as the wire formats require.
+Over TCP a slow endpoint blocks the sender, so the achieved rate shows
+the backpressure; over UDP the excess is dropped by the endpoint.
+"""
+import argparse
+import socket
+import time
+
+import numpy as np
+
+from utils.data_generator import LIVE_SIGNALS, generate_current_data, generate_live_data_points, press_ids
+from utils.ingest import BINARY_MAGIC, binary_dtype, encode_frame
+from utils.plc import ENUMS, REGISTER_MAP
+
+# Samples generated per press and cycled through
+POOL_SIZE = 10_000
+
+# Largest UDP payload sent, under the 65507-byte datagram limit
+MAX_DATAGRAM = 60_000
+
+
+class PressLoad:
+    """Pre-generated samples of one press, encoded for the chosen format"""
+
+    def __init__(self, press, binary, rng):
+        self.press = press
+        self.binary = binary
+        live = generate_live_data_points(POOL_SIZE, rng=rng)
+        records = [generate_current_data(rng) for _ in range(POOL_SIZE // 100)]
+        if binary:
+            self.pool = np.zeros(POOL_SIZE, dtype=binary_dtype())
+            self.pool['press'] = press.encode('ascii')
+            for field, _, kind in REGISTER_MAP:
+                if field in LIVE_SIGNALS:
+                    self.pool[field] = live[field].to_numpy()
+                elif kind == 'enum':
+                    self.pool[field] = np.repeat([ENUMS[field].index(r[field]) for r in records], 100)
+                else:
+                    self.pool[field] = np.repeat([r[field] for r in records], 100)
+        else:
+            self.pool = []
+            for i, row in enumerate(live.to_dict('records')):
+                record = {**records[i // 100], **row}
+                del record['timestamp']
+                self.pool.append(','.join(f'{name}={value}' for name, value in record.items()))
+        self._next = 0
+        self._stamp = time.time_ns()
+
+    def batch(self, size):
+        """Return the payloads of the next size samples, stamped up to now"""
+        rows = (self._next + np.arange(size)) % POOL_SIZE
+        self._next = (self._next + size) % POOL_SIZE
+        now = max(time.time_ns(), self._stamp + size)
+        stamps = self._stamp + (now - self._stamp) * np.arange(1, size + 1) // size
+        self._stamp = now
+        if self.binary:
+            records = self.pool[rows]
+            records['timestamp'] = stamps
+            return [encode_frame(records)]
+        fields = self.pool
+        return [''.join(f'{self.press} {stamp} {fields[row]}\n' for stamp, row in zip(stamps.tolist(), rows.tolist())).encode()]
+
+
+def datagrams(payload):
+    """Split a payload into datagrams of whole frames or lines"""
+    if len(payload) <= MAX_DATAGRAM:
+        return [payload]
+    if payload.startswith(BINARY_MAGIC):
+        size = binary_dtype().itemsize
+        records = payload[4:]
+        per = MAX_DATAGRAM // size
+        return [encode_frame(np.frombuffer(records[i:i + per * size], dtype=binary_dtype()))
+                for i in range(0, len(records), per * size)]
+    parts, start = [], 0
+    while start < len(payload):
+        cut = payload.rfind(b'\n', start, start + MAX_DATAGRAM) + 1
+        parts.append(payload[start:cut])
+        start = cut
+    return parts
+
+
+def connect(host, port, wait):
+    """Open the TCP connection, retrying for up to wait seconds while the endpoint starts"""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except ConnectionRefusedError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8094)
+    parser.add_argument('--presses', type=int, default=1)
+    parser.add_argument('--rate', type=float, default=1000, help="samples per second per press, 0 for no limit")
+    parser.add_argument('--batch', type=int, default=100, help="samples per send")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--format', choices=['line', 'binary'], default='line')
+    parser.add_argument('--transport', choices=['tcp', 'udp'], default='tcp')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--wait', type=float, default=30, help="seconds to retry connecting over TCP")
+    args = parser.parse_args()
+
+    seeds = np.random.SeedSequence(args.seed).spawn(args.presses)
+    loads = [PressLoad(press, args.format == 'binary', np.random.default_rng(seed))
+             for press, seed in zip(press_ids(args.presses), seeds)]
+    if args.transport == 'tcp':
+        sock = connect(args.host, args.port, args.wait)
+
+        def send(payload):
+            sock.sendall(payload)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        def send(payload):
+            for datagram in datagrams(payload):
+                sock.sendto(datagram, (args.host, args.port))
+
+    print(f"Sending {args.format} samples of {args.presses} press(es) over {args.transport}", flush=True)
+    period = args.batch / args.rate if args.rate else 0
+    sent = 0
+    began = time.perf_counter()
+    deadline = began
+    try:
+        while time.perf_counter() - began < args.seconds:
+            for load in loads:
+                for payload in load.batch(args.batch):
+                    send(payload)
+                sent += args.batch
+            deadline += period
+            time.sleep(max(deadline - time.perf_counter(), 0))
+    finally:
+        sock.close()
+    elapsed = time.perf_counter() - began
+    print(f"sent {sent} samples in {elapsed:.2f} s ({sent / elapsed:,.0f} samples/s)", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Timings kept per section for the rolling percentiles
+WINDOW = 500
+
+# Prometheus textfile written for the node exporter's textfile collector;
+# nothing is written when the variable is unset
+METRICS_FILE = os.environ.get('STREAMLET_METRICS_FILE')
+
+# Minimum seconds between two writes of the metrics file
+EXPORT_INTERVAL = float(os.environ.get('STREAMLET_METRICS_INTERVAL', 15))
+
+METRIC_PREFIX = 'streamlet'
+
+
+class PerfRegistry:
+    """Rolling timings and counters shared by every session of the process.
+
+    Each named section keeps its last ``window`` durations for the p50/p95
+    and lifetime totals for the Prometheus summary; counters only ever
+    increase. Recording is a lock and a deque append, cheap enough to
+    leave on in production.
+    """
+
+    def __init__(self, window=WINDOW, path=METRICS_FILE, interval=EXPORT_INTERVAL):
+        self.window = window
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._totals = {}
+        self._counters = {}
+        self._exported = 0.0
+
+    def record(self, name, seconds):
+        with self._lock:
+            if name not in self._timings:
+                self._timings[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            self._timings[name].append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+        self._maybe_export()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+        self._maybe_export()
+
+    @contextmanager
+    def timed(self, name):
+        """Time the enclosed block, or the decorated function, as a named section"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def laps(self, prefix):
+        return Laps(self, prefix)
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+    def timings(self):
+        """Return one row per section with its rolling statistics in milliseconds"""
+        with self._lock:
+            rows = [(name, np.array(values), *self._totals[name]) for name, values in self._timings.items()]
+        columns = ['section', 'calls', 'last_ms', 'p50_ms', 'p95_ms', 'max_ms', 'total_s']
+        frame = pd.DataFrame([
+            (name, calls, values[-1] * 1000, *np.percentile(values, [50, 95]) * 1000, values.max() * 1000, total)
+            for name, values, calls, total in rows
+        ], columns=columns)
+        return frame.sort_values('section', ignore_index=True)
+
+    def counters(self):
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def prometheus(self):
+        """Return the registry in the Prometheus text exposition format"""
+        with self._lock:
+            rows = [(name, np.array(values), *self._totals[name]) for name, values in sorted(self._timings.items())]
+            counters = sorted(self._counters.items())
+        summary = f'{METRIC_PREFIX}_section_seconds'
+        counter = f'{METRIC_PREFIX}_events_total'
+        lines = [
+            f'# HELP {summary} Wall time of instrumented sections, quantiles over the last {self.window} calls',
+            f'# TYPE {summary} summary',
+        ]
+        for name, values, calls, total in rows:
+            label = _label(name)
+            for quantile, value in zip(('0.5', '0.95'), np.percentile(values, [50, 95])):
+                lines.append(f'{summary}{{section="{label}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'{summary}_sum{{section="{label}"}} {total:.6f}')
+            lines.append(f'{summary}_count{{section="{label}"}} {calls}')
+        lines += [f'# HELP {counter} Counted events', f'# TYPE {counter} counter']
+        lines += [f'{counter}{{name="{_label(name)}"}} {value}' for name, value in counters]
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path=None):
+        """Write the metrics file atomically so the scraper never reads half a file"""
+        path = path or self.path
+        if not path:
+            return None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        staging = f'{path}.{os.getpid()}.tmp'
+        with open(staging, 'w') as handle:
+            handle.write(self.prometheus())
+        os.replace(staging, path)
+        return path
+
+    def _maybe_export(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._exported < self.interval:
+                return
+            self._exported = now
+        try:
+            self.write_textfile()
+        except OSError:
+            # A full or read-only disk must not break the dashboard
+            pass
+
+
+class Laps:
+    """Time consecutive sections of a straight-line script.
+
+    Each ``lap(name)`` records the time since the previous lap (or since
+    the Laps was created) as ``<prefix>.<name>``, so a page can be split
+    into sections without re-indenting it under context managers.
+    """
+
+    def __init__(self, registry, prefix):
+        self.registry = registry
+        self.prefix = prefix
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.registry.record(f'{self.prefix}.{name}', now - self._last)
+        self._last = now
+
+    def skip(self):
+        """Start the next lap now, leaving the time since the last one unrecorded"""
+        self._last = time.perf_counter()
+
+
+def _label(name):
+    return name.replace('\\', '\\\\').replace('"', '\\"')
+
+
+# The process-wide registry; page scripts rerun but modules stay imported
+REGISTRY = PerfRegistry()
+timed = REGISTRY.timed
+count = REGISTRY.count
+laps = REGISTRY.laps
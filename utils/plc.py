@@ -0,0 +1,338 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.perf import count, timed
+
+# Holding register map of the press PLC: (field, first register, type).
+# Floats and 32-bit counters take two registers, high word first
+REGISTER_MAP = [
+    ('main_ram_position', 0, 'float32'),
+    ('container_position', 2, 'float32'),
+    ('sys_pressure', 4, 'float32'),
+    ('aux_pressure', 6, 'float32'),
+    ('pilot_pressure', 8, 'float32'),
+    ('ram_pressure', 10, 'float32'),
+    ('ram_press', 12, 'float32'),
+    ('lock_pressure', 14, 'float32'),
+    ('low_pressure', 16, 'float32'),
+    ('billet_pressure', 18, 'float32'),
+    ('oil_temp', 20, 'float32'),
+    ('front_temp', 22, 'float32'),
+    ('back_temp', 24, 'float32'),
+    ('profile_temp', 26, 'float32'),
+    ('ram_speed', 28, 'float32'),
+    ('container_speed', 30, 'float32'),
+    ('extrusion_time', 32, 'float32'),
+    ('container_residue', 34, 'float32'),
+    ('billet_residue', 36, 'float32'),
+    ('die_counter', 38, 'uint32'),
+    ('total_count', 40, 'uint32'),
+    ('ram_stop', 42, 'uint16'),
+    ('manual_mode', 43, 'uint16'),
+    ('ram_status', 44, 'enum'),
+    ('mode', 45, 'enum'),
+    ('puller_status', 46, 'enum'),
+    ('phase', 47, 'enum'),
+    ('data_status', 48, 'enum'),
+]
+
+# Status words, by the value the PLC reports
+ENUMS = {
+    'ram_status': ('STOP', 'RUN'),
+    'mode': ('MANUAL', 'AUTO'),
+    'puller_status': ('OFF', 'ON'),
+    'phase': ('PLUX', 'FILL', 'EXTRUDE', 'RETURN'),
+    'data_status': ('IDLE', 'ACTIVE'),
+}
+
+_DTYPES = {'float32': '>f4', 'uint32': '>u4', 'uint16': '>u2', 'enum': '>u2'}
+
+# Protocol limit on registers per read
+MAX_REGISTERS = 125
+
+READ_HOLDING_REGISTERS = 0x03
+
+# Polls per second of each press
+POLL_RATE = float(os.environ.get('STREAMLET_PLC_RATE', 100))
+
+# Seconds of polls published to the sampler together
+PUBLISH_INTERVAL = 0.1
+
+# Seconds a poll may run late and still be made up by polling back to back
+MAX_LAG = 0.5
+
+# Seconds to wait for a reply, and between reconnect attempts
+TIMEOUT = 1.0
+RECONNECT_DELAY = 2.0
+
+
+class ModbusError(Exception):
+    """The PLC answered with a Modbus exception code"""
+
+
+def register_blocks(register_map=REGISTER_MAP, limit=MAX_REGISTERS):
+    """Group the map into (first register, count) reads of contiguous registers"""
+    spans = sorted((address, address + (2 if kind in ('float32', 'uint32') else 1))
+                   for _, address, kind in register_map)
+    blocks = []
+    for start, stop in spans:
+        if blocks and start <= blocks[-1][1] and stop - blocks[-1][0] <= limit:
+            blocks[-1][1] = max(blocks[-1][1], stop)
+        else:
+            blocks.append([start, stop])
+    return [(start, stop - start) for start, stop in blocks]
+
+
+def record_dtype(register_map=REGISTER_MAP):
+    """Structured dtype that decodes a register image in one np.frombuffer call"""
+    size = max(address + (2 if kind in ('float32', 'uint32') else 1) for _, address, kind in register_map)
+    return np.dtype({
+        'names': [field for field, _, _ in register_map],
+        'formats': [_DTYPES[kind] for _, _, kind in register_map],
+        'offsets': [address * 2 for _, address, _ in register_map],
+        'itemsize': size * 2,
+    })
+
+
+def encode_record(record, register_map=REGISTER_MAP):
+    """Return the register image of a sample record as bytes"""
+    image = np.zeros(1, dtype=record_dtype(register_map))
+    for field, _, kind in register_map:
+        value = record.get(field, 0)
+        image[field] = ENUMS[field].index(value) if kind == 'enum' else value
+    return image.tobytes()
+
+
+def local_offset_ns():
+    """Offset of local time from UTC right now, in nanoseconds"""
+    return datetime.now().astimezone().utcoffset() // timedelta(microseconds=1) * 1000
+
+
+def utc_to_local(stamps):
+    """Convert UTC epoch nanoseconds to the local naive time the generator, store and pages use"""
+    return (np.asarray(stamps, dtype=np.int64) + local_offset_ns()).astype('datetime64[ns]')
+
+
+def local_to_utc(timestamp):
+    """Return a local naive timestamp as UTC epoch nanoseconds"""
+    timestamp = pd.Timestamp(timestamp).as_unit('ns')
+    return timestamp.value if timestamp.tzinfo is not None else timestamp.value - local_offset_ns()
+
+
+def decode_images(images, stamps, register_map=REGISTER_MAP):
+    """Decode stacked register images, stamped in UTC epoch nanoseconds, into a frame of the numeric fields and the newest full record"""
+    decoded = np.frombuffer(images, dtype=record_dtype(register_map))
+    index = pd.DatetimeIndex(utc_to_local(stamps), name='timestamp')
+    return decode_records(decoded, index, register_map)
+
+
+def decode_records(decoded, index, register_map=REGISTER_MAP):
+    """Split decoded records into a frame of the numeric fields and the newest full record"""
+    frame = pd.DataFrame({field: decoded[field].astype(float) for field, _, kind in register_map if kind != 'enum'},
+                         index=index)
+
+    last = decoded[-1]
+    current = {'timestamp': index[-1]}
+    for field, _, kind in register_map:
+        value = last[field]
+        if kind == 'enum':
+            labels = ENUMS[field]
+            current[field] = labels[value] if value < len(labels) else f'UNKNOWN({value})'
+        elif kind == 'float32':
+            current[field] = float(value)
+        else:
+            current[field] = int(value)
+    return frame, current
+
+
+class ModbusClient:
+    """Minimal asyncio Modbus-TCP client for reading holding registers.
+
+    Requests on one connection are answered in order, so each read
+    writes its request and waits for the matching reply; a lock keeps
+    concurrent reads from interleaving on the stream.
+    """
+
+    def __init__(self, host, port=502, timeout=TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._transaction = 0
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._reader = self._writer = None
+
+    @property
+    def connected(self):
+        return self._writer is not None
+
+    async def read_holding_registers(self, address, count, unit=1):
+        """Return count registers from address as raw big-endian bytes"""
+        async with self._lock:
+            self._transaction = (self._transaction + 1) & 0xFFFF
+            transaction = self._transaction
+            # MBAP header (transaction, protocol 0, length, unit) and the PDU
+            self._writer.write(struct.pack('>HHHBBHH', transaction, 0, 6, unit, READ_HOLDING_REGISTERS, address, count))
+            header = await asyncio.wait_for(self._reader.readexactly(8), self.timeout)
+            reply_transaction, _, length, _, function = struct.unpack('>HHHBB', header)
+            body = await asyncio.wait_for(self._reader.readexactly(length - 2), self.timeout)
+
+        if reply_transaction != transaction:
+            raise ModbusError(f"Reply to transaction {reply_transaction}, expected {transaction}")
+        if function & 0x80:
+            raise ModbusError(f"Exception code {body[0]} reading {count} registers at {address}")
+        if body[0] != 2 * count:
+            raise ModbusError(f"Expected {2 * count} bytes, got {body[0]}")
+        return body[1:]
+
+
+class PLCAdapter:
+    """Polls one press's PLC and publishes the samples to its Sampler.
+
+    Each poll reads every register block of the map, one request per
+    block, and the images are stacked; every PUBLISH_INTERVAL the batch is
+    decoded in one pass and handed to ``Sampler.publish``, so the buffers,
+    charts and alert state are updated per batch rather than per poll.
+    Polls are scheduled on absolute deadlines, so polls delayed by a slow
+    reply or a publish are made up and the average rate holds.
+    """
+
+    def __init__(self, sampler, host, port=502, unit=1, rate=POLL_RATE, register_map=REGISTER_MAP):
+        self.sampler = sampler
+        self.client = ModbusClient(host, port)
+        self.unit = unit
+        self.period = 1.0 / rate
+        self.register_map = register_map
+        self.blocks = register_blocks(register_map)
+        self._size = record_dtype(register_map).itemsize
+        self.polls = 0
+        self.errors = 0
+
+    async def poll(self):
+        """Read one register image of the whole map"""
+        image = bytearray(self._size)
+        for address, size in self.blocks:
+            data = await self.client.read_holding_registers(address, size, self.unit)
+            image[address * 2:address * 2 + len(data)] = data
+        return bytes(image)
+
+    async def run(self, stopped):
+        """Poll until the stopped event is set, reconnecting after errors"""
+        loop = asyncio.get_running_loop()
+        images, stamps = [], []
+        while not stopped.is_set():
+            try:
+                if not self.client.connected:
+                    await self.client.connect()
+                deadline = loop.time()
+                published = deadline
+                while not stopped.is_set():
+                    images.append(await self.poll())
+                    stamps.append(time.time_ns())
+                    self.polls += 1
+                    now = loop.time()
+                    if now - published >= PUBLISH_INTERVAL:
+                        self.publish(images, stamps)
+                        images, stamps = [], []
+                        published = now
+                    deadline += self.period
+                    if deadline < now - MAX_LAG:
+                        # Too far behind to catch up; restart the schedule
+                        deadline = now
+                    await asyncio.sleep(max(deadline - now, 0))
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ModbusError):
+                self.errors += 1
+                count('plc.errors')
+                await self.client.close()
+                if images:
+                    self.publish(images, stamps)
+                    images, stamps = [], []
+                try:
+                    await asyncio.wait_for(stopped.wait(), RECONNECT_DELAY)
+                except asyncio.TimeoutError:
+                    pass
+        await self.client.close()
+
+    def publish(self, images, stamps):
+        with timed('plc.publish'):
+            frame, current = decode_images(b''.join(images), stamps, self.register_map)
+            self.sampler.publish(frame, current)
+        count('plc.polls', len(images))
+
+
+class PLCPoller:
+    """Runs the adapters of every PLC-connected press on one asyncio loop.
+
+    The loop lives on its own thread, so polling never blocks the
+    Streamlit script threads, and one core serves all presses.
+    """
+
+    def __init__(self, adapters):
+        self.adapters = list(adapters)
+        self._loop = None
+        self._stopped = None
+        self._thread = threading.Thread(target=self._run, name='plc-poller', daemon=True)
+
+    def start(self):
+        # Made before the thread starts, so stop works however early it is called
+        self._loop = asyncio.new_event_loop()
+        self._stopped = asyncio.Event()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._thread.is_alive():
+            try:
+                self._loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                # The loop finished and closed in the meantime
+                pass
+            self._thread.join()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        await asyncio.gather(*(adapter.run(self._stopped) for adapter in self.adapters))
+
+
+def parse_endpoints(spec):
+    """Parse 'P01=host:port/unit,P02=...' into {press: (host, port, unit)}"""
+    endpoints = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        press, address = item.split('=', 1)
+        address, _, unit = address.partition('/')
+        host, _, port = address.rpartition(':')
+        endpoints[press.strip()] = (host or '127.0.0.1', int(port or 502), int(unit or 1))
+    return endpoints
+
+
+# Presses read from a PLC instead of the built-in generator, e.g.
+# STREAMLET_PLC="P01=10.0.0.21:502/1,P02=10.0.0.22:502/1"
+PLC_ENDPOINTS = parse_endpoints(os.environ.get('STREAMLET_PLC'))
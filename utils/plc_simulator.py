@@ -0,0 +1,139 @@
+"""Local Modbus-TCP simulator of the press PLCs, for testing the PLC adapter.
+
+Run from the repository root:
+
+    python -m utils.plc_simulator --port 5020 --presses 3
+
+and start the dashboard with the endpoints it prints, e.g.
+
+    STREAMLET_PLC="P01=127.0.0.1:5020/1,P02=127.0.0.1:5020/2" streamlit run app.py
+
+Each press is a Modbus unit id on the one port, serving the holding
+registers of REGISTER_MAP with values from the data generator.
+"""
+import argparse
+import asyncio
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data_generator import LIVE_SIGNALS, generate_current_data, generate_live_data_points, press_ids
+from utils.plc import ENUMS, READ_HOLDING_REGISTERS, REGISTER_MAP, record_dtype
+
+# Seconds of samples generated at a time
+BATCH_SECONDS = 5
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+GATEWAY_TARGET_FAILED = 0x0B
+
+
+class PressSimulator:
+    """Register images of one press, changing ``rate`` times a second.
+
+    Images are generated BATCH_SECONDS at a time: the live signals as one
+    vectorized batch and the other fields from one control-panel record
+    per batch, so serving a read is a slice of a prepared buffer.
+    """
+
+    def __init__(self, rate=100, rng=None):
+        self.period = 1.0 / rate
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.dtype = record_dtype(REGISTER_MAP)
+        self._rows = int(round(BATCH_SECONDS * rate))
+        self._start = None
+        self._images = None
+
+    def _generate(self, start):
+        record = generate_current_data(self.rng)
+        end = pd.Timestamp(start + (self._rows - 1) * self.period, unit='s')
+        live = generate_live_data_points(self._rows, end=end, freq=pd.Timedelta(seconds=self.period), rng=self.rng)
+        images = np.zeros(self._rows, dtype=self.dtype)
+        for field, _, kind in REGISTER_MAP:
+            if field in LIVE_SIGNALS:
+                images[field] = live[field].to_numpy()
+            elif kind == 'enum':
+                images[field] = ENUMS[field].index(record[field])
+            else:
+                images[field] = record[field]
+        self._start, self._images = start, images
+
+    def registers(self, address, count, now=None):
+        """Return count registers from address of the current image as bytes"""
+        now = time.time() if now is None else now
+        if self._images is None or now >= self._start + self._rows * self.period:
+            self._generate(now)
+        row = int((now - self._start) / self.period)
+        return self._images[row:row + 1].tobytes()[address * 2:(address + count) * 2]
+
+
+class ModbusSimulator:
+    """asyncio Modbus-TCP server answering read holding registers per unit id"""
+
+    def __init__(self, units, host='127.0.0.1', port=5020):
+        self.units = units
+        self.host = host
+        self.port = port
+        self.size = record_dtype(REGISTER_MAP).itemsize // 2
+        self.requests = 0
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction, protocol, length, unit = struct.unpack('>HHHB', header)
+                pdu = await reader.readexactly(length - 1)
+                writer.write(self._reply(transaction, unit, pdu))
+                self.requests += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _reply(self, transaction, unit, pdu):
+        function = pdu[0]
+        if unit not in self.units:
+            return self._exception(transaction, unit, function, GATEWAY_TARGET_FAILED)
+        if function != READ_HOLDING_REGISTERS:
+            return self._exception(transaction, unit, function, ILLEGAL_FUNCTION)
+        address, count = struct.unpack('>HH', pdu[1:5])
+        if count < 1 or count > 125 or address + count > self.size:
+            return self._exception(transaction, unit, function, ILLEGAL_DATA_ADDRESS)
+        data = self.units[unit].registers(address, count)
+        return struct.pack('>HHHBBB', transaction, 0, 3 + len(data), unit, function, len(data)) + data
+
+    @staticmethod
+    def _exception(transaction, unit, function, code):
+        return struct.pack('>HHHBBB', transaction, 0, 3, unit, function | 0x80, code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5020)
+    parser.add_argument('--presses', type=int, default=1)
+    parser.add_argument('--rate', type=float, default=100, help="register updates per second")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    seeds = np.random.SeedSequence(args.seed).spawn(args.presses)
+    units = {unit: PressSimulator(args.rate, np.random.default_rng(seed)) for unit, seed in enumerate(seeds, start=1)}
+    endpoints = ','.join(f'{press}={args.host}:{args.port}/{unit}' for unit, press in enumerate(press_ids(args.presses), start=1))
+    print(f"Serving {args.presses} press(es) on {args.host}:{args.port}")
+    print(f'STREAMLET_PLC="{endpoints}"', flush=True)
+    try:
+        asyncio.run(ModbusSimulator(units, args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
+import os
+
 import plotly.graph_objects as go
 
+# Traces with more points than this are drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = int(os.environ.get('STREAMLET_WEBGL_THRESHOLD', 1000))
+
 def create_gauge(value, title, min_val, max_val, warning_threshold):
     """Create a gauge chart"""
     fig = go.Figure(go.Indicator(
@@ -22,4 +27,16 @@ def create_gauge(value, title, min_val, max_val, warning_threshold):
     ))
     
     fig.update_layout(height=200, margin=dict(l=10, r=10, t=50, b=10))
-    return fig
\ No newline at end of file
+    return fig
+
+
+def render_mode(num_points, threshold=None):
+    """Return the Plotly Express render_mode for a trace of num_points"""
+    threshold = WEBGL_THRESHOLD if threshold is None else threshold
+    return 'webgl' if num_points > threshold else 'svg'
+
+
+def scatter_trace(x, y, threshold=None, **kwargs):
+    """Create a Scatter trace, switching to Scattergl for large series"""
+    trace_type = go.Scattergl if render_mode(len(y), threshold) == 'webgl' else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
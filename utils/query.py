@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+class HistoryIndex:
+    """Time-sorted history with categorical dimensions for fast filtering.
+
+    Time ranges resolve to a contiguous row slice by binary search on the
+    sorted timestamps. Dimension columns are stored as categorical codes,
+    and the boolean mask for each category value is built once and cached,
+    so a filter costs two bisections plus an OR over the selected masks
+    inside the slice.
+    """
+
+    def __init__(self, frame, dimensions=('process', 'material')):
+        if not frame['timestamp'].is_monotonic_increasing:
+            frame = frame.sort_values('timestamp', kind='stable')
+        frame = frame.reset_index(drop=True)
+        for dim in dimensions:
+            frame[dim] = frame[dim].astype('category')
+
+        self.frame = frame
+        self.dimensions = tuple(dimensions)
+        self._stamps = frame['timestamp'].to_numpy(dtype='datetime64[ns]')
+        self._codes = {dim: frame[dim].cat.codes.to_numpy() for dim in self.dimensions}
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def start(self):
+        return pd.Timestamp(self._stamps[0])
+
+    @property
+    def end(self):
+        return pd.Timestamp(self._stamps[-1])
+
+    def categories(self, dim):
+        """Return the values a dimension can take"""
+        return list(self.frame[dim].cat.categories)
+
+    def category_mask(self, dim, value):
+        """Return the cached row mask for one category value"""
+        key = (dim, value)
+        if key not in self._masks:
+            code = self.frame[dim].cat.categories.get_loc(value)
+            self._masks[key] = self._codes[dim] == code
+        return self._masks[key]
+
+    def time_slice(self, start, end):
+        """Return the row slice with start <= timestamp < end"""
+        lo = np.searchsorted(self._stamps, np.datetime64(pd.Timestamp(start).as_unit('ns')), side='left')
+        hi = np.searchsorted(self._stamps, np.datetime64(pd.Timestamp(end).as_unit('ns')), side='left')
+        return slice(int(lo), int(hi))
+
+    def row_mask(self, rows, selections):
+        """Return the mask over a row slice for {dim: selected values}, or None for all rows"""
+        mask = None
+        for dim, selected in selections.items():
+            selected = set(selected)
+            if selected.issuperset(self.categories(dim)):
+                continue
+            dim_mask = np.zeros(rows.stop - rows.start, dtype=bool)
+            for value in selected:
+                if value in self.frame[dim].cat.categories:
+                    dim_mask |= self.category_mask(dim, value)[rows]
+            mask = dim_mask if mask is None else mask & dim_mask
+        return mask
+
+    def select(self, start, end, **selections):
+        """Return the rows in [start, end) matching the selected categories"""
+        rows = self.time_slice(start, end)
+        window = self.frame.iloc[rows]
+        mask = self.row_mask(rows, selections)
+        return window if mask is None else window[mask]
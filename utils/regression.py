@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+
+def grouped_ols(x, y, groups, size=None):
+    """Fit y = intercept + slope * x separately for every group in one pass.
+
+    ``groups`` holds integer codes from 0 and ``size`` the number of
+    groups, in case the last ones have no rows. Each fit comes from
+    per-group sufficient statistics gathered with np.bincount: counts and
+    means first, then centered sums of squares and cross-products, which
+    avoid the cancellation of raw sums when the values are large. Rows
+    with a missing x or y are ignored. Returns slope, intercept, R² and
+    the count per group code; groups with fewer than two points or no
+    spread in x get NaN.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    groups = np.asarray(groups)
+    valid = np.isfinite(x) & np.isfinite(y) & (groups >= 0)
+    x, y, groups = x[valid], y[valid], groups[valid]
+    if size is None:
+        size = int(groups.max()) + 1 if len(groups) else 0
+
+    n = np.bincount(groups, minlength=size).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.bincount(groups, x, size) / n
+        mean_y = np.bincount(groups, y, size) / n
+        dx = x - mean_x[groups]
+        dy = y - mean_y[groups]
+        sxx = np.bincount(groups, dx * dx, size)
+        sxy = np.bincount(groups, dx * dy, size)
+        syy = np.bincount(groups, dy * dy, size)
+
+        fitted = (n >= 2) & (sxx > 0)
+        slope = np.where(fitted, sxy / sxx, np.nan)
+        intercept = mean_y - slope * mean_x
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), 1.0)
+    return {'slope': slope, 'intercept': intercept, 'r2': np.where(fitted, r2, np.nan), 'count': n}
+
+
+def fit_by(frame, x, y, by):
+    """Per-group linear fits of a frame, one row per group with its x range"""
+    codes, labels = pd.factorize(frame[by], sort=True)
+    fits = pd.DataFrame(grouped_ols(frame[x].to_numpy(), frame[y].to_numpy(), codes, len(labels)))
+    xs = frame[x].to_numpy(dtype=float)
+    ranges = pd.Series(xs).groupby(codes).agg(['min', 'max']).reindex(range(len(labels)))
+    fits[by] = labels
+    fits['x_min'] = ranges['min'].to_numpy()
+    fits['x_max'] = ranges['max'].to_numpy()
+    return fits[[by, 'slope', 'intercept', 'r2', 'count', 'x_min', 'x_max']].dropna(subset=['slope'])
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+
+class RingBuffer:
+    """Fixed-capacity telemetry buffer with one NumPy column per signal.
+
+    Every sample is written twice, at slot ``i`` and at its mirror
+    ``i + capacity``, so the most recent N samples always form one
+    contiguous slice. Appends are O(1) per sample and ``last(n)`` returns
+    views into the buffer instead of copies.
+    """
+
+    def __init__(self, capacity, signals):
+        self.capacity = int(capacity)
+        self.signals = tuple(signals)
+        self._timestamps = np.zeros(2 * self.capacity, dtype='datetime64[ns]')
+        self._columns = {
+            name: np.full(2 * self.capacity, np.nan) for name in self.signals
+        }
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, values):
+        """Append a single sample given as a mapping of signal -> value"""
+        head = self._head
+        ts = np.datetime64(pd.Timestamp(timestamp).as_unit('ns'))
+        self._timestamps[head] = ts
+        self._timestamps[head + self.capacity] = ts
+        for name, column in self._columns.items():
+            value = values.get(name, np.nan)
+            column[head] = value
+            column[head + self.capacity] = value
+        self._head = (head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, timestamps, columns):
+        """Append a batch of samples given as arrays of equal length"""
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        count = len(timestamps)
+        if count == 0:
+            return
+        # Only the newest `capacity` samples can survive the write
+        skip = max(0, count - self.capacity)
+        count -= skip
+        slots = (self._head + np.arange(count)) % self.capacity
+        mirrors = slots + self.capacity
+
+        self._timestamps[slots] = timestamps[skip:]
+        self._timestamps[mirrors] = timestamps[skip:]
+        for name, column in self._columns.items():
+            if name in columns:
+                values = np.asarray(columns[name], dtype=float)[skip:]
+            else:
+                values = np.nan
+            column[slots] = values
+            column[mirrors] = values
+
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    def extend_frame(self, frame):
+        """Append the rows of a DataFrame indexed by timestamp"""
+        self.extend(
+            frame.index.to_numpy(dtype='datetime64[ns]'),
+            {name: frame[name].to_numpy() for name in self.signals if name in frame}
+        )
+
+    def last(self, n):
+        """Return zero-copy views of the last n samples, oldest first"""
+        n = min(int(n), self._size)
+        end = self._head + self.capacity
+        window = slice(end - n, end)
+        data = {'timestamp': self._timestamps[window]}
+        for name, column in self._columns.items():
+            data[name] = column[window]
+        return data
+
+    def latest(self):
+        """Return the most recent sample as a dict, or None when empty"""
+        if self._size == 0:
+            return None
+        slot = self._head + self.capacity - 1
+        sample = {'timestamp': pd.Timestamp(self._timestamps[slot])}
+        for name, column in self._columns.items():
+            sample[name] = float(column[slot])
+        return sample
+
+    def latest_timestamp(self):
+        """Return the timestamp of the most recent sample, or None when empty"""
+        if self._size == 0:
+            return None
+        return pd.Timestamp(self._timestamps[self._head + self.capacity - 1])
+
+    def to_frame(self, n):
+        """Copy the last n samples into a DataFrame"""
+        return pd.DataFrame(self.last(n))
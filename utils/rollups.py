@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from utils.stats import RunningStats, merge_moments, summarize
+
+NS_PER_HOUR = 3600 * 10**9
+
+# Bucket width and offset from midnight in hours; shifts run 06-14, 14-22, 22-06
+GRAINS = {
+    'hour': (1, 0),
+    'shift': (8, 6),
+    'day': (24, 0),
+}
+
+STATS = ('count', 'mean', 'm2', 'min', 'max')
+
+
+def bucket_starts(stamps, grain):
+    """Map int64 nanosecond timestamps to the start of their bucket"""
+    width, offset = GRAINS[grain]
+    width, offset = width * NS_PER_HOUR, offset * NS_PER_HOUR
+    return (stamps - offset) // width * width + offset
+
+
+class RollupTable:
+    """Materialized per-bucket aggregates, maintained incrementally.
+
+    One row per (bucket, dimension values) holds the Welford partials
+    (count, mean, M2, min, max) of each signal. ``update`` merges a batch of
+    raw samples in O(batch), and queries merge the matching rows in
+    O(buckets).
+    """
+
+    def __init__(self, grain, signals, dimensions=('process', 'material'), capacity=1024):
+        self.grain = grain
+        self.signals = list(signals)
+        self.dimensions = tuple(dimensions)
+        self._rows = {}
+        self._size = 0
+        self._values = {dim: {} for dim in self.dimensions}
+        self._allocate(capacity)
+
+    def __len__(self):
+        return self._size
+
+    def _allocate(self, capacity):
+        shape = (capacity, len(self.signals))
+        fresh = {
+            'count': np.zeros(shape),
+            'mean': np.zeros(shape),
+            'm2': np.zeros(shape),
+            'min': np.full(shape, np.inf),
+            'max': np.full(shape, -np.inf),
+        }
+        buckets = np.zeros(capacity, dtype=np.int64)
+        codes = {dim: np.zeros(capacity, dtype=np.int32) for dim in self.dimensions}
+        if self._size:
+            for stat in STATS:
+                fresh[stat][:self._size] = self._stats[stat][:self._size]
+            buckets[:self._size] = self._buckets[:self._size]
+            for dim in self.dimensions:
+                codes[dim][:self._size] = self._codes[dim][:self._size]
+        self._stats, self._buckets, self._codes = fresh, buckets, codes
+
+    def _code(self, dim, value):
+        codes = self._values[dim]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def update(self, frame):
+        """Merge a batch of raw samples into the table"""
+        if len(frame) == 0:
+            return
+        stamps = frame['timestamp'] if 'timestamp' in frame else frame.index.to_series()
+        keys = pd.DataFrame({'bucket': bucket_starts(stamps.to_numpy(dtype='datetime64[ns]').view(np.int64), self.grain)})
+        for dim in self.dimensions:
+            keys[dim] = frame[dim].to_numpy()
+
+        values = frame[self.signals].to_numpy(dtype=float)
+        group_by = [keys[col] for col in keys.columns]
+        grouped = pd.DataFrame(values, columns=self.signals).groupby(group_by, sort=False, observed=True)
+        count = grouped.count()
+        counts = count.to_numpy(dtype=float)
+        partial = {
+            'count': counts,
+            'mean': np.nan_to_num(grouped.mean().to_numpy()),
+            'm2': np.nan_to_num(grouped.var(ddof=0).to_numpy()) * counts,
+            'min': grouped.min().to_numpy(),
+            'max': grouped.max().to_numpy(),
+        }
+        group_keys = count.index
+
+        rows = np.empty(len(group_keys), dtype=np.int64)
+        for i, key in enumerate(group_keys):
+            key = key if isinstance(key, tuple) else (key,)
+            row = self._rows.get(key)
+            if row is None:
+                row = self._add_row(key)
+            rows[i] = row
+
+        stats = self._stats
+        stats['count'][rows], stats['mean'][rows], stats['m2'][rows] = merge_moments(
+            stats['count'][rows], stats['mean'][rows], stats['m2'][rows],
+            partial['count'], partial['mean'], partial['m2'],
+        )
+        stats['min'][rows] = np.fmin(stats['min'][rows], partial['min'])
+        stats['max'][rows] = np.fmax(stats['max'][rows], partial['max'])
+
+    def _add_row(self, key):
+        if self._size == len(self._buckets):
+            self._allocate(2 * len(self._buckets))
+        row = self._size
+        self._buckets[row] = key[0]
+        for dim, value in zip(self.dimensions, key[1:]):
+            self._codes[dim][row] = self._code(dim, value)
+        self._rows[key] = row
+        self._size += 1
+        return row
+
+    def _select(self, start, end, selections):
+        size = self._size
+        mask = np.ones(size, dtype=bool)
+        if start is not None:
+            mask &= self._buckets[:size] >= pd.Timestamp(start).as_unit('ns').value
+        if end is not None:
+            mask &= self._buckets[:size] < pd.Timestamp(end).as_unit('ns').value
+        for dim, selected in selections.items():
+            wanted = [self._values[dim][v] for v in selected if v in self._values[dim]]
+            mask &= np.isin(self._codes[dim][:size], wanted)
+        return np.flatnonzero(mask)
+
+    def _reduce(self, rows, groups):
+        """Merge the partials of the given rows per group label"""
+        labels, inverse = np.unique(groups, return_inverse=True)
+        shape = (len(labels), len(self.signals))
+        count, mean, m2 = (self._stats[stat][rows] for stat in ('count', 'mean', 'm2'))
+
+        # Merge the partials of each group: pooled mean first, then the
+        # within-row M2 plus every row's offset from the pooled mean
+        total = np.zeros(shape)
+        weighted = np.zeros(shape)
+        np.add.at(total, inverse, count)
+        np.add.at(weighted, inverse, count * mean)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pooled = np.where(total > 0, weighted / total, 0.0)
+        spread = np.zeros(shape)
+        np.add.at(spread, inverse, m2 + count * (mean - pooled[inverse]) ** 2)
+
+        low, high = np.full(shape, np.inf), np.full(shape, -np.inf)
+        np.minimum.at(low, inverse, self._stats['min'][rows])
+        np.maximum.at(high, inverse, self._stats['max'][rows])
+        return labels, (total, pooled, spread, low, high)
+
+    def _to_frame(self, index, moments):
+        derived = summarize(*moments)
+        columns = pd.MultiIndex.from_product([self.signals, list(derived)], names=['signal', 'stat'])
+        data = np.stack(list(derived.values()), axis=2).reshape(len(index), -1)
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def query(self, start=None, end=None, by='bucket', **selections):
+        """Aggregate the rows in [start, end) per bucket or per dimension value"""
+        rows = self._select(start, end, selections)
+        if by == 'bucket':
+            labels, stats = self._reduce(rows, self._buckets[rows])
+            index = pd.DatetimeIndex(labels.view('datetime64[ns]'), name=self.grain)
+        else:
+            labels, stats = self._reduce(rows, self._codes[by][rows])
+            names = {code: value for value, code in self._values[by].items()}
+            index = pd.Index([names[code] for code in labels], name=by)
+        return self._to_frame(index, stats)
+
+    def stats(self, start=None, end=None, **selections):
+        """Merge the rows in [start, end) into a single RunningStats"""
+        rows = self._select(start, end, selections)
+        if not len(rows):
+            return RunningStats(self.signals)
+        _, moments = self._reduce(rows, np.zeros(len(rows), dtype=np.int64))
+        return RunningStats.from_moments(self.signals, *(column[0] for column in moments))
+
+    def totals(self, start=None, end=None, **selections):
+        """Aggregate the rows in [start, end) into one row per signal"""
+        return self.stats(start, end, **selections).to_frame()
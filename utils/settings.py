@@ -0,0 +1,231 @@
+import copy
+import json
+import os
+import threading
+
+from utils.alerts import DEFAULT_HYSTERESIS, compile_thresholds
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process are still serialized
+    fcntl = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Streamlit installs watchdog; polling the mtime works without it
+    FileSystemEventHandler = object
+    Observer = None
+
+# Factory defaults for the System Configuration page
+DEFAULT_SETTINGS = {
+    'pressure_limits': {
+        'ram_min': 40, 'ram_max': 100, 'ram_warning': 80,
+        'billet_min': 150, 'billet_max': 300, 'billet_warning': 250,
+        'sys_min': 2, 'sys_max': 5, 'sys_warning': 4
+    },
+    'temperature_limits': {
+        'front_min': 350, 'front_max': 450, 'front_warning': 420,
+        'back_min': 340, 'back_max': 440, 'back_warning': 410,
+        'oil_min': 20, 'oil_max': 40, 'oil_warning': 35
+    },
+    'alerts': {
+        'email': True, 'sms': False, 'sound': True,
+        'popup': True, 'log': True
+    },
+    'data_logging': {
+        'interval': 5, 'retention_days': 90,
+        'backup_enabled': True, 'backup_interval': 'daily'
+    },
+    'maintenance': {
+        'ram_hours': 5000, 'container_hours': 4000,
+        'heater_hours': 3000, 'pump_hours': 2000
+    }
+}
+
+# Settings of every press, shared by all sessions and server processes
+SETTINGS_FILE = os.environ.get(
+    'STREAMLET_SETTINGS_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'settings.json')
+)
+
+# Seconds between mtime checks when watchdog is not installed
+WATCH_INTERVAL = 1.0
+
+# Sections that apply to the whole plant rather than one press
+PLANT_SECTIONS = ('data_logging',)
+
+
+def default_settings():
+    """Return a fresh copy of the factory settings"""
+    return copy.deepcopy(DEFAULT_SETTINGS)
+
+
+class SettingsStore:
+    """Per-press settings in one JSON file, shared by sessions and processes.
+
+    The file is the only copy that is written: saves lock it, merge into
+    what is on disk and replace it atomically, and every process reloads
+    it when it changes, from a watchdog event or an mtime check. Each load
+    compiles the alert thresholds of the presses whose settings changed,
+    so readers take a ready ``CompiledThresholds`` and never the dicts.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, presses=(), hysteresis=DEFAULT_HYSTERESIS):
+        self.path = path
+        self.presses = list(presses)
+        self.hysteresis = hysteresis
+        self.version = 0
+        self._lock = threading.RLock()
+        self._signature = None
+        self._settings = {}
+        self._thresholds = {}
+        self._subscribers = []
+        self._observer = None
+        self._stopped = threading.Event()
+        self.check()
+
+    # -------------------- reads --------------------
+    def settings(self, press):
+        """Return an editable copy of one press's settings"""
+        self._ensure(press)
+        with self._lock:
+            return copy.deepcopy(self._settings[press])
+
+    def thresholds(self, press):
+        """Return the compiled alert thresholds of one press"""
+        self._ensure(press)
+        return self._thresholds[press]
+
+    def _ensure(self, press):
+        if press not in self._settings:
+            with self._lock:
+                if press not in self.presses:
+                    self.presses.append(press)
+                self._signature = None
+            self.check()
+
+    def subscribe(self, callback):
+        """Call callback(presses) with the presses whose settings changed on every reload"""
+        self._subscribers.append(callback)
+
+    # -------------------- writes --------------------
+    def update(self, press, sections):
+        """Save settings sections for one press, or for every press when press is None"""
+        def apply(saved):
+            for name in (self.presses if press is None else [press]):
+                saved[name] = {**self._resolve(saved, name), **copy.deepcopy(sections)}
+        self._write(apply)
+
+    def replace(self, press, settings):
+        """Save a complete settings dict for one press, e.g. an imported file.
+
+        Its plant-wide sections are saved for every press, as update(None) does.
+        """
+        compile_thresholds(settings, self.hysteresis)
+
+        def apply(saved):
+            saved[press] = {**default_settings(), **copy.deepcopy(settings)}
+            plant = {section: saved[press][section] for section in PLANT_SECTIONS}
+            for name in dict.fromkeys(self.presses + list(saved)):
+                saved[name] = {**self._resolve(saved, name), **copy.deepcopy(plant)}
+        self._write(apply)
+
+    def _write(self, apply):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(f'{self.path}.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Merge into the file as it is now, which another process may have changed
+            saved = self._read()
+            apply(saved)
+            staging = f'{self.path}.{os.getpid()}.tmp'
+            with open(staging, 'w') as handle:
+                json.dump({'presses': saved}, handle, indent=2, sort_keys=True)
+            os.replace(staging, self.path)
+        self.check()
+
+    # -------------------- reloads --------------------
+    def check(self):
+        """Reload the file if it changed since the last load; return whether it did"""
+        with self._lock:
+            signature = self._stat()
+            if signature is not None and signature == self._signature:
+                return False
+            saved = self._read()
+            settings = {press: self._resolve(saved, press) for press in dict.fromkeys(self.presses + list(saved))}
+            changed = [press for press in settings if settings[press] != self._settings.get(press)]
+            for press in changed:
+                self._thresholds[press] = compile_thresholds(settings[press], self.hysteresis)
+            self._settings = settings
+            self._signature = signature
+            if changed:
+                self.version += 1
+        if changed:
+            for callback in list(self._subscribers):
+                callback(changed)
+        return bool(changed)
+
+    def watch(self):
+        """Reload on change from now on, through watchdog or by polling the mtime"""
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_Changed(self), os.path.dirname(os.path.abspath(self.path)) or '.')
+            self._observer.daemon = True
+            try:
+                self._observer.start()
+                return self
+            except OSError:
+                # e.g. the inotify watch limit is reached
+                self._observer = None
+        threading.Thread(target=self._poll, name='settings-watcher', daemon=True).start()
+        return self
+
+    def close(self):
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def _poll(self):
+        while not self._stopped.wait(WATCH_INTERVAL):
+            self.check()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read(self):
+        try:
+            with open(self.path) as handle:
+                return json.load(handle).get('presses', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            # A damaged file keeps the settings already loaded
+            return copy.deepcopy(self._settings)
+
+    def _resolve(self, saved, press):
+        """Settings of a press with defaults for anything not saved; plant-wide sections follow the other presses"""
+        settings = default_settings()
+        others = [saved[name] for name in saved if name != press]
+        for section in PLANT_SECTIONS:
+            for other in others:
+                if section in other:
+                    settings[section] = copy.deepcopy(other[section])
+                    break
+        settings.update(copy.deepcopy(saved.get(press, {})))
+        return settings
+
+
+class _Changed(FileSystemEventHandler):
+    def __init__(self, store):
+        self.store = store
+
+    def on_any_event(self, event):
+        path = os.path.abspath(self.store.path)
+        if path in (os.path.abspath(event.src_path), os.path.abspath(getattr(event, 'dest_path', '') or '.')):
+            self.store.check()
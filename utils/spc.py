@@ -0,0 +1,298 @@
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.ring_buffer import RingBuffer
+
+# Signals under statistical process control
+SPC_SIGNALS = ['ram_pressure', 'billet_pressure', 'front_temp', 'back_temp']
+
+# Samples collected before the control limits are frozen
+BASELINE_SAMPLES = 100
+
+# EWMA smoothing weight and limit width in sigmas
+EWMA_LAMBDA = 0.2
+EWMA_WIDTH = 3.0
+
+# Tabular CUSUM reference value and decision interval, in sigmas
+CUSUM_K = 0.5
+CUSUM_H = 5.0
+
+# d2 constant for moving ranges of two, turns the mean range into sigma
+D2 = 1.128
+
+# Western Electric rules, by the number reported in violations
+WE_RULES = {
+    1: "1 point beyond 3σ",
+    2: "2 of 3 points beyond 2σ",
+    3: "4 of 5 points beyond 1σ",
+    4: "8 points on one side of center",
+}
+
+# Samples per closed-form EWMA block
+EWMA_BLOCK = 32
+
+# Chart points kept per signal, matches the live buffer
+CHART_CAPACITY = 36000
+
+CHART_FIELDS = ('value', 'ewma', 'ewma_ucl', 'ewma_lcl', 'cusum_hi', 'cusum_lo', 'rule')
+
+
+def estimate_limits(values):
+    """Return (center, sigma) of an individuals chart from a baseline window.
+
+    Sigma comes from the mean moving range, which is less inflated by a
+    drift inside the baseline than the overall standard deviation.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) < 2:
+        raise ValueError("A baseline needs at least two samples")
+    sigma = np.abs(np.diff(values)).mean() / D2
+    if sigma == 0:
+        sigma = values.std(ddof=1) or 1.0
+    return values.mean(), sigma
+
+
+def western_electric(z, tail):
+    """Return the lowest Western Electric rule broken at each point, 0 for none.
+
+    ``z`` holds standardized values and ``tail`` the seven values before
+    them, NaN where there is no history yet.
+    """
+    extended = np.concatenate((tail, z))
+    windows = np.lib.stride_tricks.sliding_window_view(extended, 8)
+    with np.errstate(invalid='ignore'):
+        above, below = windows > 0, windows < 0
+        beyond = [(windows[:, -width:] > sigmas).sum(axis=1) for width, sigmas in ((3, 2), (5, 1))]
+        under = [(windows[:, -width:] < -sigmas).sum(axis=1) for width, sigmas in ((3, 2), (5, 1))]
+        broken = [
+            np.abs(z) > 3,
+            (beyond[0] >= 2) | (under[0] >= 2),
+            (beyond[1] >= 4) | (under[1] >= 4),
+            above.all(axis=1) | below.all(axis=1),
+        ]
+    rule = np.zeros(len(z), dtype=np.int64)
+    for number in range(len(broken), 0, -1):
+        rule[broken[number - 1]] = number
+    return rule
+
+
+def ewma(values, lam, start):
+    """Run the recursion y[i] = lam * x[i] + (1 - lam) * y[i-1] from y = start.
+
+    Within a block, y[i] = d[i] * (start + lam * cumsum(x / d)[i]) with
+    d[i] = (1 - lam) ** (i + 1); blocks are kept short so 1 / d stays
+    well inside float range.
+    """
+    out = np.empty(len(values))
+    decay = (1 - lam) ** np.arange(1, EWMA_BLOCK + 1)
+    for begin in range(0, len(values), EWMA_BLOCK):
+        block = values[begin:begin + EWMA_BLOCK]
+        d = decay[:len(block)]
+        out[begin:begin + len(block)] = d * (start + lam * np.cumsum(block / d))
+        start = out[begin + len(block) - 1]
+    return out
+
+
+def cusum(steps, start):
+    """Run the recursion C[i] = max(0, C[i-1] + steps[i]) from C = start.
+
+    Closed form of the tabular CUSUM: the running sum minus its running
+    minimum, with the starting value acting as an earlier minimum.
+    """
+    total = np.cumsum(steps)
+    floor = np.minimum.accumulate(np.concatenate(([-start], total)))[1:]
+    return total - np.minimum(floor, 0)
+
+
+class ControlChart:
+    """Shewhart, EWMA and CUSUM state for one signal with fixed limits.
+
+    ``update`` advances the charts over new samples only; the state carried
+    between calls is a handful of numbers, so each sample costs O(1)
+    however long the chart has been running.
+    """
+
+    def __init__(self, center, sigma, lam=EWMA_LAMBDA, width=EWMA_WIDTH, k=CUSUM_K, h=CUSUM_H):
+        self.center = float(center)
+        self.sigma = float(sigma)
+        self.lam = lam
+        self.width = width
+        self.k = k
+        self.h = h
+        self.count = 0
+        self.ewma = self.center
+        self.cusum_hi = 0.0
+        self.cusum_lo = 0.0
+        self._tail = np.full(7, np.nan)
+
+    @classmethod
+    def from_baseline(cls, values, **params):
+        return cls(*estimate_limits(values), **params)
+
+    def limits(self):
+        """Return the Shewhart limits and CUSUM decision interval"""
+        return {
+            'center': self.center,
+            'ucl': self.center + 3 * self.sigma,
+            'lcl': self.center - 3 * self.sigma,
+            'sigma': self.sigma,
+            'cusum_h': self.h,
+        }
+
+    def update(self, values):
+        """Advance the charts over a batch of values, returning one array per chart field"""
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        lam = self.lam
+        # Missing samples hold the charts where they are
+        z = (values - self.center) / self.sigma
+        filled = np.where(np.isfinite(values), values, self.ewma)
+
+        smoothed = ewma(filled, lam, self.ewma)
+        steps = np.arange(self.count + 1, self.count + n + 1)
+        spread = self.width * self.sigma * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * steps)))
+
+        z_filled = np.nan_to_num(z)
+        cusum_hi = cusum(z_filled - self.k, self.cusum_hi)
+        cusum_lo = cusum(-z_filled - self.k, self.cusum_lo)
+
+        rule = western_electric(z, self._tail)
+        if n:
+            self.count += n
+            self.ewma = smoothed[-1]
+            self.cusum_hi, self.cusum_lo = cusum_hi[-1], cusum_lo[-1]
+            self._tail = np.concatenate((self._tail, z))[-7:]
+        return {
+            'value': values,
+            'ewma': smoothed,
+            'ewma_ucl': self.center + spread,
+            'ewma_lcl': self.center - spread,
+            'cusum_hi': cusum_hi,
+            'cusum_lo': cusum_lo,
+            'rule': rule,
+        }
+
+
+def run_chart(frame, signal, baseline=BASELINE_SAMPLES, **params):
+    """Chart one signal of a timestamp-indexed frame, e.g. a store read.
+
+    Limits come from the first ``baseline`` valid samples. Returns the
+    chart fields as a frame and the limits.
+    """
+    values = frame[signal].to_numpy(dtype=float)
+    chart = ControlChart.from_baseline(values[np.isfinite(values)][:baseline], **params)
+    return pd.DataFrame(chart.update(values), index=frame.index), chart.limits()
+
+
+class SPCMonitor:
+    """Online control charts for the live signals.
+
+    The first ``baseline`` samples are held back to estimate the limits;
+    they are then replayed through the charts and every later sample is
+    charted as it arrives. A signal with too few values in that window,
+    e.g. one a pushing source leaves out, gets its chart once it has
+    collected ``baseline`` values and is left uncharted until then.
+    Chart points go to a ring buffer alongside the live buffer, and rule
+    violations are kept as a short event log.
+    """
+
+    def __init__(self, signals=SPC_SIGNALS, baseline=BASELINE_SAMPLES, capacity=CHART_CAPACITY, **params):
+        self.signals = list(signals)
+        self.baseline = baseline
+        self.params = params
+        self.buffer = RingBuffer(capacity, [f'{s}_{field}' for s in self.signals for field in CHART_FIELDS])
+        self.events = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop the limits and start collecting a new baseline"""
+        with self._lock:
+            self.charts = {}
+            self._pending = []
+            self._waiting = {}
+            self._started = False
+            self._last_rule = dict.fromkeys(self.signals, 0)
+
+    @property
+    def ready(self):
+        return bool(self.charts)
+
+    def limits(self, signal):
+        with self._lock:
+            chart = self.charts.get(signal)
+            return None if chart is None else chart.limits()
+
+    def update(self, timestamps, columns):
+        """Chart a batch of samples (arrays of equal length per signal)"""
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        columns = {s: np.atleast_1d(np.asarray(columns[s], dtype=float)) for s in self.signals}
+        with self._lock:
+            if not self._started:
+                self._pending.append((timestamps, columns))
+                if sum(len(ts) for ts, _ in self._pending) < self.baseline:
+                    return
+                timestamps = np.concatenate([ts for ts, _ in self._pending])
+                columns = {s: np.concatenate([cols[s] for _, cols in self._pending]) for s in self.signals}
+                self._pending = []
+                self._started = True
+                for signal in self.signals:
+                    self._start_chart(signal, columns[signal][:self.baseline], 2)
+            else:
+                for signal in self.signals:
+                    if signal not in self.charts:
+                        self._start_chart(signal, columns[signal], self.baseline)
+
+            points = {}
+            for signal in self.signals:
+                values = columns[signal]
+                if signal in self.charts:
+                    chart = self.charts[signal].update(values)
+                else:
+                    chart = {field: np.full(len(values), np.nan) for field in CHART_FIELDS}
+                    chart['value'], chart['rule'] = values, np.zeros(len(values), dtype=np.int64)
+                points.update({f'{signal}_{field}': chart[field] for field in CHART_FIELDS})
+                self._log(signal, timestamps, chart['rule'])
+            self.buffer.extend(timestamps, points)
+
+    def _start_chart(self, signal, values, minimum):
+        # Charts a signal once it has minimum valid baseline values, collecting them until then
+        values = np.concatenate((self._waiting.pop(signal, np.empty(0)), values[np.isfinite(values)]))[:self.baseline]
+        if len(values) >= minimum:
+            self.charts[signal] = ControlChart.from_baseline(values, **self.params)
+        else:
+            self._waiting[signal] = values
+
+    def push(self, timestamp, sample):
+        """Chart a single sample given as a mapping of signal -> value"""
+        self.update([pd.Timestamp(timestamp).as_unit('ns').to_datetime64()],
+                    {s: [sample.get(s, np.nan)] for s in self.signals})
+
+    def extend_frame(self, frame):
+        self.update(frame.index.to_numpy(dtype='datetime64[ns]'), {s: frame[s].to_numpy() for s in self.signals})
+
+    def _log(self, signal, timestamps, rule):
+        # Record a violation when it starts, not on every point it persists
+        previous = np.concatenate(([self._last_rule[signal]], rule[:-1]))
+        for i in np.flatnonzero((rule > 0) & (rule != previous)):
+            self.events.append((pd.Timestamp(timestamps[i]), signal, int(rule[i])))
+        if len(rule):
+            self._last_rule[signal] = int(rule[-1])
+
+    def window(self, signal, n):
+        """Return copies of the last n chart points of a signal as a DataFrame"""
+        with self._lock:
+            data = self.buffer.last(n)
+            frame = pd.DataFrame({field: data[f'{signal}_{field}'] for field in CHART_FIELDS},
+                                 index=pd.DatetimeIndex(data['timestamp'], name='timestamp'))
+        frame['rule'] = frame['rule'].astype(np.int64)
+        return frame
+
+    def violations(self, n=20):
+        """Return the most recent rule violations as (timestamp, signal, rule) tuples"""
+        with self._lock:
+            return list(self.events)[-n:][::-1]
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+
+def merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Combine two sets of (count, mean, M2) partials elementwise.
+
+    Uses Chan et al.'s parallel form of Welford's update, which stays
+    accurate where sum/sum-of-squares formulas lose precision.
+    """
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(count > 0, count_b / count, 0.0)
+        mean = mean_a + delta * weight
+        m2 = m2_a + m2_b + delta ** 2 * count_a * weight
+    return count, np.where(count > 0, mean, 0.0), np.where(count > 0, m2, 0.0)
+
+
+def batch_moments(values):
+    """Return (count, mean, M2, min, max) per column of a 2-D array, ignoring NaN"""
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0).astype(float)
+    filled = np.where(valid, values, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, filled.sum(axis=0) / count, 0.0)
+    m2 = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0)
+    low = np.where(valid, values, np.inf).min(axis=0, initial=np.inf)
+    high = np.where(valid, values, -np.inf).max(axis=0, initial=-np.inf)
+    return count, mean, m2, low, high
+
+
+def summarize(count, mean, m2, low, high):
+    """Derive count/mean/std/min/max/sum arrays from partials; std uses ddof=1"""
+    empty = count == 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(np.where(count > 1, m2 / (count - 1), np.nan))
+    return {
+        'count': count,
+        'mean': np.where(empty, np.nan, mean),
+        'std': std,
+        'min': np.where(empty, np.nan, low),
+        'max': np.where(empty, np.nan, high),
+        'sum': mean * count,
+    }
+
+
+class RunningStats:
+    """Streaming count/mean/M2/min/max per signal.
+
+    ``push`` applies Welford's update for a single sample, ``update`` folds
+    in a batch, and ``merge`` combines partials computed separately, e.g.
+    one per time partition, without revisiting raw data.
+    """
+
+    def __init__(self, signals):
+        self.signals = list(signals)
+        size = len(self.signals)
+        self.count = np.zeros(size)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+
+    @classmethod
+    def from_moments(cls, signals, count, mean, m2, low, high):
+        stats = cls(signals)
+        stats.count, stats.mean, stats.m2 = (np.array(a, dtype=float) for a in (count, mean, m2))
+        stats.min, stats.max = np.array(low, dtype=float), np.array(high, dtype=float)
+        return stats
+
+    @classmethod
+    def from_frame(cls, frame, signals=None):
+        signals = list(frame.columns) if signals is None else list(signals)
+        return cls.from_moments(signals, *batch_moments(frame[signals].to_numpy(dtype=float)))
+
+    def push(self, sample):
+        """Add one sample given as a mapping of signal -> value"""
+        values = np.array([sample.get(name, np.nan) for name in self.signals], dtype=float)
+        valid = ~np.isnan(values)
+        self.count = self.count + valid
+        delta = np.where(valid, values - self.mean, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = self.mean + np.where(valid, delta / self.count, 0.0)
+        self.m2 = self.m2 + np.where(valid, delta * (values - self.mean), 0.0)
+        self.min = np.fmin(self.min, values)
+        self.max = np.fmax(self.max, values)
+
+    def update(self, values):
+        """Add a batch given as a 2-D array with one column per signal"""
+        self.merge(RunningStats.from_moments(self.signals, *batch_moments(values)))
+
+    def merge(self, other):
+        """Fold another partial over the same signals into this one"""
+        self.count, self.mean, self.m2 = merge_moments(
+            self.count, self.mean, self.m2, other.count, other.mean, other.m2
+        )
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1), NaN with fewer than two samples"""
+        return summarize(self.count, self.mean, self.m2, self.min, self.max)['std']
+
+    def to_frame(self):
+        """Summarize as a DataFrame indexed by signal"""
+        derived = summarize(self.count, self.mean, self.m2, self.min, self.max)
+        return pd.DataFrame(derived, index=pd.Index(self.signals, name='signal'))